@@ -0,0 +1,277 @@
+import asyncio, os, random, time, aiohttp
+from email.utils import parsedate_to_datetime
+
+class AsyncConfluence:
+    """
+    A coroutine version of the Confluence calls used by the uploader, sharing
+    one pooled aiohttp session between every request. With a scheduler, every
+    request waits for its budget in the scheduler.RequestScheduler first.
+
+    Requests are retried with the policy of transport.generateRetry: failed
+    connections, and 429, 500, 502, 503 and 504 responses to idempotent
+    methods, after a random time up to the exponential backoff. Other
+    methods are only retried when the server did not process the request: a
+    connection which never opened, a 429, or a 503 with a Retry-After header.
+    Retry-After is always respected, and no slot of the scheduler is held
+    while waiting to retry.
+    """
+
+    retry_statuses = (429, 500, 502, 503, 504)
+    idempotent_methods = frozenset(["HEAD", "GET", "PUT", "DELETE", "OPTIONS", "TRACE"])
+    max_backoff = 120.0
+
+    content_types = {
+        ".gif": "image/gif",
+        ".png": "image/png",
+        ".jpg": "image/jpeg",
+        ".jpeg": "image/jpeg",
+        ".pdf": "application/pdf",
+        ".doc": "application/msword",
+        ".xls": "application/vnd.ms-excel",
+    }
+
+    def __init__(self, url:str, username:str, password:str, pool_size:int = 20, timeout = 60, verify_ssl:bool = True, scheduler = None,
+        retries:int = 5, backoff_factor:float = 0.5):
+        self.url = url.rstrip("/")
+        self.auth = aiohttp.BasicAuth(username, password)
+        self.pool_size = pool_size
+        if isinstance(timeout, tuple):
+            self.timeout = aiohttp.ClientTimeout(sock_connect=timeout[0], sock_read=timeout[1])
+        else:
+            self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.verify_ssl = verify_ssl
+        self.scheduler = scheduler
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self.session = None
+
+    @classmethod
+    def fromSession(cls, confluence_api, pool_size:int = 20, scheduler = None):
+        """
+        Build an AsyncConfluence pointing at the same server and account as a
+        synchronous atlassian.Confluence session, optionally sharing its
+        scheduler.RequestScheduler.
+        """
+        return cls(
+            confluence_api.url,
+            confluence_api.username,
+            confluence_api.password,
+            pool_size=pool_size,
+            timeout=confluence_api.timeout,
+            verify_ssl=confluence_api.verify_ssl,
+            scheduler=scheduler)
+
+    async def __aenter__(self):
+        await self.open()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def open(self):
+        if self.session is None:
+            connector = aiohttp.TCPConnector(limit=self.pool_size, ssl=None if self.verify_ssl else False)
+            self.session = aiohttp.ClientSession(connector=connector, auth=self.auth, timeout=self.timeout)
+
+    async def close(self):
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    async def send(self, method:str, url:str, **kwargs):
+        """
+        Send a request through the scheduler, when there is one, retrying it
+        as described above, and return the response status and its decoded
+        JSON body, or None when the body is not JSON. kwargs are passed on to
+        aiohttp, except that data may be a function building the body, called
+        again for every attempt, for bodies which can only be sent once.
+        """
+        await self.open()
+
+        async def send():
+            attempt_kwargs = dict(kwargs, data=kwargs["data"]()) if callable(kwargs.get("data")) else kwargs
+            async with self.session.request(method, url, **attempt_kwargs) as response:
+                try:
+                    body = await response.json(content_type=None)
+                except ValueError:
+                    body = None
+                return response.status, body, self.parseRetryAfter(response.headers.get("Retry-After"))
+
+        idempotent = method.upper() in self.idempotent_methods
+
+        for attempt in range(self.retries + 1):
+            final = attempt == self.retries
+
+            try:
+                if self.scheduler is None:
+                    status, body, retry_after = await send()
+                else:
+                    status, body, retry_after = await self.scheduler.sendAsync(method, url, send)
+            except aiohttp.ClientConnectorError:
+                if final:
+                    raise
+                retry_after = None
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                if final or not idempotent:
+                    raise
+                retry_after = None
+            else:
+                if final or not self.isRetry(idempotent, status, retry_after is not None):
+                    return status, body
+
+            # sendAsync has released the slot, so other requests go ahead
+            # while this one waits.
+            await asyncio.sleep(retry_after or self.getBackoffTime(attempt))
+
+    def isRetry(self, idempotent:bool, status:int, has_retry_after:bool) -> bool:
+        if idempotent:
+            return status in self.retry_statuses
+        return status == 429 or (status == 503 and has_retry_after)
+
+    def getBackoffTime(self, attempt:int) -> float:
+        """
+        Get a random time between zero and the exponential backoff of an
+        attempt, with no backoff before the first retry, as urllib3 does.
+        """
+        if attempt < 1:
+            return 0.0
+        return random.uniform(0, min(self.max_backoff, self.backoff_factor * (2 ** attempt)))
+
+    @staticmethod
+    def parseRetryAfter(retry_after:str) -> float:
+        """
+        Get the seconds a Retry-After header asks to wait, given either as
+        seconds or as an HTTP date, or None without a usable header.
+        """
+        if not retry_after:
+            return None
+
+        try:
+            return max(0.0, float(retry_after))
+        except ValueError:
+            pass
+
+        try:
+            return max(0.0, parsedate_to_datetime(retry_after).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+    async def request(self, method:str = "GET", path:str = "/", data = None, params:dict = None, headers:dict = None):
+        """
+        Send a request to Confluence and return the response status and its
+        decoded JSON body, or None when the body is not JSON.
+        """
+        headers = headers or {
+            "Content-Type": "application/json",
+            "Accept": "application/json"
+        }
+
+        return await self.send(method, self.url + "/" + path.lstrip("/"), json=data, params=params, headers=headers)
+
+    async def get(self, path:str, params:dict = None):
+        status, body = await self.request("GET", path, params=params)
+        return body
+
+    async def get_child_pages(self, page_id, limit:int = 100) -> list:
+        pages = []
+        start = 0
+
+        while True:
+            response = await self.get("rest/api/content/" + str(page_id) + "/child/page", params={"start": start, "limit": limit})
+
+            if not response:
+                break
+
+            results = response.get("results", [])
+            pages.extend(results)
+
+            if len(results) < 1 or "next" not in response.get("_links", {}):
+                break
+
+            start += len(results)
+
+        return pages
+
+    async def create_page(self, space:str, title:str, body:str, parent_id = None, type:str = "page", labels:list = None) -> tuple:
+        """
+        Create a page, with its labels in its metadata when given.
+
+        Returns:
+            tuple: The response status and the created page, or the error
+            body when it was not created.
+        """
+        data = {
+            "type": type,
+            "title": title,
+            "space": {"key": space},
+            "body": {
+                "storage": {
+                    "value": body,
+                    "representation": "storage"
+                }
+            }
+        }
+
+        if parent_id:
+            data["ancestors"] = [{"type": type, "id": parent_id}]
+
+        if labels:
+            data["metadata"] = {"labels": [{"prefix": "global", "name": label} for label in labels]}
+
+        return await self.request("POST", "rest/api/content/", data=data, params={"expand": "metadata.labels"})
+
+    async def set_page_label(self, page_id, label:str) -> dict:
+        data = [{"prefix": "global", "name": label}]
+        status, response = await self.request("POST", "rest/api/content/" + str(page_id) + "/label", data=data)
+        return response
+
+    async def remove_page(self, page_id) -> int:
+        status, response = await self.request("DELETE", "rest/api/content/" + str(page_id))
+        return status
+
+    async def attach_files(self, file_paths:list, page_id, comments:dict = None) -> dict:
+        """
+        Attach every existing file of file_paths to a page in one request.
+
+        Args:
+            file_paths (list): The paths of the files to attach.
+            page_id: The page to attach them to.
+            comments (dict, optional): Defaults to None. The comment of each
+            file path, such as the checksum uploadAttachments looks for.
+        """
+        file_paths = [file_path for file_path in file_paths if os.path.exists(file_path)]
+        comments = comments or {}
+
+        if not file_paths:
+            return None
+
+        data_files = []
+
+        # aiohttp closes the files of a form once it is sent, so every
+        # attempt builds its own form from freshly opened files.
+        def buildForm():
+            form = aiohttp.FormData(quote_fields=False)
+            form.add_field("minorEdit", "true")
+            for file_path in file_paths:
+                content_type = self.content_types.get(os.path.splitext(file_path)[-1], "application/binary")
+                data_files.append(open(file_path, "rb"))
+                form.add_field("comment", comments.get(file_path, " "))
+                form.add_field("file", data_files[-1], filename=os.path.basename(file_path), content_type=content_type)
+            return form
+
+        try:
+            status, response = await self.send(
+                "POST",
+                self.url + "/rest/api/content/" + str(page_id) + "/child/attachment",
+                data=buildForm,
+                headers={
+                    "X-Atlassian-Token": "no-check",
+                    "Accept": "application/json"
+                })
+            return response
+        finally:
+            for data_file in data_files:
+                data_file.close()
+
+    async def attach_file(self, file_path:str, page_id, comment:str = " ") -> dict:
+        return await self.attach_files([file_path], page_id, {file_path: comment})
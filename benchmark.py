@@ -0,0 +1,430 @@
+import argparse, datetime, json, logging, os, platform, random, re, statistics, subprocess, tempfile, threading, time
+import committee_upload
+
+months = ["January", "February", "March", "April", "May", "June", "July", "August", "September", "October", "November", "December"]
+
+first_names = ["John", "Jane", "Maria", "Robert", "Linda", "Michael", "Susan", "David", "Karen", "James", "Patricia", "Thomas"]
+last_names = ["Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller", "Davis", "Wilson", "Moore", "Taylor", "Clark"]
+
+topic_words = ["budget", "review", "approval", "report", "audit", "policy", "election", "update", "assessment", "legislation", "guaranty", "fund", "insolvency", "claims", "training"]
+
+# The mis-decoded punctuation found throughout the real minutes exports.
+mojibake = ["â€™", "â€“", "â\u0080\u0093"]
+
+class StubRequest:
+
+    def __init__(self, body:bytes):
+        self.body = body
+
+class StubResponse:
+
+    def __init__(self, status_code:int, body:dict, request:StubRequest = None):
+        self.status_code = status_code
+        self.body = body
+        self.request = request
+
+    def json(self) -> dict:
+        return self.body
+
+class StubSession:
+    """
+    Stands in for the requests session behind atlassian.Confluence, for the
+    page creating and streamed attachment POSTs.
+    """
+
+    def __init__(self, confluence):
+        self.confluence = confluence
+        self.hooks = {"response": []}
+
+    def post(self, url:str, data = None, headers:dict = None, json:dict = None, **kwargs) -> StubResponse:
+        if json is not None:
+            return self.confluence.createPage(json)
+        body = data.read() if hasattr(data, "read") else data
+        self.confluence.count("post", len(body))
+        titles = re.findall(rb"filename=\"([^\"]+)\"", body)
+        return StubResponse(200, {"results": [{"title": title.decode("utf-8")} for title in titles]})
+
+class StubConfluence:
+    """
+    An in-memory stand-in for atlassian.Confluence holding a committees page
+    with a "Minutes" child page below every committee, so the uploader can be
+    run end to end without a server. Every call can be given a fixed latency.
+    """
+
+    def __init__(self, committee_names:list, latency:float = 0.0, committee_parent_page_id:int = committee_upload.committees_parent_page_id):
+        self.url = "http://stub"
+        self.username = "stub"
+        self.password = "stub"
+        self.timeout = 60
+        self.verify_ssl = False
+        self.latency = latency
+        self.lock = threading.Lock()
+        self.calls = {}
+        self.bytes_sent = 0
+        self.next_id = committee_parent_page_id + 1
+        self.pages = {}
+        self._session = StubSession(self)
+
+        self.addPage(str(committee_parent_page_id), "Committees", None)
+
+        for committee_name in committee_names:
+            committee_id = self.createID()
+            self.addPage(committee_id, committee_name, str(committee_parent_page_id))
+            self.addPage(self.createID(), "Minutes", committee_id)
+
+    def createID(self) -> str:
+        with self.lock:
+            self.next_id += 1
+            return str(self.next_id)
+
+    def addPage(self, page_id:str, title:str, parent_id:str, body:str = ""):
+        self.pages[page_id] = {
+            "id": page_id,
+            "title": title,
+            "parent": parent_id,
+            "body": body,
+            "labels": [],
+            "version": 1
+        }
+
+    def count(self, call:str, bytes_sent:int = 0):
+        with self.lock:
+            self.calls[call] = self.calls.get(call, 0) + 1
+            self.bytes_sent += bytes_sent
+        if self.latency:
+            time.sleep(self.latency)
+        for hook in self._session.hooks["response"]:
+            hook(StubResponse(200, None, StubRequest(bytes(bytes_sent))))
+
+    def getChildren(self, page_id:str) -> list:
+        return [page for page in list(self.pages.values()) if page["parent"] == page_id]
+
+    def getDescendants(self, page_id:str) -> list:
+        descendants = []
+        for child in self.getChildren(page_id):
+            descendants.append(child)
+            descendants.extend(self.getDescendants(child["id"]))
+        return descendants
+
+    def get(self, path:str, params:dict = None, **kwargs) -> dict:
+        self.count("get")
+        params = params or {}
+        pieces = path.strip("/").split("/")
+        page_id = pieces[3] if len(pieces) > 3 else None
+
+        if path.strip("/") == "rest/api/content":
+            pages = [page for page in list(self.pages.values()) if page["title"] == params.get("title")]
+        elif path.endswith("/child/page"):
+            pages = self.getChildren(page_id)
+        elif path.endswith("/descendant/page"):
+            pages = self.getDescendants(page_id)
+        elif path.endswith("/child/attachment"):
+            pages = []
+        elif page_id in self.pages:
+            page = self.pages[page_id]
+            return {"id": page_id, "title": page["title"], "version": {"number": page["version"]}}
+        else:
+            return None
+
+        start = int(params.get("start", 0))
+        limit = int(params.get("limit", 25))
+        results = [{"id": page["id"], "title": page["title"]} for page in pages[start:start + limit]]
+        links = {"next": path} if start + limit < len(pages) else {}
+
+        return {"results": results, "size": len(results), "_links": links}
+
+    def put(self, path:str, data:dict = None, **kwargs) -> dict:
+        self.count("put", len(json.dumps(data)))
+        page = self.pages.get(path.strip("/").split("/")[-1])
+        if not page:
+            return None
+        page["title"] = data["title"]
+        page["body"] = data["body"]["storage"]["value"]
+        page["version"] = data["version"]["number"]
+        return {"id": page["id"]}
+
+    def get_child_pages(self, page_id) -> list:
+        self.count("get")
+        return [{"id": page["id"], "title": page["title"]} for page in self.getChildren(str(page_id))]
+
+    def create_page(self, space:str, title:str, body:str, parent_id = None, type:str = "page") -> dict:
+        self.count("create_page", len(body.encode("utf-8")))
+        with self.lock:
+            if any(page["title"] == title for page in self.pages.values()):
+                return {"statusCode": 400, "message": "A page with this title already exists"}
+        page_id = self.createID()
+        self.addPage(page_id, title, str(parent_id), body)
+        return {"id": page_id, "title": title}
+
+    def createPage(self, data:dict) -> StubResponse:
+        """
+        Create a page from a REST content payload, with the labels in its
+        metadata.
+        """
+        self.count("create_page", len(json.dumps(data).encode("utf-8")))
+        title = data["title"]
+        with self.lock:
+            if any(page["title"] == title for page in self.pages.values()):
+                return StubResponse(400, {"statusCode": 400, "message": "A page with this title already exists"})
+        page_id = self.createID()
+        self.addPage(page_id, title, str(data["ancestors"][0]["id"]), data["body"]["storage"]["value"])
+        labels = [label["name"] for label in data.get("metadata", {}).get("labels", [])]
+        self.pages[page_id]["labels"].extend(labels)
+        return StubResponse(200, {"id": page_id, "title": title, "metadata": {"labels": {"results": [{"name": label} for label in labels]}}})
+
+    def set_page_label(self, page_id, label:str) -> dict:
+        self.count("set_page_label")
+        self.pages[str(page_id)]["labels"].append(label)
+        return {"results": [{"name": label}]}
+
+    def remove_page(self, page_id, **kwargs):
+        self.count("remove_page")
+        with self.lock:
+            self.pages.pop(str(page_id), None)
+
+def getArchiveDate(randomizer:random.Random) -> datetime.date:
+    return datetime.date(randomizer.randint(2005, 2019), randomizer.randint(1, 12), randomizer.randint(1, 28))
+
+def getName(randomizer:random.Random) -> str:
+    return randomizer.choice(first_names) + " " + randomizer.choice(last_names)
+
+def getSentence(randomizer:random.Random, words:int) -> str:
+    sentence = " ".join(randomizer.choice(topic_words) for _ in range(words))
+    if randomizer.random() < 0.3:
+        sentence += randomizer.choice(mojibake) + "s " + randomizer.choice(topic_words)
+    return sentence.capitalize() + "."
+
+def generateAgenda(committee_name:str, date:datetime.date, randomizer:random.Random, topics:int) -> str:
+    lines = [
+        committee_name + " Agenda",
+        months[date.month - 1] + " " + str(date.day) + ", " + str(date.year),
+        "",
+        "Presenter",
+    ]
+
+    lines.extend(getName(randomizer) for _ in range(randomizer.randint(1, 4)))
+    lines.append("D/I/V")
+    lines.append("")
+
+    for topic in range(1, topics + 1):
+        lines.append(str(topic) + ". " + getSentence(randomizer, randomizer.randint(2, 6)))
+        for _ in range(randomizer.randint(0, 2)):
+            lines.append("   " + getSentence(randomizer, randomizer.randint(4, 10)))
+
+    return "\n".join(lines) + "\n"
+
+def generateMinutes(committee_name:str, date:datetime.date, randomizer:random.Random, topics:int) -> str:
+    lines = [
+        committee_name + " Minutes",
+        months[date.month - 1] + " " + str(date.day) + ", " + str(date.year),
+        "",
+        "Members Attending"
+    ]
+
+    lines.extend(getName(randomizer) + randomizer.choice(["", "", " (Chair)", ", CPA"]) for _ in range(randomizer.randint(3, 12)))
+    lines.append("Members Not Attending")
+    lines.extend(getName(randomizer) for _ in range(randomizer.randint(0, 4)))
+    lines.append("Others Attending")
+    lines.extend(getName(randomizer) + " " + mojibake[2] + " Staff" for _ in range(randomizer.randint(0, 5)))
+
+    for _ in range(topics):
+        lines.append("")
+        lines.append(getSentence(randomizer, randomizer.randint(2, 5)))
+        lines.extend(getSentence(randomizer, randomizer.randint(8, 20)) for _ in range(randomizer.randint(1, 6)))
+
+    return "\n".join(lines) + "\n"
+
+def generateCommitteeArchive(root:str, committees:int = 5, minutes_per_committee:int = 40, topics:int = 8, pdf_bytes:int = 64 * 1024, seed:int = 0) -> list:
+    """
+    Create a synthetic committees folder below root laid out like the real
+    export: one folder per committee holding dated minutes and agenda text
+    files, each with a matching PDF.
+
+    Args:
+        root (str): The folder to create the committee folders in.
+        committees (int, optional): Defaults to 5. Committee folders to create.
+        minutes_per_committee (int, optional): Defaults to 40. Meetings per committee.
+        topics (int, optional): Defaults to 8. Topics per meeting.
+        pdf_bytes (int, optional): Defaults to 64KB. The size of every PDF.
+        seed (int, optional): Defaults to 0. The same seed gives the same archive.
+
+    Returns:
+        list: The names of the committees created.
+    """
+    randomizer = random.Random(seed)
+    committee_names = []
+
+    for committee in range(committees):
+
+        committee_name = "Benchmark Committee " + str(committee + 1)
+        committee_path = os.path.join(root, committee_name)
+        os.makedirs(committee_path, exist_ok=True)
+        committee_names.append(committee_name)
+
+        dates = set()
+        while len(dates) < minutes_per_committee:
+            dates.add(getArchiveDate(randomizer))
+
+        for date in sorted(dates):
+
+            file_date = str(date.month) + "-" + str(date.day) + "-" + str(date.year)[2:]
+
+            files = {
+                "Agenda " + file_date: generateAgenda(committee_name, date, randomizer, topics),
+                "Minutes " + file_date: generateMinutes(committee_name, date, randomizer, topics)
+            }
+
+            for file_name, text in files.items():
+                with open(os.path.join(committee_path, file_name + ".txt"), "w", encoding="utf-8") as text_file:
+                    text_file.write(text)
+                with open(os.path.join(committee_path, file_name + ".pdf"), "wb") as pdf_file:
+                    pdf_file.write(b"%PDF-1.4\n" + randomizer.getrandbits(8 * pdf_bytes).to_bytes(pdf_bytes, "little"))
+
+    return committee_names
+
+def runBenchmark(name:str, function, repeat:int) -> dict:
+    """
+    Time function repeat times and summarize the timings in seconds.
+    """
+    timings = []
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+
+    result = {
+        "Name": name,
+        "Repeat": repeat,
+        "Min": min(timings),
+        "Median": statistics.median(timings),
+        "Mean": statistics.mean(timings)
+    }
+
+    print(name.ljust(32) + ("%.6f" % result["Median"]).rjust(12) + " s median")
+
+    return result
+
+def runUploadBenchmark(name:str, function, repeat:int) -> dict:
+    """
+    runBenchmark for an upload driver, also reporting the stub Confluence
+    requests sent per published minute on the last run.
+    """
+    uploads = []
+    result = runBenchmark(name, lambda: uploads.append(function()), repeat)
+
+    calls = committee_upload.confluence_api.calls
+    published = len(uploads[-1]["Succeeded"])
+
+    result["Requests"] = dict(calls)
+    result["Requests Per Minute"] = sum(calls.values()) / published if published else 0.0
+
+    print(name.ljust(32) + ("%.2f" % result["Requests Per Minute"]).rjust(12) + " requests per minute")
+
+    return result
+
+def getRevision() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], cwd=os.path.dirname(os.path.realpath(__file__)), stderr=subprocess.DEVNULL).decode("ascii").strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def runBenchmarks(root:str, committee_names:list, repeat:int = 5, workers:int = 1, latency:float = 0.0) -> list:
+    """
+    Run every benchmark against the archive in root and get their results.
+    """
+    committee_upload.committees_directory = root
+
+    committee_path = os.path.join(root, committee_names[0])
+    minutes_files = sorted(committee_upload.getMinutesFromFolder(committee_path))
+    agenda_files = sorted(committee_upload.getAgendasFromFolder(committee_path))
+
+    def readLines(file_names:list) -> list:
+        lines = []
+        for file_name in file_names:
+            with open(os.path.join(committee_path, file_name), "r", encoding="utf-8") as text_file:
+                lines.append(list(text_file))
+        return lines
+
+    agenda_lines = readLines(agenda_files)
+    minutes_lines = readLines(minutes_files)
+
+    agendas = [committee_upload.getAgenda(lines) for lines in agenda_lines]
+    attendees = [committee_upload.getAttendees(lines) for lines in minutes_lines]
+    presenters = [[{"Topic": topic, "Presenter": ""} for topic in agenda["Agenda"]] for agenda in agendas]
+    pages = list(zip(attendees, presenters))
+
+    def buildMinutes() -> list:
+        return [
+            committee_upload.buildMinute(
+                committee_names[0],
+                "01/01/19",
+                attendee["Members Attending"],
+                attendee["Members NOT Attending"],
+                attendee["Others Attending"],
+                presenter,
+                [{"Topic": "Topics", "Description": "".join(lines)}])
+            for (attendee, presenter), lines in zip(pages, minutes_lines)]
+
+    minutes_texts = ["".join(lines) for lines in minutes_lines]
+    matched = committee_upload.pairMinutesWithAgendas(minutes_files, agenda_files)["Matched"]
+
+    def renderCommitteeMinutes() -> list:
+        return [committee_upload.renderCommitteeMinute(agenda_file, minutes_file, committee_names[0]) for minutes_file, agenda_file in matched]
+
+    def mergeMatches():
+        committee_upload.confluence_api = StubConfluence(committee_names, latency=latency)
+        committee_upload.invalidateCommitteePageTree()
+        return committee_upload.mergeMatches(workers=workers)
+
+    def mergeMatchesPipelined():
+        committee_upload.confluence_api = StubConfluence(committee_names, latency=latency)
+        committee_upload.invalidateCommitteePageTree()
+        return committee_upload.mergeMatchesPipelined(upload_workers=workers)
+
+    return [
+        runBenchmark("getAgenda", lambda: [committee_upload.getAgenda(lines) for lines in agenda_lines], repeat),
+        runBenchmark("getAttendees", lambda: [committee_upload.getAttendees(lines) for lines in minutes_lines], repeat),
+        runBenchmark("getFilesWithSimilarDate", lambda: [committee_upload.getFilesWithSimilarDate(file_name, agenda_files) for file_name in minutes_files], repeat),
+        runBenchmark("pairMinutesWithAgendas", lambda: committee_upload.pairMinutesWithAgendas(minutes_files, agenda_files), repeat),
+        runBenchmark("buildMinute", buildMinutes, repeat),
+        runBenchmark("escapeText", lambda: [committee_upload.escapeText(minutes_text) for minutes_text in minutes_texts], repeat),
+        runBenchmark("renderCommitteeMinute", renderCommitteeMinutes, repeat),
+        runUploadBenchmark("mergeMatches", mergeMatches, repeat),
+        runUploadBenchmark("mergeMatchesPipelined", mergeMatchesPipelined, repeat)
+    ]
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the committee uploader against a synthetic archive.")
+    parser.add_argument("--committees", type=int, default=5, help="Committee folders to generate.")
+    parser.add_argument("--minutes", type=int, default=40, help="Meetings per committee.")
+    parser.add_argument("--topics", type=int, default=8, help="Topics per meeting.")
+    parser.add_argument("--pdf-bytes", type=int, default=64 * 1024, help="Size of every generated PDF.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the generated archive.")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs of every benchmark.")
+    parser.add_argument("--workers", type=int, default=1, help="Workers for the mergeMatches benchmarks.")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds of latency added to every stub Confluence call.")
+    parser.add_argument("--archive", help="Generate the archive here and keep it, instead of a temporary folder.")
+    parser.add_argument("--output", default="benchmark_results.json", help="The JSON file to write the results to.")
+    arguments = parser.parse_args()
+
+    committee_upload.logger.setLevel(logging.ERROR)
+
+    with tempfile.TemporaryDirectory() as temporary_directory:
+
+        root = arguments.archive or temporary_directory
+        committee_names = generateCommitteeArchive(root, arguments.committees, arguments.minutes, arguments.topics, arguments.pdf_bytes, arguments.seed)
+
+        results = runBenchmarks(root, committee_names, arguments.repeat, arguments.workers, arguments.latency)
+
+    with open(arguments.output, "w", encoding="utf-8") as output_file:
+        json.dump({
+            "Revision": getRevision(),
+            "Python": platform.python_version(),
+            "Timestamp": datetime.datetime.now().isoformat(),
+            "Parameters": vars(arguments),
+            "Results": results
+        }, output_file, indent=2)
+
+if __name__ == "__main__":
+    main()
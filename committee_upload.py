@@ -1,10 +1,143 @@
-import requests, urllib3, os, dateutil, time, string, logging, time, json, re, credentials, debugging, unicodedata
-from atlassian import Confluence
-from os import listdir
-from os.path import isfile, join, isdir, exists
+import os, io, sys, argparse, time, logging, json, re, debugging, metrics, unicodedata, threading, hashlib, uuid, queue, multiprocessing.util
 from datetime import datetime
-confluence_api = credentials.generateSession()
-logger = debugging.generateLogger()
+from collections import deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from contextlib import nullcontext
+http_pool_size = 20
+confluence_api = None
+confluence_api_lock = threading.Lock()
+request_scheduler = None
+committees_directory = None
+excluded_committee_names = ["Guaranty Funds Information Systems", "IT Advisory & Governance"]
+metrics_recorder = None
+logger = debugging.getLogger()
+
+committees_parent_page_id = 1278261
+manifest_file_path = os.path.join(os.path.dirname(os.path.realpath(__file__)), "sync_manifest.json")
+journal_file_path = os.path.join(os.path.dirname(os.path.realpath(__file__)), "checkpoint_journal.jsonl")
+checkpoint_journal = None
+committee_page_trees = {}
+committee_page_tree_lock = threading.Lock()
+archive_index = None
+archive_index_file_path = None
+archive_index_lock = threading.Lock()
+archive_index_version = 2
+parse_cache = None
+parser_version = 1
+extracted_texts = {}
+extracted_texts_lock = threading.Lock()
+minute_labels = ["minutes"]
+
+# The outcome of creating a page: status is "Created", "Exists" or "Failed",
+# page_id is set when it was created and reason says why it was not.
+CreatedPage = namedtuple("CreatedPage", ["status", "page_id", "reason"])
+
+def getConfluenceAPI():
+    """
+    Get the Confluence session, connecting on first use so nothing is
+    connected until a remote call is actually made. Every request of the
+    session goes through request_scheduler, which adapts the request rate
+    and concurrency to what the server tolerates.
+    """
+    global confluence_api, request_scheduler
+
+    with confluence_api_lock:
+        if confluence_api is None:
+            import credentials, transport, scheduler
+            if request_scheduler is None:
+                request_scheduler = scheduler.RequestScheduler(max_concurrency=http_pool_size)
+            confluence_api = transport.configureSession(credentials.generateSession(), pool_size=http_pool_size, scheduler=request_scheduler)
+            if metrics_recorder:
+                metrics_recorder.installSessionHook(confluence_api._session)
+        return confluence_api
+
+def sendRequest(method:str, path:str, **kwargs):
+    """
+    Send a request to a REST path of Confluence through the session, with
+    its credentials, timeout and certificate settings. Unlike the helpers of
+    the Confluence client, which hand back the error body or None, the
+    response is returned so callers can check its status code.
+    """
+    confluence_api = getConfluenceAPI()
+
+    kwargs.setdefault("headers", {"Accept": "application/json"})
+
+    return confluence_api._session.request(
+        method,
+        confluence_api.url.rstrip("/") + "/" + path,
+        auth=(confluence_api.username, confluence_api.password),
+        timeout=confluence_api.timeout,
+        verify=confluence_api.verify_ssl,
+        **kwargs)
+
+def enableMetrics() -> metrics.MetricsRecorder:
+    """
+    Start recording per-stage timings and request counts for every minute
+    uploaded from now on.
+    """
+    global metrics_recorder
+
+    with confluence_api_lock:
+        if metrics_recorder is None:
+            metrics_recorder = metrics.MetricsRecorder()
+            if confluence_api is not None and hasattr(confluence_api, "_session"):
+                metrics_recorder.installSessionHook(confluence_api._session)
+        return metrics_recorder
+
+def measure(stage_name:str):
+    """
+    Time the block as a stage of the current minute when metrics are enabled.
+    """
+    return metrics_recorder.stage(stage_name) if metrics_recorder else nullcontext()
+
+def measureLines(lines):
+    """
+    Count the time spent reading lines as the "read" stage when metrics are
+    enabled.
+    """
+    return metrics_recorder.timeLines(lines) if metrics_recorder else lines
+
+def measureMinute(committee_name:str, minute_name:str):
+    """
+    Attribute the stages and requests of the block to one minute when metrics
+    are enabled.
+    """
+    return metrics_recorder.minute(committee_name, minute_name) if metrics_recorder else nullcontext()
+
+def writeMetrics(json_path:str = None, prometheus_path:str = None):
+    """
+    Log a summary of the recorded metrics and write them as JSON and in the
+    Prometheus text format.
+    """
+    if not metrics_recorder:
+        logger.warning("Metrics were not enabled.")
+        return
+
+    summary = metrics_recorder.summary()
+
+    logger.info(
+        str(summary["Minutes"]) + " minutes, " + str(summary["Requests"]) + " requests, "
+        + str(summary["Bytes Sent"]) + " bytes sent, "
+        + str(round(summary["Requests Per Minute"]["Mean"], 2)) + " requests per minute, p50 minute "
+        + str(round(summary["Minute Seconds"]["P50"], 3)) + " seconds.")
+
+    if json_path:
+        metrics_recorder.writeJSON(json_path)
+
+    if prometheus_path:
+        metrics_recorder.writePrometheus(prometheus_path)
+
+def getCommitteesDirectory() -> str:
+    """
+    Get the folder holding every committee folder: committees_directory when
+    it is set, otherwise the one from credentials.
+    """
+    if committees_directory:
+        return committees_directory
+
+    import credentials
+
+    return credentials.getCommitteesDirectory()
 
 def isAgenda(file_name) -> bool:
     return "agenda" in file_name.lower()
@@ -17,83 +150,432 @@ def isFileEXT(file_name:str, file_ext:str) -> bool:
 
 def getAgendasFromFolder(folder_path:str) -> list:
 
-    folder_name = folder_path.split("/")[-1]
+    committee_index = getCommitteeIndex(folder_path)
 
-    if not os.path.exists(folder_path):
-        logger.critical("No folder exists with the name " + folder_name)
-        return None
-    if not os.path.isdir(folder_path):
-        logger.critical(folder_name + " is not a directory.")
+    if not committee_index:
         return None
 
-    agendas = (file for file in os.listdir(folder_path) if isAgenda(file) and isFileEXT(file, "txt"))
-    
-    return agendas
+    return iter(committee_index["Agendas"])
 
 def getMinutesFromFolder(folder_path:str) -> list:
 
-    folder_name = folder_path.split("/")[-1]
+    committee_index = getCommitteeIndex(folder_path)
 
-    if not os.path.exists(folder_path):
-        logger.critical("No folder exists with the name " + folder_name)
-        return None
-    if not os.path.isdir(folder_path):
-        logger.critical(folder_name + " is not a directory.")
+    if not committee_index:
         return None
-    
-    minutes = (file for file in os.listdir(folder_path) if isMinutes(file) and isFileEXT(file, "txt"))
-    
-    return minutes
+
+    return iter(committee_index["Minutes"])
 
 def clean_minutes_from_committees(committee_names):
     for committee_name in committee_names:
         committee_id = getPageIDFromCommitteeName(committee_name)
         minutes_page_id = getMinutesConfluencePage(committee_id)
-        pages = confluence_api.get_child_pages(minutes_page_id)
+        pages = getConfluenceAPI().get_child_pages(minutes_page_id)
         while len(pages) > 0:
             page_ids = [page["id"] for page in pages]
             for index, page in enumerate(page_ids, 1):
-                confluence_api.remove_page(page)
+                getConfluenceAPI().remove_page(page)
                 logger.info("Cleaned " + str(index) + "/" + str(len(page_ids)))
-            pages = confluence_api.get_child_pages(minutes_page_id)
+            pages = getConfluenceAPI().get_child_pages(minutes_page_id)
         logger.info("Done cleaning " + committee_name)
 
-def attach_file(file_path, parent_page_id):
-    content_types = {
-        ".gif": "image/gif",
-        ".png": "image/png",
-        ".jpg": "image/jpeg",
-        ".jpeg": "image/jpeg",
-        ".pdf": "application/pdf",
-        ".doc": "application/msword",
-        ".xls": "application/vnd.ms-excel",
-    }
-
-    file_extension = os.path.splitext(file_path)[-1]
-    file_name = os.path.basename(file_path)
-    content_type = content_types.get(file_extension, "application/binary")
-    post_path = "rest/api/content/{page_id}/child/attachment".format(page_id=parent_page_id)
-
-    if not os.path.exists(file_path):
-        return
+def generateRateLimiter(requests_per_second:float):
+    """
+    Get a function which blocks just long enough to keep every thread calling
+    it under requests_per_second in total.
+    """
+    lock = threading.Lock()
+    next_request = [time.monotonic()]
+    interval = 1.0 / requests_per_second
+
+    def wait():
+        with lock:
+            now = time.monotonic()
+            delay = next_request[0] - now
+            next_request[0] = max(now, next_request[0]) + interval
+        if delay > 0:
+            time.sleep(delay)
+
+    return wait
+
+def purgeMinutesFromCommittee(committee_name:str, workers:int = 8, requests_per_second:float = 10.0) -> dict:
+    """
+    Delete every page below the "Minutes" page of a committee. The pages are
+    listed once, deleted concurrently under a rate limit, and listed again at
+    the end to check nothing was left behind.
+
+    {
+        "Committee Name": committee_name,
+        "Found": found,
+        "Deleted": deleted,
+        "Failed": [(page_id, status)],
+        "Remaining": remaining
+    }
+
+    The status of a failed delete is its HTTP status, or None when no
+    response came back.
+    
+    Args:
+        committee_name (str): The name of a committee on Confluence.
+        workers (int, optional): Defaults to 8. Deletes in flight at once.
+        requests_per_second (float, optional): Defaults to 10.0. The cap on
+        deletes sent per second.
+    
+    Returns:
+        dict: A dictionary like above, or None without a Minutes page.
+    """
+    committee_id = getPageIDFromCommitteeName(committee_name)
+    minutes_page_id = getMinutesConfluencePage(committee_id)
+
+    if not minutes_page_id:
+        logger.error("Could not retrieve the 'Minutes' child page of " + committee_name)
+        return None
+
+    descendants_path = "rest/api/content/" + str(minutes_page_id) + "/descendant/page"
+    page_ids = [page["id"] for page in getPagesPaginated(descendants_path)]
+
+    wait = generateRateLimiter(requests_per_second)
+    progress_lock = threading.Lock()
+    progress = {
+        "Deleted": 0,
+        "Failed": []
+    }
 
-    with open(file_path, "rb") as data_file:
-        confluence_api.post(
-            path=post_path,
-            data = {
-            "type": "attachment",
-            "fileName": file_name,
-            "contentType": content_type,
-            "comment": " ",
-            "minorEdit": "true"
-        }, 
-        headers = {
+    def remove(page_id):
+        wait()
+        try:
+            status = sendRequest("DELETE", "rest/api/content/" + str(page_id)).status_code
+        except Exception:
+            logger.exception("Could not remove page " + str(page_id))
+            status = None
+        # A page which is already gone needs no deleting.
+        if status is None or not (200 <= status < 300 or status == 404):
+            if status is not None:
+                logger.error("Could not remove page " + str(page_id) + ", Confluence answered " + str(status) + ".")
+            with progress_lock:
+                progress["Failed"].append((page_id, status))
+            return
+        with progress_lock:
+            progress["Deleted"] += 1
+            deleted = progress["Deleted"]
+        if deleted % 25 == 0 or deleted == len(page_ids):
+            logger.info("Cleaned " + str(deleted) + "/" + str(len(page_ids)) + " from " + committee_name)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(remove, page_ids))
+
+    remaining = len(getPagesPaginated(descendants_path))
+
+    if remaining > 0:
+        logger.warning(str(remaining) + " pages remain below the Minutes page of " + committee_name)
+    else:
+        logger.info("Done cleaning " + committee_name)
+
+    return {
+        "Committee Name": committee_name,
+        "Found": len(page_ids),
+        "Deleted": progress["Deleted"],
+        "Failed": progress["Failed"],
+        "Remaining": remaining
+    }
+
+def purgeMinutesFromCommittees(committee_names:list, workers:int = 8, requests_per_second:float = 10.0) -> list:
+    """
+    The bulk version of clean_minutes_from_committees. The rate limit is
+    applied per committee.
+    
+    Returns:
+        list: The dictionary from purgeMinutesFromCommittee for every committee.
+    """
+    return [purgeMinutesFromCommittee(committee_name, workers, requests_per_second) for committee_name in committee_names]
+
+attachment_content_types = {
+    ".gif": "image/gif",
+    ".png": "image/png",
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".pdf": "application/pdf",
+    ".doc": "application/msword",
+    ".xls": "application/vnd.ms-excel",
+}
+
+attachment_chunk_size = 1024 * 1024
+attachment_checksum_prefix = "sha256:"
+
+class MultipartStream:
+    """
+    A multipart/form-data request body which reads its files in chunks as it
+    is sent, instead of loading them whole. It knows its length up front so
+    requests can send a Content-Length header, and can be rewound for retries.
+    """
+
+    def __init__(self, fields:list, files:list, chunk_size:int = attachment_chunk_size):
+        """
+        Args:
+            fields (list): (name, value) pairs of plain form fields.
+            files (list): (name, file_name, file_path, content_type) tuples.
+            chunk_size (int, optional): Defaults to 1MB. Bytes read at a time.
+        """
+        self.boundary = uuid.uuid4().hex
+        self.content_type = "multipart/form-data; boundary=" + self.boundary
+        self.chunk_size = chunk_size
+        self.parts = []
+
+        for name, value in fields:
+            self.parts.append((
+                "--" + self.boundary + "\r\n"
+                + "Content-Disposition: form-data; name=\"" + name + "\"\r\n\r\n"
+                + value + "\r\n").encode("utf-8"))
+
+        for name, file_name, file_path, content_type in files:
+            self.parts.append((
+                "--" + self.boundary + "\r\n"
+                + "Content-Disposition: form-data; name=\"" + name + "\"; filename=\"" + file_name + "\"\r\n"
+                + "Content-Type: " + content_type + "\r\n\r\n").encode("utf-8"))
+            self.parts.append(file_path)
+            self.parts.append(b"\r\n")
+
+        self.parts.append(("--" + self.boundary + "--\r\n").encode("utf-8"))
+
+        self.length = sum(len(part) if isinstance(part, bytes) else os.path.getsize(part) for part in self.parts)
+        self.seek(0)
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __iter__(self):
+        for part in self.parts:
+            if isinstance(part, bytes):
+                yield part
+            else:
+                with open(part, "rb") as part_file:
+                    for chunk in iter(lambda: part_file.read(self.chunk_size), b""):
+                        yield chunk
+
+    def read(self, size:int = -1) -> bytes:
+        while size < 0 or len(self.buffer) < size:
+            chunk = next(self.chunks, None)
+            if chunk is None:
+                break
+            self.buffer += chunk
+
+        if size < 0:
+            data, self.buffer = self.buffer, b""
+        else:
+            data, self.buffer = self.buffer[:size], self.buffer[size:]
+
+        self.position += len(data)
+
+        return data
+
+    def tell(self) -> int:
+        return self.position
+
+    def seek(self, position:int, whence:int = 0) -> int:
+        """
+        Move back to position bytes from the start, so urllib3 can rewind the
+        body when it retries a request.
+        """
+        self.chunks = iter(self)
+        self.buffer = b""
+        self.position = 0
+
+        while self.position < position and self.read(min(self.chunk_size, position - self.position)):
+            pass
+
+        return self.position
+
+def getFileChecksum(file_path:str) -> str:
+    """
+    Get the sha256 hex digest of a file, read in chunks.
+    """
+    digest = hashlib.sha256()
+
+    with open(file_path, "rb") as checksum_file:
+        for chunk in iter(lambda: checksum_file.read(attachment_chunk_size), b""):
+            digest.update(chunk)
+
+    return digest.hexdigest()
+
+def getExistingAttachments(parent_page_id) -> dict:
+    """
+    Get the attachments already on a page, keyed by file name.
+    """
+    attachments = getPagesPaginated("rest/api/content/" + str(parent_page_id) + "/child/attachment", params={"expand": "metadata"})
+    return {attachment["title"]: attachment for attachment in attachments}
+
+def getAttachmentChecksum(attachment:dict) -> str:
+    """
+    Get the checksum recorded in the comment of an attachment uploaded by
+    uploadAttachments, or None for any other attachment.
+    """
+    comment = attachment.get("metadata", {}).get("comment") or attachment.get("extensions", {}).get("comment") or ""
+
+    if not comment.startswith(attachment_checksum_prefix):
+        return None
+
+    return comment[len(attachment_checksum_prefix):]
+
+def postAttachments(post_path:str, files:list) -> list:
+    """
+    Send files to an attachment endpoint in a single streamed multipart
+    request, with the checksum of each file as its comment.
+
+    Args:
+        post_path (str): The attachment endpoint of a page or attachment.
+        files (list): (file_path, checksum) pairs.
+    
+    Returns:
+        list: The attachments Confluence reported back, or None on failure.
+    """
+    fields = [("minorEdit", "true")]
+    parts = []
+
+    for file_path, checksum in files:
+        file_name = os.path.basename(file_path)
+        content_type = attachment_content_types.get(os.path.splitext(file_path)[-1], "application/binary")
+        fields.append(("comment", attachment_checksum_prefix + checksum))
+        parts.append(("file", file_name, file_path, content_type))
+
+    body = MultipartStream(fields, parts)
+
+    confluence_api = getConfluenceAPI()
+
+    response = confluence_api._session.post(
+        confluence_api.url.rstrip("/") + "/" + post_path,
+        data=body,
+        headers={
+            "Content-Type": body.content_type,
             "X-Atlassian-Token": "no-check",
             "Accept": "application/json"
-        }, 
-        files={
-            "file":(file_name, data_file, content_type)
-        })    
+        },
+        auth=(confluence_api.username, confluence_api.password),
+        timeout=confluence_api.timeout,
+        verify=confluence_api.verify_ssl)
+
+    if response.status_code != 200:
+        logger.error("Attachment upload to " + post_path + " failed with " + str(response.status_code) + ".")
+        return None
+
+    return response.json().get("results", [])
+
+def uploadAttachments(file_paths:list, parent_page_id, check_existing:bool = True) -> dict:
+    """
+    Attach files to a page. New files are sent together in one streamed
+    request; a file whose name is already attached is skipped when its
+    checksum matches, and sent as a new version of that attachment when it
+    does not.
+    
+    Args:
+        file_paths (list): The paths of the files to attach.
+        parent_page_id: The page id to attach the files to.
+        check_existing (bool, optional): Defaults to True. Look up the
+        attachments already on the page; pass False for a page just created.
+    
+    Returns:
+        dict: Every file path mapped to "Uploaded", "Skipped", "Missing" or
+        "Failed".
+    """
+    results = {}
+    new_files = []
+
+    existing_attachments = getExistingAttachments(parent_page_id) if check_existing else {}
+
+    for file_path in file_paths:
+
+        if not os.path.exists(file_path):
+            logger.warning("Attachment does not exist " + file_path)
+            results[file_path] = "Missing"
+            continue
+
+        checksum = getFileChecksum(file_path)
+        existing_attachment = existing_attachments.get(os.path.basename(file_path))
+
+        if not existing_attachment:
+            new_files.append((file_path, checksum))
+        elif getAttachmentChecksum(existing_attachment) == checksum:
+            results[file_path] = "Skipped"
+        else:
+            update_path = "rest/api/content/" + str(parent_page_id) + "/child/attachment/" + existing_attachment["id"] + "/data"
+            results[file_path] = "Failed" if postAttachments(update_path, [(file_path, checksum)]) is None else "Uploaded"
+
+    if new_files:
+        uploaded = postAttachments("rest/api/content/" + str(parent_page_id) + "/child/attachment", new_files)
+        uploaded_names = set(attachment["title"] for attachment in uploaded or [])
+
+        for file_path, checksum in new_files:
+            results[file_path] = "Uploaded" if os.path.basename(file_path) in uploaded_names else "Failed"
+
+    return results
+
+def attach_file(file_path, parent_page_id):
+    return uploadAttachments([file_path], parent_page_id)[file_path]
+
+regex_long_form_date = re.compile(r"(January|February|March|April|May|June|July|August|September|October|November|December)\s\d+,\s\d{4}")
+regex_starts_with_number = re.compile(r"(\d\d|\d).\s.+")
+regex_only_number = re.compile(r"(\d\d|\d)(\.|\))\s")
+regex_presenter_label = re.compile(r"(D|I|V)[^(a-z)]")
+confluence_preffered_date_format = "%m/%d/%y"
+file_regex_date_format = "%B %d, %Y"
+
+# The section an agenda file is in after a header or blank line, keyed by the
+# kind of line and then by the section it was in before.
+agenda_section_transitions = {
+    "Agenda Header": {None: "Agenda", "Agenda": "Agenda", "Presenter": "Agenda"},
+    "Presenter Header": {None: "Presenter", "Agenda": "Presenter", "Presenter": "Presenter"},
+    "Blank": {None: None, "Agenda": "Agenda", "Presenter": "Agenda"}
+}
+
+def classifyAgendaLine(line_lower:str) -> str:
+    """
+    Get the kind of a stripped, lowercased agenda line: "Agenda Header",
+    "Presenter Header", "Blank" or "Content".
+    """
+    if "outcome" in line_lower or "agenda" in line_lower:
+        return "Agenda Header"
+    elif len(line_lower) < 1:
+        return "Blank"
+    elif "presenter" in line_lower or "leader" in line_lower:
+        return "Presenter Header"
+    return "Content"
+
+def stripTopicNumbers(topic_done:list, topic:str) -> str:
+    """
+    Strip item numbers from a topic of getAgenda, split into topic_done, the
+    pieces numbers can no longer be stripped from, and topic, the tail they
+    still can. Moves what can no longer change from the tail into
+    topic_done and returns the new tail.
+
+    Stripping again on every line, not only from the new line, also removes
+    numbers which only appear once an earlier one was stripped, such as the
+    "3." left of "3.2) ". A number is at most four characters long, so one
+    can only be exposed starting within three characters before where a
+    number was stripped, or before where the next line is appended.
+    """
+    first_number = regex_only_number.search(topic)
+
+    if not first_number:
+        done_length = len(topic) - 3
+    else:
+        stripped_at = first_number.start()
+        topic = regex_only_number.sub("", topic)
+
+        # The exposed number may reach back into the done pieces.
+        while stripped_at < 3 and topic_done:
+            piece = topic_done.pop()
+            taken = piece[-(3 - stripped_at):]
+            if len(taken) < len(piece):
+                topic_done.append(piece[:-len(taken)])
+            topic = taken + topic
+            stripped_at += len(taken)
+
+        done_length = stripped_at - 3
+
+    if done_length > 0:
+        topic_done.append(topic[:done_length])
+        topic = topic[done_length:]
+
+    return topic
 
 def getAgenda(lines_of_file:list) -> dict:
     """
@@ -115,71 +597,46 @@ def getAgenda(lines_of_file:list) -> dict:
     agenda = []
     presenters = []
     minutes_date = None
-    agendaSection = False
-    presenterSection = False
+    section = None
     line_index = 0
 
-    lastTopic = ""
+    # Numbers are only stripped from the short tail of the topic they can
+    # still appear in, instead of from the whole topic on every line.
+    topic_done = []
+    topic = ""
 
     for line in lines_of_file:
 
-        line_lower = line.lower().strip()
         line_stripped = line.strip()
+        line_kind = classifyAgendaLine(line_stripped.lower())
 
-        if "outcome" in line_lower or "agenda" in line_lower:
-            agendaSection = True
-            presenterSection = False
-            continue
-        elif presenterSection and not agendaSection and len(line_lower) < 1:
-            agendaSection = True
-            presenterSection = False
-            continue
-        elif "presenter" in line_lower or "leader" in line_lower:
-            agendaSection = False
-            presenterSection = True
+        if line_kind != "Content":
+            section = agenda_section_transitions[line_kind][section]
             continue
-        elif "desired outcome" in line_lower:
-            presenterSection = False
-            continue
-        elif len(line_lower) < 1:
-            continue
-        
-        regex_long_form_date = r"(January|February|March|April|May|June|July|August|September|October|November|December)\s\d+,\s\d{4}"
-        regex_starts_with_number = r"(\d\d|\d).\s.+"
-        regex_only_number = r"(\d\d|\d)(\.|\))\s"
-        regex_is_table_label = r"[D|I|V]*\/*[D|I|V]*\/*[D|I|V]"
-        confluence_preffered_date_format = "%m/%d/%y"
-        file_regex_date_format = "%B %d, %Y"
 
         if line_index < 5:
-            search_for_date = re.search(regex_long_form_date, line)
+            search_for_date = regex_long_form_date.search(line)
             if search_for_date:
-                if len(search_for_date.groups()) > 0:
-                    matched_date_str = search_for_date.group(0)
-                    matched_date = datetime.strptime(matched_date_str, file_regex_date_format)
-                    minutes_date = matched_date.strftime(confluence_preffered_date_format)
-
+                matched_date = datetime.strptime(search_for_date.group(0), file_regex_date_format)
+                minutes_date = matched_date.strftime(confluence_preffered_date_format)
 
-        if presenterSection:
-            if len(line_stripped) > 0 and not re.match(r"(D|I|V)[^(a-z)]", line):
+        if section == "Presenter":
+            if not regex_presenter_label.match(line):
                 presenters.append(line_stripped)
-        
-        if agendaSection:
-            if lastTopic == "" and re.match(regex_starts_with_number, line_stripped):
-                lastTopic = line.replace("\n", " ")
-            elif lastTopic != "" and not re.match(regex_starts_with_number, line_stripped):
-                lastTopic += line
-            elif lastTopic != "" and re.match(regex_starts_with_number, line_stripped):
-                cleanedTopic = lastTopic.replace("\n", " ")
-                agenda.append(cleanedTopic.strip())
-                lastTopic = line
-            lastTopic = re.sub(regex_only_number, "", lastTopic)
+
+        elif section == "Agenda":
+            if regex_starts_with_number.match(line_stripped):
+                if topic:
+                    agenda.append(("".join(topic_done) + topic).replace("\n", " ").strip())
+                    topic_done = []
+                    topic = line
+                else:
+                    topic = line.replace("\n", " ")
+            elif topic:
+                topic += line
+            topic = stripTopicNumbers(topic_done, topic)
+
         line_index += 1
-            
-        if lastTopic != "" and len(lastTopic) < 1 and re.match(regex_starts_with_number, lastTopic.strip()):
-            cleanedTopic = lastTopic.replace("\n", " ")
-            cleanedTopic = re.sub(regex_is_table_label, "", cleanedTopic)
-            agenda.append(cleanedTopic.strip())
 
     date_failure = not minutes_date or len(minutes_date) < 1
     presenters_failure = not presenters or len(presenters) < 1
@@ -195,8 +652,8 @@ def getAgenda(lines_of_file:list) -> dict:
         logger.warning("No agenda was retrieved for this file.")
 
     return {
-        "Agenda": agenda if len(agenda) > 0 else [],
-        "Presenters": presenters if len(presenters) > 0 else [],
+        "Agenda": agenda,
+        "Presenters": presenters,
         "Minutes Date": minutes_date if not(minutes_date is None) else "None"
     }
 
@@ -217,41 +674,37 @@ def isName(string):
                 return False
         
 
-def getAttendees(lines_in_file:list) -> dict:
+def recordLines(lines, recorded_lines:list):
     """
-    Read the lines of a file to retrieve the attendees information in
-    dictionary form below:
+    Pass every line of lines through, keeping a copy of each in
+    recorded_lines, so a file can be parsed and kept as raw text in one read.
+    """
+    for line in lines:
+        recorded_lines.append(line)
+        yield line
+
+def iterAttendees(lines_in_file):
+    """
+    Read the lines of a file one at a time and yield the attendees
+    information as soon as each piece is complete, as (section, value) pairs
+    where section is one of "Members Attending", "Members NOT Attending",
+    "Others Attending" or "Topics". Topics are yielded as dictionaries in the
+    form
 
     {
-        "Members Attending": committeeMembersAttending,
-        "Members NOT Attending": committeeMembersNotAttending,
-        "Others Attending": othersAttending,
-        "Topics": committeeTopics
+        "Topic": "A random Topic",
+        "Description": "A random Description"
     }
     
     Args:
-        lines_of_file (list): The lines of a file as a list of strings.
-    
-    Returns:
-        dict: A dictionary.
+        lines_in_file: Any iterable of lines, such as an open file.
     """
 
-    section_committeeMembersAttending = False
-    section_committeeMembersNotAttending = False
-    section_othersAttending = False
-    section_committeeTopics = False
-
-    committeeMembersAttending = []
-    committeeMembersNotAttending = []
-    othersAttending = []
-    committeeTopics = []
-
+    section = None
     lastLine = ""
 
-    topic = {
-        "Topic":"",
-        "Description":""
-    }
+    topic = ""
+    description_pieces = []
 
     for index, line in enumerate(lines_in_file, 0):
 
@@ -261,82 +714,151 @@ def getAttendees(lines_in_file:list) -> dict:
         if len(line_lower) < 1:
             continue
 
-        if "other" in line_lower and "attend" in line_lower and not section_committeeTopics:
-            section_othersAttending = True
-            section_committeeMembersAttending = False
-            section_committeeMembersNotAttending = False
-            section_committeeTopics = False
+        if "other" in line_lower and "attend" in line_lower and section != "Topics":
+            section = "Others Attending"
             continue
-        elif all(["not" in line_lower, "member" in line_lower]) or all(["not" in line_lower, "attend" in line_lower]) or "absent" in line_lower and not section_committeeTopics:
-            section_committeeMembersNotAttending = True
-            section_committeeMembersAttending = False
-            section_othersAttending = False
-            section_committeeTopics = False
+        elif all(["not" in line_lower, "member" in line_lower]) or all(["not" in line_lower, "attend" in line_lower]) or "absent" in line_lower and section != "Topics":
+            section = "Members NOT Attending"
             continue
         elif "attendees" in line_lower or "member attendees" in line_lower or all(["attending" in line_lower, "members" in line_lower]):
-            section_committeeMembersAttending = True
-            section_committeeMembersNotAttending = False
-            section_othersAttending = False
-            section_committeeTopics = False
+            section = "Members Attending"
             continue
         elif not isName(line_lower) and "attend" not in line_lower and "conference" not in line_lower and index > 10:
-            section_committeeTopics = True
-            section_othersAttending = False
-            section_committeeMembersAttending = False
-            section_committeeMembersNotAttending = False
+            section = "Topics"
         
-        if section_committeeMembersAttending:
+        if section == "Topics":
+            if len(lastLine) < 1:
 
-            committeeMembersAttending.append(line_stripped)
+                yield section, {
+                    "Topic": topic,
+                    "Description": "".join(description_pieces).strip()
+                }
 
-        elif section_committeeMembersNotAttending:
+                topic = line_stripped
+                description_pieces = []
 
-            committeeMembersNotAttending.append(line_stripped)
+            else:
+                description_pieces.append(line.replace("\n", " "))
 
-        elif section_othersAttending:
+        elif section:
 
-            othersAttending.append(line_stripped)
+            yield section, line_stripped
 
-        elif section_committeeTopics:
-            if len(lastLine) < 1:
+        lastLine = line_stripped
 
-                topic["Description"] = topic["Description"].strip()
+def getAttendees(lines_in_file) -> dict:
+    """
+    Read the lines of a file to retrieve the attendees information in
+    dictionary form below:
 
-                committeeTopics.append(topic)
+    {
+        "Members Attending": committeeMembersAttending,
+        "Members NOT Attending": committeeMembersNotAttending,
+        "Others Attending": othersAttending,
+        "Topics": committeeTopics
+    }
+    
+    Args:
+        lines_in_file: Any iterable of lines, such as an open file.
+    
+    Returns:
+        dict: A dictionary.
+    """
 
-                topic = {
-                    "Topic": line_stripped,
-                    "Description": ""
-                }
+    attendees = {
+        "Members Attending": [],
+        "Members NOT Attending": [],
+        "Others Attending": [],
+        "Topics": []
+    }
 
-            else:
-                topic["Description"] += line.replace("\n", " ")
-        lastLine = line_stripped
-    
-    attending_failure = not committeeMembersAttending or len(committeeMembersAttending) < 1
-    not_attending_failure = not committeeMembersNotAttending
-    others_attending_failure = not othersAttending
-    topics_failure = not committeeTopics or len(committeeTopics) < 1
+    for section, value in iterAttendees(lines_in_file):
+        attendees[section].append(value)
 
-    if attending_failure:
+    if len(attendees["Members Attending"]) < 1:
         logger.warning("Members attending not retrieved.")
     
-    if not_attending_failure:
+    if not attendees["Members NOT Attending"]:
         logger.warning("Members NOT attending not retrieved.")
 
-    if others_attending_failure:
+    if not attendees["Others Attending"]:
         logger.warning("Others attending not retrieved.")
 
-    if topics_failure:
+    if len(attendees["Topics"]) < 1:
         logger.warning("Topics not retrieved.")
 
-    return {
-        "Members Attending": committeeMembersAttending,
-        "Members NOT Attending": committeeMembersNotAttending,
-        "Others Attending": othersAttending,
-        "Topics": committeeTopics
-    }
+    return attendees
+
+
+class ControlCharacterTable(dict):
+    """
+    A str.translate table which drops every control character (Unicode
+    category C). The category of each code point is looked up the first time
+    it is seen and cached, so translating is a plain dictionary lookup per
+    character after that.
+    """
+
+    def __missing__(self, codepoint:int):
+        replacement = None if unicodedata.category(chr(codepoint))[0] == "C" else codepoint
+        self[codepoint] = replacement
+        return replacement
+
+text_escape_table = ControlCharacterTable({
+    ord("\r"): "&amp;#13;",
+    ord("&"): "&amp;",
+    ord("\f"): "<br/>",
+    ord("\n"): "<br/>",
+    ord("<"): "&lt;",
+    ord(">"): "&gt;"
+})
+
+mojibake_apostrophe = "\u00e2\u20ac\u2122"
+
+def escapeText(text:str) -> str:
+    """
+    Escape a piece of text so it can be placed inside storage format markup:
+    escape ampersands and angle brackets, turn carriage returns, form feeds
+    and newlines into their storage format equivalents and drop control
+    characters, in one pass.
+    """
+    return text.translate(text_escape_table).replace(mojibake_apostrophe, "&apos;")
+
+minutes_block_beginning = "<ac:structured-macro ac:name=\"content-block\" ac:schema-version=\"1\" ac:macro-id=\"f9b73644-be07-43c6-ae3b-6fcfe601a19a\"><ac:parameter ac:name=\"id\">1856492229</ac:parameter><ac:parameter ac:name=\"class\">minutes-action</ac:parameter><ac:rich-text-body><h1>Minutes</h1>"
+
+attending_block_beginning = "<ac:structured-macro ac:name=\"content-block\" ac:schema-version=\"1\" ac:macro-id=\"ea1fb4c5-4895-4807-9985-534d76c03834\"><ac:parameter ac:name=\"not-tabbed\">true</ac:parameter><ac:parameter ac:name=\"id\">1858162090</ac:parameter><ac:parameter ac:name=\"class\">minutes-attending</ac:parameter><ac:rich-text-body><h1>Attending</h1><p><br /></p><table class=\"wrapped\"><colgroup><col style=\"width: 29.0px;\" /></colgroup><tbody><tr><th style=\"text-align: left;\">Members Attending</th></tr>"
+attending_block_not_attending = "</tbody></table><table class=\"wrapped\"><colgroup><col /></colgroup><tbody><tr><th>Members Not Attending</th></tr>"
+attending_block_others_attending = "</tbody></table><table class=\"wrapped\"><colgroup><col /></colgroup><tbody><tr><th>Others Attending</th></tr>"
+
+agenda_block_beginning = "<ac:structured-macro ac:name=\"content-block\" ac:schema-version=\"1\" ac:macro-id=\"338bbab4-ea9a-4278-8b52-6c7ec3ae2398\"><ac:parameter ac:name=\"not-tabbed\">true</ac:parameter><ac:parameter ac:name=\"id\">1856481342</ac:parameter><ac:parameter ac:name=\"class\">minutes-agenda</ac:parameter><ac:rich-text-body><h1>Agenda</h1><table class=\"wrapped\"><colgroup><col /><col /></colgroup><tbody><tr><th>Topic</th><th>Presenter</th></tr>"
+
+status_block_beginning = "<ac:structured-macro ac:name=\"content-block\" ac:schema-version=\"1\" ac:macro-id=\"71c4d118-3da1-4e97-8e1d-f2faf9b45d0f\"><ac:parameter ac:name=\"id\">1856481235</ac:parameter><ac:parameter ac:name=\"class\">minutes-meta</ac:parameter><ac:rich-text-body><ac:structured-macro ac:name=\"details\" ac:schema-version=\"1\" ac:macro-id=\"6561762b-bb94-4120-b624-82bc63b5fd28\"><ac:parameter ac:name=\"id\">minutesandagenda</ac:parameter><ac:rich-text-body><table class=\"wrapped\"><colgroup><col /><col /></colgroup><tbody><tr><th><p>Committee Name</p></th><td><p>"
+status_block_date = "</p></td></tr><tr><th><p>Date</p></th><td><p>"
+status_block_status = "</p></td></tr><tr><th><p>Status</p></th><td><div class=\"content-wrapper\"><ac:structured-macro ac:name=\"minutestatus\" ac:schema-version=\"1\" ac:macro-id=\"1c0ed33a-a4c3-48f4-9a49-4b1a9735e9bf\"><ac:parameter ac:name=\"atlassian-macro-output-type\">INLINE</ac:parameter><ac:rich-text-body><p>"
+status_block_closing = "</p></ac:rich-text-body></ac:structured-macro></div></td></tr></tbody></table></ac:rich-text-body></ac:structured-macro></ac:rich-text-body></ac:structured-macro><ac:structured-macro ac:name=\"content-block\" ac:schema-version=\"1\" ac:macro-id=\"6ace2570-bb93-4cf2-ae05-78089be52874\"><ac:parameter ac:name=\"id\">270750570</ac:parameter><ac:rich-text-body><ac:structured-macro ac:name=\"info\" ac:schema-version=\"1\" ac:macro-id=\"22d834ad-6fbb-45a2-9463-a442198deb8f\"><ac:rich-text-body><p>Content on this page has been automatically generated from the source document(s) below.</p></ac:rich-text-body></ac:structured-macro><p><ac:structured-macro ac:name=\"attachments\" ac:schema-version=\"1\" ac:macro-id=\"a4ce25c3-a4d4-46ae-9b67-db7946e86b05\" /></p></ac:rich-text-body></ac:structured-macro>"
+
+minute_beginning = "<ac:structured-macro ac:name=\"content-layer\" ac:schema-version=\"1\" ac:macro-id=\"9dec53ff-ddd1-4959-824f-4f1ae61c797a\"><ac:parameter ac:name=\"id\">1856481233</ac:parameter><ac:rich-text-body><ac:structured-macro ac:name=\"content-column\" ac:schema-version=\"1\" ac:macro-id=\"2c808257-9edf-40b1-a12d-466b68e25950\"><ac:parameter ac:name=\"id\">1856481236</ac:parameter><ac:rich-text-body>"
+
+table_closing = "</tbody></table>"
+block_closing = "</ac:rich-text-body></ac:structured-macro>"
+minute_closing = "</ac:rich-text-body></ac:structured-macro></ac:rich-text-body></ac:structured-macro>"
 
+def iterCommitteeMinutes(topics:list):
+    """
+    Yield the fragments of the committee minutes page block in order.
+    """
+    yield minutes_block_beginning
+
+    for topic in topics:
+        yield "<h2>"
+        yield escapeText(topic["Topic"])
+        yield "</h2>"
+
+        for description in topic["Description"].split("\n\n"):
+            yield "<p>"
+            yield escapeText(description)
+            yield "</p>"
+
+    yield block_closing
 
 def buildCommitteeMinutes(topics:list) -> str:
     """
@@ -353,21 +875,38 @@ def buildCommitteeMinutes(topics:list) -> str:
     Returns:
         str: A page block for committee minutes belonging to a minutes page.
     """
-    beginning = "<ac:structured-macro ac:name=\"content-block\" ac:schema-version=\"1\" ac:macro-id=\"f9b73644-be07-43c6-ae3b-6fcfe601a19a\"><ac:parameter ac:name=\"id\">1856492229</ac:parameter><ac:parameter ac:name=\"class\">minutes-action</ac:parameter><ac:rich-text-body><h1>Minutes</h1>"
-        
-    table = ""
+    return "".join(iterCommitteeMinutes(topics))
 
-    for topic in topics:
-        table += "<h2>" + topic["Topic"] + "</h2>"
+def iterCommitteeAttending(attending:list, notattending:list, otherattending:list):
+    """
+    Yield the fragments of the attending members page block in order.
+    """
+    yield attending_block_beginning
+
+    for attendee in attending:
+        yield "<tr><td colspan=\"1\">"
+        if "\u00e2\u0080\u0093" in attendee:
+            yield escapeText(", ".join(attendee.split("\u00e2\u0080\u0093")))
+        else:
+            yield escapeText(attendee)
+        yield "</td></tr>"
 
-        paragraphs = topic["Description"].split("\n\n")
+    yield attending_block_not_attending
+
+    for notattendee in notattending:
+        yield "<tr><td colspan=\"1\">"
+        yield escapeText(notattendee)
+        yield "</td></tr>"
 
-        for description in paragraphs:
-            table += "<p>" + description + "</p>"
+    yield attending_block_others_attending
 
-    end = "</ac:rich-text-body></ac:structured-macro>"
+    for otherattendee in otherattending:
+        yield "<tr><td colspan=\"1\">"
+        yield escapeText(otherattendee)
+        yield "</td></tr>"
 
-    return beginning + table + end
+    yield table_closing
+    yield block_closing
 
 def buildCommitteeAttending(attending:list, notattending:list, otherattending:list) -> str:
     """
@@ -381,33 +920,23 @@ def buildCommitteeAttending(attending:list, notattending:list, otherattending:li
     Returns:
         str: A page block representing the attending members in a minutes page.
     """
+    return "".join(iterCommitteeAttending(attending, notattending, otherattending))
 
-    beginning = "<ac:structured-macro ac:name=\"content-block\" ac:schema-version=\"1\" ac:macro-id=\"ea1fb4c5-4895-4807-9985-534d76c03834\"><ac:parameter ac:name=\"not-tabbed\">true</ac:parameter><ac:parameter ac:name=\"id\">1858162090</ac:parameter><ac:parameter ac:name=\"class\">minutes-attending</ac:parameter><ac:rich-text-body><h1>Attending</h1><p><br /></p>"
-        
-    table = "<table class=\"wrapped\"><colgroup><col style=\"width: 29.0px;\" /></colgroup><tbody><tr><th style=\"text-align: left;\">Members Attending</th></tr>"
-        
-    for attendee in attending:
-        if "\u00e2\u0080\u0093" in attendee:
-            temp = ", ".join(attendee.split("\u00e2\u0080\u0093"))
-            table += "<tr><td colspan=\"1\">" + temp + "</td></tr>"
-        else:
-            table += "<tr><td colspan=\"1\">" + attendee + "</td></tr>"
-
-    table += "</tbody></table><table class=\"wrapped\"><colgroup><col /></colgroup><tbody><tr><th>Members Not Attending</th></tr>"
-        
-    for notattendee in notattending:
-        table += "<tr><td colspan=\"1\">" + notattendee + "</td></tr>"
-    
-    table += "</tbody></table><table class=\"wrapped\"><colgroup><col /></colgroup><tbody><tr><th>Others Attending</th></tr>"
-        
-    for otherattendee in otherattending:
-        table += "<tr><td colspan=\"1\">" + otherattendee + "</td></tr>"
-            
-    table += "</tbody></table>"
+def iterCommitteeAgenda(agenda:list):
+    """
+    Yield the fragments of the committee agenda page block in order.
+    """
+    yield agenda_block_beginning
 
-    closing = "</ac:rich-text-body></ac:structured-macro>"
+    for topic in agenda:
+        yield "<tr><td colspan=\"1\">"
+        yield escapeText(" - ".join(str(topic["Topic"]).split("\u00e2\u20ac\u201c")))
+        yield "</td><td colspan=\"1\">"
+        yield escapeText(str(topic["Presenter"]))
+        yield "</td></tr>"
 
-    return beginning + table + closing
+    yield table_closing
+    yield block_closing
 
 def buildCommitteeAgenda(agenda:list) -> str:
     """
@@ -424,19 +953,19 @@ def buildCommitteeAgenda(agenda:list) -> str:
     Returns:
         str: A page block of the committee agenda.
     """
+    return "".join(iterCommitteeAgenda(agenda))
 
-    beginning = "<ac:structured-macro ac:name=\"content-block\" ac:schema-version=\"1\" ac:macro-id=\"338bbab4-ea9a-4278-8b52-6c7ec3ae2398\"><ac:parameter ac:name=\"not-tabbed\">true</ac:parameter><ac:parameter ac:name=\"id\">1856481342</ac:parameter><ac:parameter ac:name=\"class\">minutes-agenda</ac:parameter><ac:rich-text-body><h1>Agenda</h1>"
-        
-    table = "<table class=\"wrapped\"><colgroup><col /><col /></colgroup><tbody><tr><th>Topic</th><th>Presenter</th></tr>"
-
-    for topic in agenda:
-        table += "<tr><td colspan=\"1\">" + " - ".join(str(topic["Topic"]).split("\u00e2\u20ac\u201c")) + "</td><td colspan=\"1\">" + str(topic["Presenter"]) + "</td></tr>"
-    
-    table += "</tbody></table>"
-
-    closing = "</ac:rich-text-body></ac:structured-macro>"
-
-    return beginning + table + closing
+def iterCommitteeStatus(committeeName:str, minutes_date:str, committeeStatus:str):
+    """
+    Yield the fragments of the committee status page block in order.
+    """
+    yield status_block_beginning
+    yield escapeText(committeeName)
+    yield status_block_date
+    yield escapeText(minutes_date)
+    yield status_block_status
+    yield escapeText(committeeStatus)
+    yield status_block_closing
 
 def buildCommitteeStatus(committeeName:str, minutes_date:str, committeeStatus:str) -> str:
     """
@@ -451,22 +980,27 @@ def buildCommitteeStatus(committeeName:str, minutes_date:str, committeeStatus:st
     Returns:
         str: A page block represnting the status of a committee.
     """
+    return "".join(iterCommitteeStatus(committeeName, minutes_date, committeeStatus))
 
-    beginning = "<ac:structured-macro ac:name=\"content-block\" ac:schema-version=\"1\" ac:macro-id=\"71c4d118-3da1-4e97-8e1d-f2faf9b45d0f\"><ac:parameter ac:name=\"id\">1856481235</ac:parameter><ac:parameter ac:name=\"class\">minutes-meta</ac:parameter><ac:rich-text-body><ac:structured-macro ac:name=\"details\" ac:schema-version=\"1\" ac:macro-id=\"6561762b-bb94-4120-b624-82bc63b5fd28\"><ac:parameter ac:name=\"id\">minutesandagenda</ac:parameter><ac:rich-text-body>"
-        
-    table = "<table class=\"wrapped\"><colgroup><col /><col /></colgroup><tbody><tr><th><p>Committee Name</p></th><td><p>"
-    table += committeeName + "</p></td></tr><tr><th><p>Date</p></th><td><p>"
-
-    table += minutes_date + "</p></td></tr><tr><th><p>Status</p></th><td><div class=\"content-wrapper\"><ac:structured-macro ac:name=\"minutestatus\" ac:schema-version=\"1\" ac:macro-id=\"1c0ed33a-a4c3-48f4-9a49-4b1a9735e9bf\"><ac:parameter ac:name=\"atlassian-macro-output-type\">INLINE</ac:parameter><ac:rich-text-body><p>"
-    table += committeeStatus + "</p></ac:rich-text-body></ac:structured-macro></div></td></tr></tbody></table>"
-        
-    closing = "</ac:rich-text-body></ac:structured-macro></ac:rich-text-body></ac:structured-macro>"
-
-    attachments = "<ac:structured-macro ac:name=\"content-block\" ac:schema-version=\"1\" ac:macro-id=\"6ace2570-bb93-4cf2-ae05-78089be52874\"><ac:parameter ac:name=\"id\">270750570</ac:parameter><ac:rich-text-body><ac:structured-macro ac:name=\"info\" ac:schema-version=\"1\" ac:macro-id=\"22d834ad-6fbb-45a2-9463-a442198deb8f\"><ac:rich-text-body><p>Content on this page has been automatically generated from the source document(s) below.</p></ac:rich-text-body></ac:structured-macro><p><ac:structured-macro ac:name=\"attachments\" ac:schema-version=\"1\" ac:macro-id=\"a4ce25c3-a4d4-46ae-9b67-db7946e86b05\" /></p></ac:rich-text-body></ac:structured-macro>"
-
-    return beginning + table + closing + attachments
-
-
+def iterMinute(
+    committeeName:str,
+    committeeminutes_date:str,
+    committeeMinutesAttending:list, 
+    committeeMinutesNotAttending:list, 
+    committeeMinutesOtherAttending:list,
+    committeeAgenda:list,
+    committeeTopics:list,
+    committeeMinutesStatus:str = "Approved"):
+    """
+    Yield the fragments of a ConfluencePage in order, without ever holding
+    the whole page in memory.
+    """
+    yield minute_beginning
+    yield from iterCommitteeStatus(committeeName, committeeminutes_date, committeeMinutesStatus)
+    yield from iterCommitteeAgenda(committeeAgenda)
+    yield from iterCommitteeAttending(committeeMinutesAttending, committeeMinutesNotAttending, committeeMinutesOtherAttending)
+    yield from iterCommitteeMinutes(committeeTopics)
+    yield minute_closing
 
 def buildMinute(
     committeeName:str,
@@ -480,19 +1014,35 @@ def buildMinute(
 
     """
     Return a string representation of a ConfluencePage which can be uploaded to
-    Confluence.
+    Confluence. Every text field is escaped with escapeText as it is placed
+    into the markup.
+    """
+    return "".join(iterMinute(
+        committeeName,
+        committeeminutes_date,
+        committeeMinutesAttending,
+        committeeMinutesNotAttending,
+        committeeMinutesOtherAttending,
+        committeeAgenda,
+        committeeTopics,
+        committeeMinutesStatus))
+
+def writeMinute(output, *args, **kwargs) -> int:
     """
+    Write a ConfluencePage straight into output, any object with a write
+    method such as an open file, instead of building it as one string first.
+    Takes the same arguments as buildMinute after output.
     
-    beginning = "<ac:structured-macro ac:name=\"content-layer\" ac:schema-version=\"1\" ac:macro-id=\"9dec53ff-ddd1-4959-824f-4f1ae61c797a\"><ac:parameter ac:name=\"id\">1856481233</ac:parameter><ac:rich-text-body><ac:structured-macro ac:name=\"content-column\" ac:schema-version=\"1\" ac:macro-id=\"2c808257-9edf-40b1-a12d-466b68e25950\"><ac:parameter ac:name=\"id\">1856481236</ac:parameter><ac:rich-text-body>"
-        
-    content = str(buildCommitteeStatus(committeeName, committeeminutes_date, committeeMinutesStatus))
-    content += str(buildCommitteeAgenda(committeeAgenda))
-    content += str(buildCommitteeAttending(committeeMinutesAttending, committeeMinutesNotAttending, committeeMinutesOtherAttending))
-    content += str(buildCommitteeMinutes(committeeTopics))
+    Returns:
+        int: The number of characters written.
+    """
+    written = 0
 
-    closing = "</ac:rich-text-body></ac:structured-macro></ac:rich-text-body></ac:structured-macro>"
-    
-    return beginning + content + closing
+    for fragment in iterMinute(*args, **kwargs):
+        output.write(fragment)
+        written += len(fragment)
+
+    return written
 
 def padMonthOrDay(dateValue:int) -> str:
     """
@@ -515,34 +1065,237 @@ def getMinutesConfluencePage(committeeMinutesParentPageID:str) -> str:
         logger.warning("No committeeMinutesParentPageID supplied.")
         return None
 
-    child_pages = confluence_api.get_child_pages(committeeMinutesParentPageID)
+    for page_tree in getCommitteePageTrees():
+        committee = page_tree["by_id"].get(str(committeeMinutesParentPageID))
+        if committee:
+            if not committee["minutes_page_id"]:
+                logger.warning("This committee contains no Minutes page. " + str(committeeMinutesParentPageID))
+                return None
+            return int(committee["minutes_page_id"])
+
+    child_pages = getPagesPaginated("rest/api/content/" + str(committeeMinutesParentPageID) + "/child/page")
 
     if not child_pages or len(child_pages) < 1:
-        logger.warning("This committee contains no child pages. " + committeeMinutesParentPageID)
+        logger.warning("This committee contains no child pages. " + str(committeeMinutesParentPageID))
         return None
 
     for page in child_pages:
         if "minutes" in page["title"].lower():
             return int(page["id"])
 
-    logger.warning("This committee contains no Minutes page. " + committeeMinutesParentPageID)
+    logger.warning("This committee contains no Minutes page. " + str(committeeMinutesParentPageID))
     return None
 
-def sanatizeControlCharacters(characters):
-    return "".join(ch for ch in characters if unicodedata.category(ch)[0] != "C")
+def enableParseCache(database_path:str, max_entries:int = 50000):
+    """
+    Keep the parsed agenda and minutes files in a SQLite file from now on,
+    so files unchanged since an earlier run are not parsed again.
+    
+    Args:
+        database_path (str): The SQLite file.
+        max_entries (int, optional): Defaults to 50000. Parsed files kept
+        before the least recently used are evicted.
+    
+    Returns:
+        parse_cache.ParseCache: The cache.
+    """
+    global parse_cache
+
+    import parse_cache as parse_cache_module
 
-def uploadCommitteeMinute(committeeMinutesAgendaFilePath:str, committeeMinutesTopicsFilePath:str, commmitteeMinutesParentPageID:str, committee_name:str, committeeSpaceID:str = "COMM"):
+    if parse_cache is None:
+        parse_cache = parse_cache_module.ParseCache(database_path, max_entries)
+
+    return parse_cache
+
+def getExtractedText(pdf_path:str) -> str:
     """
-    Build a ConfluencePage using parameters and upload that page to the correct
-    space and page.
+    Get the text of a PDF, extracting it with pdf_text only when neither
+    this run nor the parse cache has seen a PDF with the same checksum.
+    """
+    import pdf_text
+
+    checksum = getFileChecksum(pdf_path)
+
+    with extracted_texts_lock:
+        text = extracted_texts.get(checksum)
+
+    if text is None and parse_cache:
+        text = parse_cache.getByChecksum(checksum, "pdftext", pdf_text.extractor_version)
+
+    if text is not None:
+        return text
+
+    text = pdf_text.extractText(pdf_path)
+
+    # The parse cache already keeps the text across runs and processes, so
+    # only hold on to it here without one.
+    if parse_cache:
+        parse_cache.putByChecksum(checksum, "pdftext", pdf_text.extractor_version, text)
+    else:
+        with extracted_texts_lock:
+            extracted_texts[checksum] = text
+
+    return text
+
+def extractMissingText(committees:list = None, workers:int = None) -> dict:
+    """
+    Extract the text of every minutes and agenda PDF without a text file
+    ahead of parsing, running workers extractor processes at once, so the
+    text is ready by the time the minutes are rendered.
+
+    {
+        "Extracted": extracted_count,
+        "Failed": [(pdf_path, reason)]
+    }
+
     Args:
-        committeeMinutesAgendaFilePath (str): File path of the minutes file.
-        committeeMinutesTopicsFilePath (str): File path of the agenda file.
-        commmitteeMinutesParentPageID (str): Confluence Page ID of a parent.
-        committeeSpaceID (str, optional): Defaults to "COMM". The committees spaceID.
+        committees (list, optional): Defaults to getCommittees(). The
+        committee folder paths.
+        workers (int, optional): Defaults to the number of CPUs. PDFs
+        extracted at once.
+
+    Returns:
+        dict: A dictionary like above.
+    """
+    results = {
+        "Extracted": 0,
+        "Failed": []
+    }
+
+    pdf_paths = []
+
+    for committee in committees or getCommittees():
+        committee_index = getCommitteeIndex(committee)
+        if committee_index:
+            for text_file in committee_index["Extract"]:
+                pdf_paths.append(os.path.join(committee_index["Path"], committee_index["PDFs"][text_file]))
+
+    if not pdf_paths:
+        return results
+
+    start = time.perf_counter()
+
+    # Every extraction runs in its own extractor process, so threads are
+    # enough to keep workers of them busy.
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 1) as pool:
+        extractions = [(pdf_path, pool.submit(getExtractedText, pdf_path)) for pdf_path in pdf_paths]
+
+        for pdf_path, extraction in extractions:
+            try:
+                extraction.result()
+                results["Extracted"] += 1
+            except Exception as error:
+                logger.error("Failed extracting the text of " + pdf_path + ": " + str(error))
+                results["Failed"].append((pdf_path, str(error)))
+
+    logger.info("Extracted the text of " + str(results["Extracted"]) + " PDFs in " + ("%.2f" % (time.perf_counter() - start)) + " seconds, " + str(len(results["Failed"])) + " failed.")
+
+    return results
+
+def getSourcePath(file_path:str) -> str:
+    """
+    Get the file the lines of a text file are read from: the text file
+    itself, or the PDF of the same name when there is no text file.
+    """
+    if not file_path or os.path.exists(file_path):
+        return file_path
+
+    pdf_path = os.path.splitext(file_path)[0] + ".pdf"
+
+    return pdf_path if os.path.exists(pdf_path) else file_path
+
+def readSourceLines(source_path:str):
+    """
+    Yield the lines of a text file, or of the text extracted from a PDF,
+    without writing the extracted text anywhere. Extracted text is split
+    the way a text file is read, only at line endings, and not also at the
+    form feeds pdftotext puts between pages as str.splitlines would.
+    """
+    if isFileEXT(source_path, "pdf"):
+        yield from io.StringIO(getExtractedText(source_path), newline=None)
+        return
+
+    with open(source_path, "r", encoding="utf-8") as source_file:
+        yield from source_file
+
+def parseAgendaFile(file_path:str) -> dict:
+    """
+    Get the getAgenda result of an agenda file, from the parse cache when
+    the file has not changed since it was last parsed. When the agenda only
+    exists as a PDF, its extracted text is parsed instead.
+    """
+    file_path = getSourcePath(file_path)
+    file_stat = os.stat(file_path) if parse_cache else None
+
+    if parse_cache:
+        agenda = parse_cache.get(file_path, "agenda", parser_version, file_stat)
+        if agenda is not None:
+            return agenda
+
+    agenda = getAgenda(measureLines(readSourceLines(file_path)))
+
+    if parse_cache:
+        parse_cache.put(file_path, "agenda", parser_version, agenda, file_stat)
+
+    return agenda
+
+def parseMinutesFile(file_path:str) -> tuple:
+    """
+    Get the getAttendees result of a minutes file along with its raw text,
+    from the parse cache when the file has not changed since it was last
+    parsed. When the minutes only exist as a PDF, its extracted text is
+    parsed instead.
+    
+    Returns:
+        tuple: An (attendees, minutes_text) tuple.
+    """
+    file_path = getSourcePath(file_path)
+    file_stat = os.stat(file_path) if parse_cache else None
+
+    if parse_cache:
+        parsed = parse_cache.get(file_path, "attendees", parser_version, file_stat)
+        if parsed is not None:
+            return parsed["Attendees"], parsed["Text"]
+
+    minutes_lines = []
+
+    attendees = getAttendees(recordLines(measureLines(readSourceLines(file_path)), minutes_lines))
+
+    minutes_text = "".join(minutes_lines)
+
+    if parse_cache:
+        parse_cache.put(file_path, "attendees", parser_version, {"Attendees": attendees, "Text": minutes_text}, file_stat)
+
+    return attendees, minutes_text
+
+def getCommitteeMinuteFiles(committeeMinutesAgendaFilePath:str, committeeMinutesTopicsFilePath:str, committee_name:str) -> dict:
+    """
+    Get the paths of every file making up a minutes page, along with its date
+    and title.
+
+    {
+        "Title": title,
+        "Minutes Date": minute_date,
+        "Agenda Text": agenda_txt_path,
+        "Minutes Text": minutes_txt_path,
+        "Agenda PDF": agenda_pdf_path,
+        "Minutes PDF": minutes_pdf_path
+    }
+
+    The agenda or minutes paths are None when that file name is empty, and
+    the PDF paths are None when the archive index has no such PDF.
+
+    Args:
+        committeeMinutesAgendaFilePath (str): File path of the agenda file.
+        committeeMinutesTopicsFilePath (str): File path of the minutes file.
+        committee_name (str): The name of the committee.
+
+    Returns:
+        dict: A dictionary like above.
     """
 
-    committee_base_url = credentials.getCommitteesDirectory()
+    committee_base_url = getCommitteesDirectory()
 
     if not committeeMinutesAgendaFilePath:
         committeeMinutesAgendaFilePath = ""
@@ -550,8 +1303,8 @@ def uploadCommitteeMinute(committeeMinutesAgendaFilePath:str, committeeMinutesTo
     if not committeeMinutesTopicsFilePath:
         committeeMinutesTopicsFilePath = ""
 
-    committee_minutes_file_name_no_ext = committeeMinutesTopicsFilePath.split("\\")[-1].split(".")[0]
-    committee_agenda_file_name_no_ext = committeeMinutesAgendaFilePath.split("\\")[-1].split(".")[0]
+    committee_minutes_file_name_no_ext = os.path.basename(committeeMinutesTopicsFilePath).split(".")[0]
+    committee_agenda_file_name_no_ext = os.path.basename(committeeMinutesAgendaFilePath).split(".")[0]
 
     pdf_extension = ".pdf"
     txt_extension = ".txt"
@@ -566,33 +1319,72 @@ def uploadCommitteeMinute(committeeMinutesAgendaFilePath:str, committeeMinutesTo
     minute_date[2] = padYear(minute_date[2])
     minute_date = "/".join(minute_date)
 
-    committee_file_path = "\\".join([committee_base_url, committee_name])
-
-    attendees_file_path_txt = "\\".join([committee_file_path, committee_agenda_file_name_no_ext]) + txt_extension
-    minutes_file_path_txt = "\\".join([committee_file_path, committee_minutes_file_name_no_ext]) + txt_extension
-
-    attendees_file_path_pdf = "\\".join([committee_file_path, committee_agenda_file_name_no_ext]) + pdf_extension
-    minutes_file_path_pdf = "\\".join([committee_file_path, committee_minutes_file_name_no_ext]) + pdf_extension
+    committee_file_path = os.path.join(committee_base_url, committee_name)
 
     committee_agenda_empty = len(committee_agenda_file_name_no_ext) < 1
     committee_minutes_empty = len(committee_minutes_file_name_no_ext) < 1
 
+    agenda_file_path = os.path.join(committee_file_path, committee_agenda_file_name_no_ext)
+    minutes_file_path = os.path.join(committee_file_path, committee_minutes_file_name_no_ext)
+
+    committee_index = getCommitteeIndex(committee_file_path)
+    pdf_files = set(committee_index["PDFs"].values()) if committee_index else set()
+
+    agenda_pdf_found = committee_agenda_file_name_no_ext + pdf_extension in pdf_files
+    minutes_pdf_found = committee_minutes_file_name_no_ext + pdf_extension in pdf_files
+
+    return {
+        "Title": committee_name + " - Minutes - " + minute_date,
+        "Minutes Date": minute_date,
+        "Agenda Text": None if committee_agenda_empty else agenda_file_path + txt_extension,
+        "Minutes Text": None if committee_minutes_empty else minutes_file_path + txt_extension,
+        "Agenda PDF": agenda_file_path + pdf_extension if agenda_pdf_found else None,
+        "Minutes PDF": minutes_file_path + pdf_extension if minutes_pdf_found else None
+    }
+
+def renderCommitteeMinute(committeeMinutesAgendaFilePath:str, committeeMinutesTopicsFilePath:str, committee_name:str) -> dict:
+    """
+    Build a ConfluencePage from a minutes file and its agenda file without
+    touching Confluence.
+
+    {
+        "Title": title,
+        "Payload": payload,
+        "Attachments": [agenda_pdf_path, minutes_pdf_path]
+    }
+
+    Args:
+        committeeMinutesAgendaFilePath (str): File path of the agenda file.
+        committeeMinutesTopicsFilePath (str): File path of the minutes file.
+        committee_name (str): The name of the committee.
+
+    Returns:
+        dict: A dictionary like above.
+    """
+
+    minute_files = getCommitteeMinuteFiles(committeeMinutesAgendaFilePath, committeeMinutesTopicsFilePath, committee_name)
+
+    minute_date = minute_files["Minutes Date"]
+
+    attendees_file_path_txt = minute_files["Agenda Text"]
+    minutes_file_path_txt = minute_files["Minutes Text"]
+
+    committee_agenda_empty = attendees_file_path_txt is None
+    committee_minutes_empty = minutes_file_path_txt is None
+
     attendees = None
     agenda = None
-    attendees_lines = None
-    agenda_lines = None
+    minutes_text = ""
 
     if not committee_agenda_empty:
-        with(open(attendees_file_path_txt, "r", encoding="utf-8")) as agenda_file:
-            agenda_lines = list(line for line in agenda_file)
-            agenda = getAgenda(agenda_lines)
+        with measure("agenda parse"):
+            agenda = parseAgendaFile(attendees_file_path_txt)
     else:
         logger.warning("Attendees object not present.")
 
     if not committee_minutes_empty:
-        with(open(minutes_file_path_txt, "r", encoding="utf-8")) as minutes_file:
-            attendees_lines = list(line for line in minutes_file)
-            attendees = getAttendees(attendees_lines)
+        with measure("attendee parse"):
+            attendees, minutes_text = parseMinutesFile(minutes_file_path_txt)
     else:
         logger.warning("Agenda object not present.")
 
@@ -607,233 +1399,1910 @@ def uploadCommitteeMinute(committeeMinutesAgendaFilePath:str, committeeMinutesTo
 
     if agenda and attendees and len(attendees["Topics"]) > 0:
 
-        parsed_minute = buildMinute(
-            committee_name, 
-            minute_date, 
-            attendees["Members Attending"], 
-            attendees["Members NOT Attending"], 
-            attendees["Others Attending"], 
-            presenters,
-            attendees["Topics"])
+        with measure("render"):
+            payload = buildMinute(
+                committee_name, 
+                minute_date, 
+                attendees["Members Attending"], 
+                attendees["Members NOT Attending"], 
+                attendees["Others Attending"], 
+                presenters,
+                attendees["Topics"])
 
     else:
 
-        with open(minutes_file_path_txt, "r", encoding="utf8") as minute_file_contents:
-            parsed_minute = buildMinute(
+        with measure("render"):
+            payload = buildMinute(
                 committee_name,
                 minute_date,
                 attendees["Members Attending"] if attendees else [], 
                 attendees["Members NOT Attending"] if attendees else [], 
                 attendees["Others Attending"] if attendees else [], 
                 presenters or [],
-                [{"Topic":"Topics", "Description": "".join(minute_file_contents)}]
+                [{"Topic":"Topics", "Description": minutes_text}]
             )
 
 
-    title = committee_name + " - Minutes - " + minute_date
+    return {
+        "Title": minute_files["Title"],
+        "Payload": payload,
+        "Attachments": [path for path in [minute_files["Agenda PDF"], minute_files["Minutes PDF"]] if path]
+    }
 
-    payload = parsed_minute.replace("\r", "&#13;").replace("&", "&amp;").replace("â€™", "&apos;").replace("\f", "<br/>").replace("\n", "<br/>")
-    payload = sanatizeControlCharacters(payload)
+def enableJournal(journal_path:str = journal_file_path, resume:bool = False):
+    """
+    Record the progress of every minute uploaded from now on in a checkpoint
+    journal.
+    
+    Args:
+        journal_path (str, optional): Defaults to journal_file_path.
+        resume (bool, optional): Defaults to False. Continue from the records
+        already in the journal, skipping completed minutes and finishing
+        partially uploaded ones; otherwise start a new journal.
+    
+    Returns:
+        journal.CheckpointJournal: The journal.
+    """
+    global checkpoint_journal
 
-    minutes_child_page = getMinutesConfluencePage(commmitteeMinutesParentPageID)
+    import journal
 
-    if not minutes_child_page:
-        logger.error("Could not retrieve the 'Minutes' child page from parent.")
-        return
- 
-    resulting_page = confluence_api.create_page(committeeSpaceID, title, payload, int(minutes_child_page))
+    if checkpoint_journal is None:
+        checkpoint_journal = journal.CheckpointJournal(journal_path, resume)
 
-    try:
-        resulting_page_id = resulting_page["id"]
-        logger.info("Successfully uploaded " + resulting_page_id + ".")
-    except KeyError:
-        logger.warning("Confluence Page already exists.")
+    return checkpoint_journal
 
-    try:
-        confluence_api.set_page_label(resulting_page_id, "minutes")
-    except UnboundLocalError:
-        logger.error("Can't set label to page.")
+def recordCheckpoint(journal_key:str, state:str, page_id:str = None):
+    """
+    Record that a minute reached state when the checkpoint journal is enabled.
+    """
+    if checkpoint_journal and journal_key:
+        checkpoint_journal.record(journal_key, state, page_id)
 
-    try:
-        attach_file(attendees_file_path_pdf, int(resulting_page_id))
-        attach_file(minutes_file_path_pdf, int(resulting_page_id))
-    except UnboundLocalError:
-        logger.error("Can't upload attachments to page.")
-
-def getPageIDFromCommitteeName(committee_name:str, committee_parent_page_id:int = 1278261):
-    committees = confluence_api.request(
-        method="GET",
-        path="rest/api/content/" + str(committee_parent_page_id) + "/child/page"
-    )
+def getCompletedPageID(journal_key:str) -> str:
+    """
+    Get the page id of a minute the checkpoint journal shows as completely
+    uploaded, or None.
+    """
+    if not checkpoint_journal or not checkpoint_journal.isComplete(journal_key):
+        return None
 
-    if committees.status_code == 200:
-        committees = committees.json()["results"]
-        committee_ids = list(committee["id"] for committee in committees if committee_name.lower() in committee["title"].lower())
+    return checkpoint_journal.get(journal_key)["Page ID"]
 
-        if len(committee_ids) < 1:
-            logger.warning("No committees exist with that name on Confluence. " + committee_name)
-            return None
-        elif len(committee_ids) > 1:
-            logger.warning("More than one committe with that name on Confluence." + committee_name)
-            return None
-        else:
-            return committee_ids[0]
-    else:
-        return None
-    return None
+def findPageID(space:str, title:str) -> str:
+    """
+    Get the id of the page with a title in a space, or None when there is none.
+    """
+    response = getConfluenceAPI().get("rest/api/content", params={"spaceKey": space, "title": title, "type": "page"})
 
-def getCommitteesFromFileSystem() -> list:
+    results = (response or {}).get("results", [])
+
+    return results[0]["id"] if results else None
+
+def uploadCommitteeMinute(committeeMinutesAgendaFilePath:str, committeeMinutesTopicsFilePath:str, commmitteeMinutesParentPageID:str, committee_name:str, committeeSpaceID:str = "COMM"):
     """
-    Get a list of committee folder paths within the given parentDirectory.
+    Build a ConfluencePage using parameters and upload that page to the correct
+    space and page. A minute the checkpoint journal shows as completely
+    uploaded is skipped.
+    Args:
+        committeeMinutesAgendaFilePath (str): File path of the minutes file.
+        committeeMinutesTopicsFilePath (str): File path of the agenda file.
+        commmitteeMinutesParentPageID (str): Confluence Page ID of a parent.
+        committeeSpaceID (str, optional): Defaults to "COMM". The committees spaceID.
 
-        parentDirectory (str, optional): Defaults to
-    "/home/njennings/minutes_pdfs". The path to the output of the committee downloads.
-    
     Returns:
-        list: A list of absolute folder paths for each committee.
+        str: The id of the uploaded page, or None when nothing was uploaded.
     """
 
-    parent_directory = credentials.getCommitteesDirectory()
+    journal_key = getManifestKey(committee_name, committeeMinutesTopicsFilePath, committeeMinutesAgendaFilePath)
+    completed_page_id = getCompletedPageID(journal_key)
 
-    return (
-        "\\".join([parent_directory, folder]) 
-        for folder in os.listdir(parent_directory) 
-        if os.path.isdir("\\".join([parent_directory, folder]))
-    )
+    if completed_page_id:
+        logger.info("Already uploaded " + committeeMinutesTopicsFilePath + " as " + completed_page_id + ".")
+        return completed_page_id
 
-def getFilesFromCommittee(committee:str) -> list:
+    with measureMinute(committee_name, os.path.basename(committeeMinutesTopicsFilePath or "")):
+
+        minute = renderCommitteeMinute(committeeMinutesAgendaFilePath, committeeMinutesTopicsFilePath, committee_name)
+
+        return publishCommitteeMinute(minute, commmitteeMinutesParentPageID, committeeSpaceID, journal_key)
+
+def createPage(space:str, title:str, payload:str, parent_id, labels:list = minute_labels) -> CreatedPage:
     """
-    Get a list of files within a given committee folder path.
+    Create a page with its labels in a single request, by sending them in
+    the metadata of the page. Labels the server did not apply from the
+    metadata are set one request each afterwards.
     
     Args:
-        committee (str): A committee folder path.
+        space (str): The space key.
+        title (str): The page title.
+        payload (str): The storage format body.
+        parent_id: The page id of the parent page.
+        labels (list, optional): Defaults to minute_labels. Global labels.
     
     Returns:
-        list: A list of files with absolute paths within a committee folder.
+        CreatedPage: The outcome; "Exists" when a page with the title is
+        already in the space.
     """
-    return ("/".join([committee, committeeFile]) for committeeFile in os.listdir(committee))
+    confluence_api = getConfluenceAPI()
+
+    data = {
+        "type": "page",
+        "title": title,
+        "space": {"key": space},
+        "ancestors": [{"type": "page", "id": parent_id}],
+        "body": {
+            "storage": {
+                "value": payload,
+                "representation": "storage"
+            }
+        },
+        "metadata": {
+            "labels": [{"prefix": "global", "name": label} for label in labels]
+        }
+    }
 
-def getDateFromFile(file_name:str) -> list:
+    response = confluence_api._session.post(
+        confluence_api.url.rstrip("/") + "/rest/api/content",
+        json=data,
+        params={"expand": "metadata.labels"},
+        headers={"Accept": "application/json"},
+        auth=(confluence_api.username, confluence_api.password),
+        timeout=confluence_api.timeout,
+        verify=confluence_api.verify_ssl)
 
-    regex_valid_date = r"\d{1,2}(\/|-|_)\d{1,2}(\/|-|_)(\d{4}|\d{2})"
-    regex_date_seperators = r"-|\/|_"
+    try:
+        page = response.json() or {}
+    except ValueError:
+        page = {}
 
-    results = re.search(regex_valid_date, file_name)
+    created_page = getCreatedPage(response.status_code, page)
 
-    if not results:
-        return []
+    if created_page.status == "Created":
+        for label in labels:
+            if label not in getAppliedLabels(page):
+                confluence_api.set_page_label(page["id"], label)
 
-    if len(results.groups()) > 0:
-        first_occurrence = results.group(0)
-        return re.split(regex_date_seperators, first_occurrence)
+    return created_page
+
+def getCreatedPage(status_code:int, page:dict) -> CreatedPage:
+    """
+    Get the outcome of a request creating a page from its status and body.
+    Only a 400 saying the title is taken counts as "Exists"; any other
+    response without a page is "Failed".
+    """
+    page = page or {}
+
+    if status_code == 200 and "id" in page:
+        return CreatedPage("Created", page["id"], None)
+
+    message = str(page.get("message", ""))
+
+    if status_code == 400 and "already exists" in message.lower():
+        return CreatedPage("Exists", None, message)
+
+    return CreatedPage("Failed", None, str(status_code) + " " + message)
+
+def getAppliedLabels(page:dict) -> set:
+    """
+    Get the names of the labels in the metadata of a page created with them.
+    """
+    return {label.get("name") for label in page.get("metadata", {}).get("labels", {}).get("results", [])}
+
+def publishCommitteeMinute(minute:dict, commmitteeMinutesParentPageID:str, committeeSpaceID:str = "COMM", journal_key:str = None):
+    """
+    Upload a page built by renderCommitteeMinute below the "Minutes" page of
+    a committee with its label, and attach its PDFs.
+
+    With the checkpoint journal enabled and a journal_key, every step is
+    recorded, and a minute an earlier run left partially uploaded is
+    finished on its existing page instead of being created again. When the
+    earlier run died during the create, the page is found by its title.
+    Args:
+        minute (dict): A dictionary from renderCommitteeMinute.
+        commmitteeMinutesParentPageID (str): Confluence Page ID of a parent.
+        committeeSpaceID (str, optional): Defaults to "COMM". The committees spaceID.
+        journal_key (str, optional): Defaults to None. The getManifestKey of
+        the minute, for the checkpoint journal.
+
+    Returns:
+        str: The id of the uploaded page, or None when nothing was uploaded.
+
+    Raises:
+        RuntimeError: When the page was created but a file could not be
+        attached to it.
+    """
+    checkpoint = checkpoint_journal.get(journal_key) if checkpoint_journal and journal_key else None
+
+    page_id = checkpoint["Page ID"] if checkpoint else None
+    labeled = bool(checkpoint) and checkpoint["State"] in ("labeled", "attached")
+
+    if page_id:
+        logger.info("Resuming " + minute["Title"] + " on page " + page_id + ".")
 
-def padYear(year:str):
-    if len(str(year)) == 2 and year[0] == "0":
-        return "20" + str(year)
     else:
-        return str(year)
+        with measure("page lookup"):
+            minutes_child_page = getMinutesConfluencePage(commmitteeMinutesParentPageID)
+
+        if not minutes_child_page:
+            logger.error("Could not retrieve the 'Minutes' child page from parent.")
+            return
+
+        recordCheckpoint(journal_key, "parsed")
+
+        with measure("create"):
+            created_page = createPage(committeeSpaceID, minute["Title"], minute["Payload"], int(minutes_child_page))
+
+        if created_page.status == "Exists" and checkpoint:
+            with measure("page lookup"):
+                page_id = findPageID(committeeSpaceID, minute["Title"])
+            if page_id:
+                logger.info("Recovered page " + page_id + " created by an earlier run for " + minute["Title"] + ".")
+        elif created_page.status == "Created":
+            page_id = created_page.page_id
+            labeled = True
+
+        if not page_id:
+            if created_page.status == "Exists":
+                logger.warning("Confluence Page already exists.")
+            else:
+                logger.error("Could not create " + minute["Title"] + ": " + str(created_page.reason))
+            return None
 
+        recordCheckpoint(journal_key, "created", page_id)
 
-def getFilesWithSimilarDate(file_name:str, agendas_list:list) -> list:
+    if not labeled:
+        with measure("label"):
+            for label in minute_labels:
+                getConfluenceAPI().set_page_label(page_id, label)
 
-    minute_date = getDateFromFile(file_name)
+    if not checkpoint or checkpoint["State"] in ("parsed", "created"):
+        recordCheckpoint(journal_key, "labeled", page_id)
 
-    if len(minute_date) < 1:
-        logger.warning(file_name + " has no date.")
-        return []
+    with measure("attach"):
+        attachments = uploadAttachments(minute["Attachments"], int(page_id), check_existing=checkpoint is not None)
 
-    minute_month = minute_date[0]
-    minute_day = minute_date[1]
-    minute_year = padYear(minute_date[2])
+    failed_attachments = [os.path.basename(file_path) for file_path, status in attachments.items() if status == "Failed"]
 
-    matches = []
+    # The page is left labeled in the journal, so a resumed run attaches the
+    # files again instead of counting the minute as done.
+    if failed_attachments:
+        raise RuntimeError("Could not attach " + ", ".join(failed_attachments) + " to page " + page_id + ".")
 
-    for agenda in agendas_list:
+    recordCheckpoint(journal_key, "attached", page_id)
 
-        agenda_date = getDateFromFile(agenda)
+    record = metrics_recorder.getRecord() if metrics_recorder else None
 
-        if len(agenda_date) < 1:
-            continue
+    if record is not None:
+        logger.info("Successfully uploaded " + page_id + " in " + str(record["Requests"]) + " requests.")
+    else:
+        logger.info("Successfully uploaded " + page_id + ".")
+
+    return page_id
 
-        agenda_month = agenda_date[0]
-        agenda_day = agenda_date[1]
-        agenda_year = padYear(agenda_date[2])
+def hashFiles(file_paths:list, base_directory:str = None) -> str:
+    """
+    Get a sha256 hex digest over the names and contents of every file which
+    exists in file_paths. With a base_directory, names are taken relative to
+    it, so the digest does not change when the whole directory is moved.
+    """
+    digest = hashlib.sha256()
 
-        if (minute_month == agenda_month 
-        and minute_day  == agenda_day
-        and minute_year == agenda_year):
-            matches.append(agenda)
+    for file_path in dict.fromkeys(file_paths):
+        if not file_path or not os.path.exists(file_path):
+            continue
+        file_name = os.path.relpath(file_path, base_directory).replace(os.sep, "/") if base_directory else file_path
+        digest.update(file_name.encode("utf-8"))
+        with open(file_path, "rb") as source_file:
+            for chunk in iter(lambda: source_file.read(1024 * 1024), b""):
+                digest.update(chunk)
 
-    return matches
+    return digest.hexdigest()
 
-def mergeMatches():
+def hashMinute(minute:dict) -> str:
     """
-    The test method for pairing a minutes file with an agenda file for
-    eventually merging into a single page on Confluence.
+    Get a sha256 hex digest of the title and payload of a rendered minute.
     """
-    committees = getCommitteesFromFileSystem()
+    return hashlib.sha256((minute["Title"] + "\n" + minute["Payload"]).encode("utf-8")).hexdigest()
 
-    for committee in committees:
+def loadManifest(manifest_path:str = manifest_file_path) -> dict:
+    """
+    Read the sync manifest, or get an empty one when it does not exist yet.
 
-        committee_pieces = committee.split("\\")
-    
-        if len(committee_pieces) < 1:
-            logger.critical("No committee name collected from " + committee)
-            continue 
+    {
+        "committee|minutes file|agenda file": {
+            "Source Hash": source_hash,
+            "Render Hash": render_hash,
+            "Page ID": page_id
+        }
+    }
+    """
+    if not os.path.exists(manifest_path):
+        return {}
 
-        committee_name = committee_pieces[-1]
+    with open(manifest_path, "r", encoding="utf-8") as manifest_file:
+        return json.load(manifest_file)
 
-        if committee_name in ["Guaranty Funds Information Systems", "IT Advisory & Governance"]:
-            continue
+def saveManifest(manifest:dict, manifest_path:str = manifest_file_path):
+    """
+    Write the sync manifest, replacing the old one only once the new one is
+    completely written.
+    """
+    temporary_path = manifest_path + ".tmp"
+
+    with open(temporary_path, "w", encoding="utf-8") as manifest_file:
+        json.dump(manifest, manifest_file, indent=2, sort_keys=True)
+
+    os.replace(temporary_path, manifest_path)
 
-        minutes = getMinutesFromFolder(committee)
-        agendas = getAgendasFromFolder(committee)
+def getManifestKey(committee_name:str, minutes_file:str, agenda_file:str) -> str:
+    return "|".join([committee_name, minutes_file or "", agenda_file or ""])
 
-        for file in minutes:
+def updatePage(page_id:str, title:str, payload:str, version:int = None):
+    """
+    Replace the title and storage body of an existing page with a new version.
+    
+    Args:
+        page_id (str): The page to update.
+        title (str): The new title.
+        payload (str): The new storage format body.
+        version (int, optional): Defaults to None. The current version of the
+        page when already known, saving a request to look it up.
+    
+    Returns:
+        str: The id of the updated page, or None when it could not be updated.
+    """
+    if version is None:
+        page = getConfluenceAPI().get("rest/api/content/" + str(page_id), params={"expand": "version"})
 
-            current_file_name = file.split("/")[-1]
-            
-            matches = getFilesWithSimilarDate(file, agendas)
+        if not page or "version" not in page:
+            logger.warning("Could not retrieve page " + str(page_id) + " to update it.")
+            return None
 
-            committee_id = getPageIDFromCommitteeName(committee_name)
+        version = page["version"]["number"]
+
+    resulting_page = getConfluenceAPI().put("rest/api/content/" + str(page_id), data={
+        "id": str(page_id),
+        "type": "page",
+        "title": title,
+        "version": {"number": version + 1},
+        "body": {
+            "storage": {
+                "value": payload,
+                "representation": "storage"
+            }
+        }
+    })
 
-            if len(matches) <= 0:
-                logger.warning("No matches for file " + current_file_name)
-                uploadCommitteeMinute(None, file, committee_id, committee_name)
-            elif len(matches) > 1:
-                logger.warning("More than one match for file " + current_file_name)
-            else:
-                only_match = matches[0]
+    if not resulting_page or "id" not in resulting_page:
+        logger.warning("Could not update page " + str(page_id) + ".")
+        return None
 
-                logger.info("Matching " + current_file_name + " to " + only_match)
+    return resulting_page["id"]
 
-                if not committee_id:
-                    logger.error("Could not get committee_id from name " + committee_name)
-                else:
-                    uploadCommitteeMinute(only_match, file, committee_id, committee_name)
-        logger.info("Completed importing " + committee_name + ".")
-        #debugging.pause()
-
-cleaning_committee_names = [
-        "Accounting Issues Committee",#
-        "Best Practices Committee",
-        "Board Audit Committee",#
-        "Corporate Governance Committee",#
-        "Finance Committee",
-        "Bylaws Committee",#
-        "Communication Committee",#
-        "Coordinating Committee Chairs Committee",#
-        "Core Services Committee",
-        "Education Committee",#
-        "Legal Committee",#
-        "Member Committee Advisory Committee",#
-        "NCIGF Services Committee",#
-        "Nominating Committee",
-        "Operations Committee",#
-        "Public Policy Committee",#
-        "Site Selection Committee",#
-        "Special Funding Committee"
-]
-
-clean_minutes_from_committees(cleaning_committee_names)
-mergeMatches()
\ No newline at end of file
+def syncCommitteeMinute(committeeMinutesAgendaFilePath:str, committeeMinutesTopicsFilePath:str, commmitteeMinutesParentPageID:str, committee_name:str, manifest:dict, committeeSpaceID:str = "COMM") -> str:
+    """
+    Bring the page of one minutes file up to date with the source files and
+    PDFs, skipping it entirely when the manifest shows none of them changed.
+    Pages which already exist are updated in place, and only their missing
+    or changed attachments are uploaded again.
+    
+    Returns:
+        str: One of "Unchanged", "Updated", "Created" or "Failed".
+    """
+    key = getManifestKey(committee_name, committeeMinutesTopicsFilePath, committeeMinutesAgendaFilePath)
+    entry = manifest.get(key, {})
+
+    minute_files = getCommitteeMinuteFiles(committeeMinutesAgendaFilePath, committeeMinutesTopicsFilePath, committee_name)
+    source_hash = hashFiles([
+        getSourcePath(minute_files["Agenda Text"]),
+        getSourcePath(minute_files["Minutes Text"]),
+        minute_files["Agenda PDF"],
+        minute_files["Minutes PDF"]
+    ], getCommitteesDirectory())
+
+    if entry.get("Page ID") and entry.get("Source Hash") == source_hash:
+        return "Unchanged"
+
+    minute = renderCommitteeMinute(committeeMinutesAgendaFilePath, committeeMinutesTopicsFilePath, committee_name)
+    render_hash = hashMinute(minute)
+
+    status = None
+    page_id = entry.get("Page ID")
+
+    if page_id and entry.get("Render Hash") == render_hash:
+        status = "Unchanged"
+    elif page_id and updatePage(page_id, minute["Title"], minute["Payload"]):
+        logger.info("Updated " + minute["Title"] + ".")
+        status = "Updated"
+    else:
+        page_id = publishCommitteeMinute(minute, commmitteeMinutesParentPageID, committeeSpaceID)
+        status = "Created" if page_id else "Failed"
+
+    if status != "Created" and page_id:
+        # A source changed, which may have been one of the PDFs.
+        attachments = uploadAttachments(minute["Attachments"], int(page_id))
+        if "Failed" in attachments.values():
+            logger.error("Could not attach every file to " + page_id + ".")
+            status = "Failed"
+        elif "Uploaded" in attachments.values():
+            logger.info("Updated the attachments of " + minute["Title"] + ".")
+            status = "Updated"
+
+    if not page_id:
+        # The page was uploaded without the manifest, such as by mergeMatches,
+        # so take it over: bring it up to date and finish its attachments.
+        page_id = findPageID(committeeSpaceID, minute["Title"])
+
+        if page_id and updatePage(page_id, minute["Title"], minute["Payload"]):
+            attachments = uploadAttachments(minute["Attachments"], int(page_id))
+            if "Failed" in attachments.values():
+                logger.error("Could not attach every file to " + page_id + ".")
+            else:
+                logger.info("Took over " + minute["Title"] + " on page " + page_id + ".")
+                status = "Updated"
+
+    if page_id and status != "Failed":
+        manifest[key] = {
+            "Source Hash": source_hash,
+            "Render Hash": render_hash,
+            "Page ID": page_id
+        }
+
+    return status
+
+def syncMatches(manifest_path:str = manifest_file_path, committees:list = None) -> dict:
+    """
+    The incremental version of mergeMatches. Instead of re-creating every
+    page, only minutes which are new or whose source files changed since the
+    last sync are created or updated. The manifest is saved after every
+    committee.
+
+    {
+        "Unchanged": [(committee_name, minutes_file)],
+        "Updated": [(committee_name, minutes_file)],
+        "Created": [(committee_name, minutes_file)],
+        "Failed": [(committee_name, minutes_file, reason)]
+    }
+    
+    Returns:
+        dict: A dictionary like above.
+    """
+    manifest = loadManifest(manifest_path)
+
+    results = {
+        "Unchanged": [],
+        "Updated": [],
+        "Created": [],
+        "Failed": []
+    }
+
+    for committee in committees or getCommittees():
+
+        committee_uploads = getCommitteeUploads(committee)
+
+        if not committee_uploads:
+            continue
+
+        committee_name = committee_uploads["Committee Name"]
+
+        for file, reason in committee_uploads["Failed"]:
+            results["Failed"].append((committee_name, file, reason))
+
+        for agenda_file, minutes_file in committee_uploads["Uploads"]:
+            try:
+                status = syncCommitteeMinute(agenda_file, minutes_file, committee_uploads["Committee ID"], committee_name, manifest)
+            except Exception as error:
+                logger.exception("Failed syncing " + minutes_file + " for " + committee_name)
+                results["Failed"].append((committee_name, minutes_file, repr(error)))
+                continue
+
+            if status == "Failed":
+                results["Failed"].append((committee_name, minutes_file, "No page was created."))
+            else:
+                results[status].append((committee_name, minutes_file))
+
+        saveManifest(manifest, manifest_path)
+        logger.info("Completed syncing " + committee_name + ".")
+
+    logger.info(
+        "Synced minutes: " + str(len(results["Created"])) + " created, "
+        + str(len(results["Updated"])) + " updated, "
+        + str(len(results["Unchanged"])) + " unchanged, "
+        + str(len(results["Failed"])) + " failed.")
+
+    return results
+
+regex_macro_id = re.compile(r"\s+ac:(macro-id|schema-version)=\"[^\"]*\"")
+regex_line_break = re.compile(r"<br\s*/?>")
+regex_between_tags = re.compile(r">\s+<")
+regex_whitespace = re.compile(r"\s+")
+
+def normalizeStorage(payload:str) -> str:
+    """
+    Fold a storage format body to a canonical form, so a page Confluence has
+    rewritten compares equal to the payload it was created from: the
+    ac:macro-id and ac:schema-version attributes Confluence adds to macros are
+    dropped, every <br> form becomes <br/>, and whitespace is collapsed.
+    """
+    payload = regex_macro_id.sub("", payload)
+    payload = regex_line_break.sub("<br/>", payload)
+    payload = regex_between_tags.sub("><", payload)
+    return regex_whitespace.sub(" ", payload).strip()
+
+def hashStorage(payload:str) -> str:
+    return hashlib.sha256(normalizeStorage(payload).encode("utf-8")).hexdigest()
+
+def getRemoteMinutes(minutes_page_id, limit:int = 50) -> dict:
+    """
+    Get the title, version and body hash of every page below a "Minutes"
+    page, fetching the bodies limit pages per request.
+
+    {
+        title: {"ID": page_id, "Version": version, "Hash": hashStorage(body)}
+    }
+    """
+    remote_minutes = {}
+
+    for page in getPagesPaginated("rest/api/content/" + str(minutes_page_id) + "/child/page", limit=limit, params={"expand": "body.storage,version"}):
+        remote_minutes[page["title"]] = {
+            "ID": page["id"],
+            "Version": page.get("version", {}).get("number"),
+            "Hash": hashStorage(page.get("body", {}).get("storage", {}).get("value", ""))
+        }
+
+    return remote_minutes
+
+def updateCommitteeMinute(minute:dict, remote_minutes:dict, commmitteeMinutesParentPageID:str, committeeSpaceID:str = "COMM") -> str:
+    """
+    Bring the page of a rendered minute up to date in place: create it when
+    there is no page with its title, update it only when the normalized body
+    differs from the rendered payload, and leave it alone otherwise.
+    
+    Args:
+        minute (dict): A dictionary from renderCommitteeMinute.
+        remote_minutes (dict): The getRemoteMinutes of the committee.
+        commmitteeMinutesParentPageID (str): Confluence Page ID of a parent.
+        committeeSpaceID (str, optional): Defaults to "COMM". The committees spaceID.
+    
+    Returns:
+        str: One of "Unchanged", "Updated", "Created" or "Failed".
+    """
+    remote_minute = remote_minutes.get(minute["Title"])
+
+    if not remote_minute:
+        return "Created" if publishCommitteeMinute(minute, commmitteeMinutesParentPageID, committeeSpaceID) else "Failed"
+
+    if remote_minute["Hash"] == hashStorage(minute["Payload"]):
+        return "Unchanged"
+
+    with measure("update"):
+        page_id = updatePage(remote_minute["ID"], minute["Title"], minute["Payload"], remote_minute["Version"])
+
+    if not page_id:
+        return "Failed"
+
+    logger.info("Updated " + minute["Title"] + ".")
+
+    return "Updated"
+
+def updateMatches(committees:list = None) -> dict:
+    """
+    Update every paired minute in place against what is on Confluence now,
+    without a manifest. The bodies and versions below each committee's
+    "Minutes" page are fetched in batches and compared by normalized hash,
+    so only minutes whose content differs are sent. Page ids and history
+    are kept.
+
+    {
+        "Unchanged": [(committee_name, minutes_file)],
+        "Updated": [(committee_name, minutes_file)],
+        "Created": [(committee_name, minutes_file)],
+        "Failed": [(committee_name, minutes_file, reason)]
+    }
+    
+    Args:
+        committees (list, optional): Defaults to getCommittees(). Committee
+        folder paths to update.
+    
+    Returns:
+        dict: A dictionary like above.
+    """
+    results = {
+        "Unchanged": [],
+        "Updated": [],
+        "Created": [],
+        "Failed": []
+    }
+
+    for committee in committees or getCommittees():
+
+        committee_uploads = getCommitteeUploads(committee)
+
+        if not committee_uploads:
+            continue
+
+        committee_name = committee_uploads["Committee Name"]
+
+        for file, reason in committee_uploads["Failed"]:
+            results["Failed"].append((committee_name, file, reason))
+
+        minutes_page_id = getMinutesConfluencePage(committee_uploads["Committee ID"]) if committee_uploads["Committee ID"] else None
+
+        if not minutes_page_id:
+            for agenda_file, minutes_file in committee_uploads["Uploads"]:
+                results["Failed"].append((committee_name, minutes_file, "No Minutes page on Confluence."))
+            continue
+
+        remote_minutes = getRemoteMinutes(minutes_page_id)
+
+        for agenda_file, minutes_file in committee_uploads["Uploads"]:
+            try:
+                with measureMinute(committee_name, os.path.basename(minutes_file or "")):
+                    minute = renderCommitteeMinute(agenda_file, minutes_file, committee_name)
+                    status = updateCommitteeMinute(minute, remote_minutes, committee_uploads["Committee ID"])
+            except Exception as error:
+                logger.exception("Failed updating " + minutes_file + " for " + committee_name)
+                results["Failed"].append((committee_name, minutes_file, repr(error)))
+                continue
+
+            if status == "Failed":
+                results["Failed"].append((committee_name, minutes_file, "No page was created or updated."))
+            else:
+                results[status].append((committee_name, minutes_file))
+
+        logger.info("Completed updating " + committee_name + ".")
+
+    logger.info(
+        "Updated minutes: " + str(len(results["Created"])) + " created, "
+        + str(len(results["Updated"])) + " updated, "
+        + str(len(results["Unchanged"])) + " unchanged, "
+        + str(len(results["Failed"])) + " failed.")
+
+    return results
+
+def normalizeTitle(title:str) -> str:
+    """
+    Fold a page title to the form used as a key in the committee page tree.
+    """
+    return " ".join(title.lower().split())
+
+def getPagesPaginated(path:str, limit:int = 100, params:dict = None) -> list:
+    """
+    Get every result of a Confluence listing endpoint, following the
+    start/limit pagination instead of stopping at the first page of results.
+    
+    Args:
+        path (str): A listing path such as "rest/api/content/1/child/page".
+        limit (int, optional): Defaults to 100. Results requested per call.
+        params (dict, optional): Defaults to None. Extra query parameters.
+    
+    Returns:
+        list: Every page dictionary returned by the listing.
+
+    Raises:
+        RuntimeError: When Confluence answers a request with anything but a
+        listing, so a failed listing is never mistaken for its end.
+    """
+    pages = []
+    start = 0
+
+    while True:
+        response = sendRequest("GET", path, params=dict(params or {}, start=start, limit=limit))
+
+        try:
+            listing = response.json()
+        except ValueError:
+            listing = None
+
+        if response.status_code != 200 or not isinstance(listing, dict) or "results" not in listing:
+            raise RuntimeError("Could not list " + path + " from " + str(start) + ", Confluence answered " + str(response.status_code) + ".")
+
+        results = listing["results"]
+        pages.extend(results)
+
+        if len(results) < 1 or "next" not in listing.get("_links", {}):
+            break
+
+        start += len(results)
+
+    return pages
+
+def loadCommitteePageTree(committee_parent_page_id:int = committees_parent_page_id) -> dict:
+    """
+    Load the committees -> committee -> "Minutes" page hierarchy from
+    Confluence in one go and index it by normalized title and by page id.
+
+    {
+        "by_id": {committee_id: committee},
+        "by_title": {normalized_title: committee}
+    }
+
+    where every committee is {"id": ..., "title": ..., "minutes_page_id": ...}.
+    
+    Args:
+        committee_parent_page_id (int, optional): Defaults to 1278261. The
+        page holding every committee page.
+    
+    Returns:
+        dict: A dictionary like above.
+
+    Raises:
+        RuntimeError: When one of the listings fails.
+    """
+    page_tree = {
+        "by_id": {},
+        "by_title": {}
+    }
+
+    committees = getPagesPaginated("rest/api/content/" + str(committee_parent_page_id) + "/child/page")
+
+    for committee_page in committees:
+
+        minutes_page_id = None
+
+        for page in getPagesPaginated("rest/api/content/" + str(committee_page["id"]) + "/child/page"):
+            if "minutes" in page["title"].lower():
+                minutes_page_id = page["id"]
+                break
+
+        committee = {
+            "id": str(committee_page["id"]),
+            "title": committee_page["title"],
+            "minutes_page_id": minutes_page_id
+        }
+
+        page_tree["by_id"][committee["id"]] = committee
+        page_tree["by_title"][normalizeTitle(committee["title"])] = committee
+
+    logger.info("Loaded " + str(len(committees)) + " committees from page " + str(committee_parent_page_id) + ".")
+
+    return page_tree
+
+def getCommitteePageTree(committee_parent_page_id:int = committees_parent_page_id) -> dict:
+    """
+    Get the snapshot of the committee page tree, loading it on first use. A
+    load which fails raises before anything is cached, so the next lookup
+    tries again rather than working from a partial tree.
+    """
+    with committee_page_tree_lock:
+        if committee_parent_page_id not in committee_page_trees:
+            committee_page_trees[committee_parent_page_id] = loadCommitteePageTree(committee_parent_page_id)
+        return committee_page_trees[committee_parent_page_id]
+
+def getCommitteePageTrees() -> list:
+    """
+    Get every committee page tree snapshot loaded so far.
+    """
+    with committee_page_tree_lock:
+        return list(committee_page_trees.values())
+
+def invalidateCommitteePageTree(committee_parent_page_id:int = None):
+    """
+    Drop the committee page tree snapshot so the next lookup reloads it.
+    
+    Args:
+        committee_parent_page_id (int, optional): Defaults to None. Only drop
+        the snapshot below this page, or every snapshot when None.
+    """
+    with committee_page_tree_lock:
+        if committee_parent_page_id is None:
+            committee_page_trees.clear()
+        else:
+            committee_page_trees.pop(committee_parent_page_id, None)
+
+def getPageIDFromCommitteeName(committee_name:str, committee_parent_page_id:int = committees_parent_page_id):
+
+    page_tree = getCommitteePageTree(committee_parent_page_id)
+
+    committee = page_tree["by_title"].get(normalizeTitle(committee_name))
+
+    if committee:
+        return committee["id"]
+
+    committee_ids = list(committee["id"] for title, committee in page_tree["by_title"].items() if normalizeTitle(committee_name) in title)
+
+    if len(committee_ids) < 1:
+        logger.warning("No committees exist with that name on Confluence. " + committee_name)
+        return None
+    elif len(committee_ids) > 1:
+        logger.warning("More than one committe with that name on Confluence." + committee_name)
+        return None
+    else:
+        return committee_ids[0]
+
+def getCommitteesFromFileSystem() -> list:
+    """
+    Get a list of committee folder paths within the given parentDirectory.
+
+        parentDirectory (str, optional): Defaults to
+    "/home/njennings/minutes_pdfs". The path to the output of the committee downloads.
+    
+    Returns:
+        list: A list of absolute folder paths for each committee.
+    """
+
+    index = getArchiveIndex()
+
+    return (
+        committee_index["Path"]
+        for committee_index in index["Committees"].values()
+    )
+
+def getCommittees(include:list = None, exclude:list = excluded_committee_names) -> list:
+    """
+    Get the committee folder paths to work on.
+    
+    Args:
+        include (list, optional): Defaults to None. Only these committee
+        names, or every committee when None.
+        exclude (list, optional): Defaults to excluded_committee_names.
+        Committee names to leave out.
+    
+    Returns:
+        list: A list of committee folder paths.
+    """
+    committees = []
+
+    for committee in getCommitteesFromFileSystem():
+        committee_name = os.path.basename(committee)
+        if include and committee_name not in include:
+            continue
+        if exclude and committee_name in exclude:
+            continue
+        committees.append(committee)
+
+    return committees
+
+def scanCommitteeFolder(folder_path:str, modified:int = None) -> dict:
+    """
+    List a committee folder once and classify every file in it.
+
+    {
+        "Path": folder_path,
+        "Modified": modified,
+        "Minutes": [minutes_file],
+        "Agendas": [agenda_file],
+        "PDFs": {text_file: pdf_file},
+        "Dates": {text_file: [month, day, year]},
+        "Extract": [text_file]
+    }
+
+    Minutes and agendas are the .txt files, in folder order. A minutes or
+    agenda PDF without a .txt of the same name is listed under the name its
+    .txt would have, and also in Extract, so its text is extracted from the
+    PDF instead. A text file is only in PDFs when the folder has a PDF of
+    the same name, and only in Dates when its name has a date.
+    
+    Args:
+        folder_path (str): A committee folder path.
+        modified (int, optional): Defaults to the folder's mtime. The folder
+        mtime in nanoseconds, when the caller already has it.
+    
+    Returns:
+        dict: A dictionary like above, or None when the folder is missing.
+    """
+    folder_name = os.path.basename(folder_path)
+
+    try:
+        if modified is None:
+            modified = os.stat(folder_path).st_mtime_ns
+        with os.scandir(folder_path) as entries:
+            file_names = [entry.name for entry in entries if not entry.is_dir()]
+    except FileNotFoundError:
+        logger.critical("No folder exists with the name " + folder_name)
+        return None
+    except NotADirectoryError:
+        logger.critical(folder_name + " is not a directory.")
+        return None
+
+    committee_index = {
+        "Path": folder_path,
+        "Modified": modified,
+        "Minutes": [],
+        "Agendas": [],
+        "PDFs": {},
+        "Dates": {},
+        "Extract": []
+    }
+
+    present = set(file_names)
+
+    for file_name in file_names:
+
+        if isFileEXT(file_name, "pdf"):
+            text_file = file_name.split(".")[0] + ".txt"
+            # The text file name of a PDF with more than one dot would not
+            # lead back to the PDF.
+            if text_file in present or file_name.count(".") > 1:
+                continue
+            file_name = text_file
+            extract = True
+        elif isFileEXT(file_name, "txt"):
+            extract = False
+        else:
+            continue
+
+        if isMinutes(file_name):
+            committee_index["Minutes"].append(file_name)
+        if isAgenda(file_name):
+            committee_index["Agendas"].append(file_name)
+        if not (isMinutes(file_name) or isAgenda(file_name)):
+            continue
+
+        if extract:
+            committee_index["Extract"].append(file_name)
+
+        pdf_file = file_name.split(".")[0] + ".pdf"
+        if pdf_file in present:
+            committee_index["PDFs"][file_name] = pdf_file
+
+        date_key = getDateKey(file_name)
+        if date_key:
+            committee_index["Dates"][file_name] = list(date_key)
+
+    return committee_index
+
+def scanArchive(parent_directory:str, previous:dict = None) -> dict:
+    """
+    Walk the committees folder once with os.scandir, reusing the index of
+    every committee folder whose mtime has not changed since previous.
+
+    {
+        "Version": archive_index_version,
+        "Root": parent_directory,
+        "Committees": {committee_name: scanCommitteeFolder(...)}
+    }
+    
+    Args:
+        parent_directory (str): The folder holding every committee folder.
+        previous (dict, optional): Defaults to None. An earlier index of the
+        same folder.
+    
+    Returns:
+        dict: A dictionary like above.
+    """
+    reusable = {}
+
+    if previous and previous.get("Version") == archive_index_version and previous.get("Root") == parent_directory:
+        reusable = previous["Committees"]
+
+    index = {
+        "Version": archive_index_version,
+        "Root": parent_directory,
+        "Committees": {}
+    }
+
+    rescanned = 0
+
+    with os.scandir(parent_directory) as entries:
+        for entry in sorted(entries, key=lambda entry: entry.name):
+
+            if not entry.is_dir():
+                continue
+
+            modified = entry.stat().st_mtime_ns
+            committee_index = reusable.get(entry.name)
+
+            if not committee_index or committee_index["Modified"] != modified:
+                committee_index = scanCommitteeFolder(entry.path, modified)
+                rescanned += 1
+
+            if committee_index:
+                index["Committees"][entry.name] = committee_index
+
+    logger.info("Indexed " + str(len(index["Committees"])) + " committee folders, " + str(rescanned) + " rescanned.")
+
+    return index
+
+def loadArchiveIndex(index_path:str) -> dict:
+    """
+    Read a saved archive index, or None when there is none or it is unreadable.
+    """
+    if not os.path.exists(index_path):
+        return None
+
+    try:
+        with open(index_path, "r", encoding="utf-8") as index_file:
+            return json.load(index_file)
+    except ValueError:
+        logger.warning("Ignoring the unreadable archive index " + index_path)
+        return None
+
+def saveArchiveIndex(index:dict, index_path:str):
+    """
+    Write the archive index, replacing the old one only once the new one is
+    completely written.
+    """
+    temporary_path = index_path + ".tmp"
+
+    with open(temporary_path, "w", encoding="utf-8") as index_file:
+        json.dump(index, index_file)
+
+    os.replace(temporary_path, index_path)
+
+def getArchiveIndex(refresh:bool = False) -> dict:
+    """
+    Get the index of the committees folder, scanning it on first use. When
+    archive_index_file_path is set the index is kept there between runs, so
+    only committee folders changed since the last run are listed again.
+    
+    Args:
+        refresh (bool, optional): Defaults to False. Scan again even when
+        there is an index in memory.
+    """
+    global archive_index
+
+    parent_directory = getCommitteesDirectory()
+
+    with archive_index_lock:
+
+        if not refresh and archive_index and archive_index["Root"] == parent_directory:
+            return archive_index
+
+        previous = archive_index
+
+        if archive_index_file_path and (not previous or previous["Root"] != parent_directory):
+            previous = loadArchiveIndex(archive_index_file_path)
+
+        archive_index = scanArchive(parent_directory, previous)
+
+        if archive_index_file_path:
+            saveArchiveIndex(archive_index, archive_index_file_path)
+
+        return archive_index
+
+def getCommitteeIndex(committee:str) -> dict:
+    """
+    Get the scanCommitteeFolder index of a committee folder, from the archive
+    index when the folder is inside the committees folder.
+    """
+    parent_directory = os.path.dirname(os.path.normpath(committee))
+
+    if os.path.normpath(parent_directory) == os.path.normpath(getCommitteesDirectory()):
+        committee_index = getArchiveIndex()["Committees"].get(os.path.basename(os.path.normpath(committee)))
+        if committee_index:
+            return committee_index
+
+    return scanCommitteeFolder(committee)
+
+def getFilesFromCommittee(committee:str) -> list:
+    """
+    Get a list of files within a given committee folder path.
+    
+    Args:
+        committee (str): A committee folder path.
+    
+    Returns:
+        list: A list of files with absolute paths within a committee folder.
+    """
+    return (os.path.join(committee, committeeFile) for committeeFile in os.listdir(committee))
+
+def getDateFromFile(file_name:str) -> list:
+
+    regex_valid_date = r"\d{1,2}(\/|-|_)\d{1,2}(\/|-|_)(\d{4}|\d{2})"
+    regex_date_seperators = r"-|\/|_"
+
+    results = re.search(regex_valid_date, file_name)
+
+    if not results:
+        return []
+
+    if len(results.groups()) > 0:
+        first_occurrence = results.group(0)
+        return re.split(regex_date_seperators, first_occurrence)
+
+def padYear(year:str):
+    if len(str(year)) == 2 and year[0] == "0":
+        return "20" + str(year)
+    else:
+        return str(year)
+
+
+def getDateKey(file_name:str) -> tuple:
+    """
+    Get the date in a file name as a canonical (month, day, year) key, so the
+    same date written as 1-5-19 and 01_05_19 gives the same key.
+    
+    Args:
+        file_name (str): A file name containing a date.
+    
+    Returns:
+        tuple: A (month, day, year) tuple, or None when there is no date.
+    """
+    file_date = getDateFromFile(file_name)
+
+    if len(file_date) < 1:
+        return None
+
+    return (int(file_date[0]), int(file_date[1]), padYear(file_date[2]))
+
+def indexFilesByDate(file_names:list, date_keys:dict = None) -> dict:
+    """
+    Parse the date of every file name once and index the files by date key.
+    Files without a date are left out.
+    
+    Args:
+        file_names (list): File names.
+        date_keys (dict, optional): Defaults to None. Already parsed
+        [month, day, year] dates by file name, like the "Dates" of
+        scanCommitteeFolder.
+    
+    Returns:
+        dict: A dictionary of date key to a list of file names.
+    """
+    index = {}
+
+    for file_name in file_names:
+        date_key = getIndexedDateKey(file_name, date_keys)
+        if date_key:
+            index.setdefault(date_key, []).append(file_name)
+
+    return index
+
+def getIndexedDateKey(file_name:str, date_keys:dict = None) -> tuple:
+    """
+    Get the getDateKey of a file name from already parsed dates when given.
+    """
+    if date_keys is None:
+        return getDateKey(file_name)
+
+    date_key = date_keys.get(file_name)
+
+    return tuple(date_key) if date_key else None
+
+def pairMinutesWithAgendas(minutes_list:list, agendas_list:list, date_keys:dict = None) -> dict:
+    """
+    Pair every minutes file with the agenda file of the same date in a single
+    pass over both lists.
+
+    {
+        "Matched": [(minutes_file, agenda_file)],
+        "Ambiguous": [(minutes_file, [agenda_file])],
+        "Unmatched": [minutes_file],
+        "Undated": [minutes_file]
+    }
+    
+    Args:
+        minutes_list (list): Minutes file names.
+        agendas_list (list): Agenda file names.
+        date_keys (dict, optional): Defaults to None. Already parsed dates,
+        like the "Dates" of scanCommitteeFolder.
+    
+    Returns:
+        dict: A dictionary like above.
+    """
+    agendas_by_date = indexFilesByDate(agendas_list, date_keys)
+
+    pairs = {
+        "Matched": [],
+        "Ambiguous": [],
+        "Unmatched": [],
+        "Undated": []
+    }
+
+    for minutes_file in minutes_list:
+
+        date_key = getIndexedDateKey(minutes_file, date_keys)
+
+        if not date_key:
+            pairs["Undated"].append(minutes_file)
+            continue
+
+        matches = agendas_by_date.get(date_key, [])
+
+        if len(matches) < 1:
+            pairs["Unmatched"].append(minutes_file)
+        elif len(matches) > 1:
+            pairs["Ambiguous"].append((minutes_file, list(matches)))
+        else:
+            pairs["Matched"].append((minutes_file, matches[0]))
+
+    return pairs
+
+def getFilesWithSimilarDate(file_name:str, agendas_list:list) -> list:
+
+    minute_date = getDateKey(file_name)
+
+    if not minute_date:
+        logger.warning(file_name + " has no date.")
+        return []
+
+    return indexFilesByDate(agendas_list).get(minute_date, [])
+
+def getCommitteeUploads(committee:str, resolve_ids:bool = True) -> dict:
+    """
+    Pair every minutes file of a committee folder with its agenda file.
+
+    {
+        "Committee Name": committee_name,
+        "Committee ID": committee_id,
+        "Uploads": [(agenda_file, minutes_file)],
+        "Failed": [(minutes_file, reason)]
+    }
+    
+    Args:
+        committee (str): A committee folder path.
+        resolve_ids (bool, optional): Defaults to True. Look up the committee
+        page on Confluence; when False "Committee ID" is None.
+    
+    Returns:
+        dict: A dictionary like above, or None when the committee is skipped.
+    """
+    committee_name = os.path.basename(committee)
+
+    if len(committee_name) < 1:
+        logger.critical("No committee name collected from " + committee)
+        return None
+
+    committee_index = getCommitteeIndex(committee)
+
+    if not committee_index:
+        return None
+
+    minutes = committee_index["Minutes"]
+    agendas = committee_index["Agendas"]
+
+    committee_id = getPageIDFromCommitteeName(committee_name) if resolve_ids else None
+
+    committee_uploads = {
+        "Committee Name": committee_name,
+        "Committee ID": committee_id,
+        "Uploads": [],
+        "Failed": []
+    }
+
+    pairs = pairMinutesWithAgendas(minutes, agendas, committee_index["Dates"])
+
+    for file in pairs["Undated"]:
+        logger.warning(file + " has no date.")
+        committee_uploads["Uploads"].append((None, file))
+
+    for file in pairs["Unmatched"]:
+        logger.warning("No matches for file " + file)
+        committee_uploads["Uploads"].append((None, file))
+
+    for file, matches in pairs["Ambiguous"]:
+        logger.warning("More than one match for file " + file)
+        committee_uploads["Failed"].append((file, "More than one matching agenda."))
+
+    for file, only_match in pairs["Matched"]:
+
+        logger.info("Matching " + file + " to " + only_match)
+
+        if resolve_ids and not committee_id:
+            logger.error("Could not get committee_id from name " + committee_name)
+            committee_uploads["Failed"].append((file, "No committee page on Confluence."))
+        else:
+            committee_uploads["Uploads"].append((only_match, file))
+
+    folder_order = {file: index for index, file in enumerate(minutes)}
+    committee_uploads["Uploads"].sort(key=lambda upload: folder_order[upload[1]])
+
+    return committee_uploads
+
+def uploadCommitteeMinutes(committee_uploads:dict, results:dict):
+    """
+    Upload the paired minutes of one committee in order, recording every
+    outcome into results.
+    
+    Args:
+        committee_uploads (dict): A dictionary from getCommitteeUploads.
+        results (dict): The dictionary returned by mergeMatches.
+    """
+    committee_name = committee_uploads["Committee Name"]
+
+    for file, reason in committee_uploads["Failed"]:
+        results["Failed"].append((committee_name, file, reason))
+
+    for agenda_file, minutes_file in committee_uploads["Uploads"]:
+        try:
+            page_id = uploadCommitteeMinute(agenda_file, minutes_file, committee_uploads["Committee ID"], committee_name)
+        except Exception as error:
+            logger.exception("Failed uploading " + minutes_file + " for " + committee_name)
+            results["Failed"].append((committee_name, minutes_file, repr(error)))
+            continue
+
+        if page_id:
+            results["Succeeded"].append((committee_name, minutes_file, page_id))
+        else:
+            results["Failed"].append((committee_name, minutes_file, "No page was created."))
+
+    logger.info("Completed importing " + committee_name + ".")
+
+def mergeMatches(workers:int = 1, committees:list = None) -> dict:
+    """
+    Pair every minutes file with an agenda file and merge each pair into a
+    single page on Confluence.
+
+    Committees are uploaded concurrently on a pool of worker threads, which
+    is also the cap on uploads in flight. The minutes of one committee are
+    always uploaded one after another, in folder order.
+
+    {
+        "Succeeded": [(committee_name, minutes_file, page_id)],
+        "Failed": [(committee_name, minutes_file, reason)]
+    }
+    
+    Args:
+        workers (int, optional): Defaults to 1. Committees uploaded at once.
+        committees (list, optional): Defaults to getCommittees(). Committee
+        folder paths to upload.
+    
+    Returns:
+        dict: A dictionary like above.
+    """
+    results = {
+        "Succeeded": [],
+        "Failed": []
+    }
+
+    committees_uploads = (getCommitteeUploads(committee) for committee in committees or getCommittees())
+    committees_uploads = [committee_uploads for committee_uploads in committees_uploads if committee_uploads]
+
+    if workers <= 1:
+        for committee_uploads in committees_uploads:
+            uploadCommitteeMinutes(committee_uploads, results)
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            uploads = [pool.submit(uploadCommitteeMinutes, committee_uploads, results) for committee_uploads in committees_uploads]
+            for upload in uploads:
+                upload.result()
+
+    logger.info("Uploaded " + str(len(results["Succeeded"])) + " minutes, " + str(len(results["Failed"])) + " failed.")
+
+    return results
+
+def initializeRenderWorker(directory:str, index:dict, cache_path:str, cache_size:int, texts:dict, configure_logging:bool):
+    """
+    Set up a render process of mergeMatchesPipelined with the state of the
+    parent process, since a spawned process starts from a fresh import.
+    """
+    global committees_directory, archive_index, parse_cache, extracted_texts
+
+    committees_directory = directory
+    archive_index = index
+    parse_cache = None
+    extracted_texts = texts
+
+    if cache_path:
+        enableParseCache(cache_path, cache_size)
+        # Write when the results hit by this process were used once it exits.
+        multiprocessing.util.Finalize(parse_cache, parse_cache.close, exitpriority=10)
+
+    if configure_logging:
+        debugging.generateLogger()
+
+def renderCommitteeMinuteTimed(committeeMinutesAgendaFilePath:str, committeeMinutesTopicsFilePath:str, committee_name:str) -> tuple:
+    """
+    renderCommitteeMinute, also returning the seconds it took and the parse
+    cache hits and misses it caused, for running in a render process.
+    
+    Returns:
+        tuple: A (minute, seconds, (hits, misses)) tuple.
+    """
+    cache_counts = (parse_cache.hits, parse_cache.misses) if parse_cache else (0, 0)
+
+    start = time.perf_counter()
+    minute = renderCommitteeMinute(committeeMinutesAgendaFilePath, committeeMinutesTopicsFilePath, committee_name)
+    seconds = time.perf_counter() - start
+
+    if parse_cache:
+        cache_counts = (parse_cache.hits - cache_counts[0], parse_cache.misses - cache_counts[1])
+
+    return minute, seconds, cache_counts
+
+def uploadRenderedMinutes(upload_queue:queue.Queue, results:dict):
+    """
+    Publish rendered minutes from upload_queue until it yields None,
+    recording every outcome into results.
+    
+    Args:
+        upload_queue (queue.Queue): (committee_name, committee_id,
+        minutes_file, minute, render_seconds, error, journal_key) tuples.
+        results (dict): The dictionary returned by mergeMatchesPipelined.
+    """
+    while True:
+
+        item = upload_queue.get()
+
+        if item is None:
+            return
+
+        committee_name, committee_id, minutes_file, minute, render_seconds, error, journal_key = item
+
+        if error:
+            results["Failed"].append((committee_name, minutes_file, error))
+            continue
+
+        try:
+            with measureMinute(committee_name, os.path.basename(minutes_file or "")):
+                if metrics_recorder:
+                    metrics_recorder.addTime("render", render_seconds)
+                page_id = publishCommitteeMinute(minute, committee_id, journal_key=journal_key)
+        except Exception as error:
+            logger.exception("Failed uploading " + minutes_file + " for " + committee_name)
+            results["Failed"].append((committee_name, minutes_file, repr(error)))
+            continue
+
+        if page_id:
+            results["Succeeded"].append((committee_name, minutes_file, page_id))
+        else:
+            results["Failed"].append((committee_name, minutes_file, "No page was created."))
+
+def mergeMatchesPipelined(render_workers:int = None, upload_workers:int = 4, queue_size:int = 32, committees:list = None) -> dict:
+    """
+    Pair every minutes file with an agenda file and merge each pair into a
+    single page on Confluence, rendering on a pool of processes while a pool
+    of uploader threads publishes the rendered pages.
+
+    Minutes the checkpoint journal shows as completely uploaded are not
+    rendered again. Every committee is given to one uploader, so the minutes of a committee
+    are still published one after another in folder order. At most
+    queue_size renders are in flight and each uploader holds at most
+    queue_size rendered pages, so a slow Confluence holds up rendering
+    instead of filling memory.
+
+    With metrics enabled the parse and render time of a minute is recorded
+    as a single "render" stage.
+
+    {
+        "Succeeded": [(committee_name, minutes_file, page_id)],
+        "Failed": [(committee_name, minutes_file, reason)]
+    }
+    
+    Args:
+        render_workers (int, optional): Defaults to os.cpu_count(). Render
+        processes.
+        upload_workers (int, optional): Defaults to 4. Uploader threads.
+        queue_size (int, optional): Defaults to 32. The backpressure bound.
+        committees (list, optional): Defaults to getCommittees(). Committee
+        folder paths to upload.
+    
+    Returns:
+        dict: A dictionary like above.
+    """
+    results = {
+        "Succeeded": [],
+        "Failed": []
+    }
+
+    committees_uploads = (getCommitteeUploads(committee) for committee in committees or getCommittees())
+    committees_uploads = [committee_uploads for committee_uploads in committees_uploads if committee_uploads]
+
+    upload_queues = [queue.Queue(maxsize=queue_size) for worker in range(upload_workers)]
+    uploaders = [threading.Thread(target=uploadRenderedMinutes, args=(upload_queue, results), daemon=True) for upload_queue in upload_queues]
+
+    for uploader in uploaders:
+        uploader.start()
+
+    initializer_arguments = (
+        getCommitteesDirectory(),
+        getArchiveIndex(),
+        parse_cache.database_path if parse_cache else None,
+        parse_cache.max_entries if parse_cache else None,
+        extracted_texts,
+        bool(logger.handlers))
+
+    pending = deque()
+
+    def sendOldestRender():
+        upload_queue, committee_name, committee_id, minutes_file, journal_key, render = pending.popleft()
+        try:
+            minute, render_seconds, cache_counts = render.result()
+        except Exception as error:
+            logger.error("Failed rendering " + minutes_file + " for " + committee_name + ": " + repr(error))
+            upload_queue.put((committee_name, committee_id, minutes_file, None, 0.0, repr(error), journal_key))
+        else:
+            # The render processes use the cache, so count their hits here.
+            if parse_cache:
+                parse_cache.count(*cache_counts)
+            upload_queue.put((committee_name, committee_id, minutes_file, minute, render_seconds, None, journal_key))
+
+    try:
+        with ProcessPoolExecutor(max_workers=render_workers, initializer=initializeRenderWorker, initargs=initializer_arguments) as pool:
+
+            for committee_index, committee_uploads in enumerate(committees_uploads):
+
+                committee_name = committee_uploads["Committee Name"]
+                upload_queue = upload_queues[committee_index % upload_workers]
+
+                for file, reason in committee_uploads["Failed"]:
+                    results["Failed"].append((committee_name, file, reason))
+
+                for agenda_file, minutes_file in committee_uploads["Uploads"]:
+
+                    journal_key = getManifestKey(committee_name, minutes_file, agenda_file)
+                    completed_page_id = getCompletedPageID(journal_key)
+
+                    if completed_page_id:
+                        results["Succeeded"].append((committee_name, minutes_file, completed_page_id))
+                        continue
+
+                    if len(pending) >= queue_size:
+                        sendOldestRender()
+
+                    render = pool.submit(renderCommitteeMinuteTimed, agenda_file, minutes_file, committee_name)
+                    pending.append((upload_queue, committee_name, committee_uploads["Committee ID"], minutes_file, journal_key, render))
+
+            while pending:
+                sendOldestRender()
+    finally:
+        for upload_queue in upload_queues:
+            upload_queue.put(None)
+
+        for uploader in uploaders:
+            uploader.join()
+
+    logger.info("Uploaded " + str(len(results["Succeeded"])) + " minutes, " + str(len(results["Failed"])) + " failed.")
+
+    return results
+
+def getRenderFileName(title:str) -> str:
+    """
+    Get a file name for a rendered page from its title.
+    """
+    return re.sub(r"[\\/:*?\"<>|]", "-", title)
+
+def renderCommitteesToDisk(output_directory:str, committees:list = None) -> dict:
+    """
+    Run discovery, pairing, parsing and rendering for every committee without
+    connecting to Confluence, writing each page payload and its metadata to
+    output_directory/<committee>/<title>.xhtml and .json. A summary of the
+    run is written to output_directory/render_summary.json.
+
+    {
+        "Rendered": rendered,
+        "Failed": [(committee_name, minutes_file, reason)],
+        "Seconds": seconds,
+        "Committees": {committee_name: {"Rendered": rendered, "Seconds": seconds}}
+    }
+    
+    Args:
+        output_directory (str): The folder to write the rendered pages to.
+        committees (list, optional): Defaults to getCommittees(). Committee
+        folder paths to render.
+    
+    Returns:
+        dict: A dictionary like above.
+    """
+    summary = {
+        "Rendered": 0,
+        "Failed": [],
+        "Seconds": 0.0,
+        "Committees": {}
+    }
+
+    run_start = time.perf_counter()
+
+    for committee in committees or getCommittees():
+
+        committee_uploads = getCommitteeUploads(committee, resolve_ids=False)
+
+        if not committee_uploads:
+            continue
+
+        committee_name = committee_uploads["Committee Name"]
+        committee_directory = os.path.join(output_directory, committee_name)
+        committee_summary = {
+            "Rendered": 0,
+            "Seconds": 0.0
+        }
+
+        os.makedirs(committee_directory, exist_ok=True)
+
+        for file, reason in committee_uploads["Failed"]:
+            summary["Failed"].append((committee_name, file, reason))
+
+        for agenda_file, minutes_file in committee_uploads["Uploads"]:
+
+            render_start = time.perf_counter()
+
+            try:
+                minute = renderCommitteeMinute(agenda_file, minutes_file, committee_name)
+            except Exception as error:
+                logger.exception("Failed rendering " + minutes_file + " for " + committee_name)
+                summary["Failed"].append((committee_name, minutes_file, repr(error)))
+                continue
+
+            render_seconds = time.perf_counter() - render_start
+            payload = minute["Payload"].encode("utf-8")
+            render_path = os.path.join(committee_directory, getRenderFileName(minute["Title"]))
+
+            with open(render_path + ".xhtml", "wb") as payload_file:
+                payload_file.write(payload)
+
+            with open(render_path + ".json", "w", encoding="utf-8") as metadata_file:
+                json.dump({
+                    "Title": minute["Title"],
+                    "Committee Name": committee_name,
+                    "Minutes File": minutes_file,
+                    "Agenda File": agenda_file,
+                    "Attachments": minute["Attachments"],
+                    "Payload Bytes": len(payload),
+                    "Payload Hash": hashlib.sha256(payload).hexdigest(),
+                    "Render Seconds": render_seconds
+                }, metadata_file, indent=2)
+
+            committee_summary["Rendered"] += 1
+            committee_summary["Seconds"] += render_seconds
+
+        summary["Committees"][committee_name] = committee_summary
+        summary["Rendered"] += committee_summary["Rendered"]
+
+        logger.info("Rendered " + str(committee_summary["Rendered"]) + " minutes for " + committee_name + ".")
+
+    summary["Seconds"] = time.perf_counter() - run_start
+
+    with open(os.path.join(output_directory, "render_summary.json"), "w", encoding="utf-8") as summary_file:
+        json.dump(summary, summary_file, indent=2)
+
+    logger.info("Rendered " + str(summary["Rendered"]) + " minutes in " + str(round(summary["Seconds"], 3)) + " seconds.")
+
+    return summary
+
+async def uploadCommitteeMinuteAsync(client, committeeMinutesAgendaFilePath:str, committeeMinutesTopicsFilePath:str, commmitteeMinutesParentPageID:str, committee_name:str, committeeSpaceID:str = "COMM"):
+    """
+    The coroutine version of uploadCommitteeMinute, sending its requests
+    through client, an AsyncConfluence. Rendering runs on the default
+    executor so the event loop stays free for other uploads.
+
+    Returns:
+        str: The id of the uploaded page, or None when nothing was uploaded.
+    """
+
+    import asyncio
+
+    loop = asyncio.get_running_loop()
+
+    minute = await loop.run_in_executor(None, renderCommitteeMinute, committeeMinutesAgendaFilePath, committeeMinutesTopicsFilePath, committee_name)
+
+    minutes_child_page = getMinutesConfluencePage(commmitteeMinutesParentPageID)
+
+    if not minutes_child_page:
+        logger.error("Could not retrieve the 'Minutes' child page from parent.")
+        return None
+
+    status_code, resulting_page = await client.create_page(committeeSpaceID, minute["Title"], minute["Payload"], int(minutes_child_page), labels=minute_labels)
+    created_page = getCreatedPage(status_code, resulting_page)
+
+    if created_page.status == "Exists":
+        logger.warning("Confluence Page already exists.")
+        return None
+
+    if created_page.status == "Failed":
+        raise RuntimeError("Could not create " + minute["Title"] + ": " + created_page.reason)
+
+    resulting_page_id = created_page.page_id
+
+    applied_labels = getAppliedLabels(resulting_page)
+
+    # The same checksum comments uploadAttachments writes, so a later sync
+    # recognizes these files instead of uploading them again.
+    attachment_paths = [file_path for file_path in minute["Attachments"] if os.path.exists(file_path)]
+    checksums = await asyncio.gather(*(loop.run_in_executor(None, getFileChecksum, file_path) for file_path in attachment_paths))
+    comments = {file_path: attachment_checksum_prefix + checksum for file_path, checksum in zip(attachment_paths, checksums)}
+
+    responses = await asyncio.gather(
+        *(client.set_page_label(resulting_page_id, label) for label in minute_labels if label not in applied_labels),
+        client.attach_files(attachment_paths, int(resulting_page_id), comments))
+
+    attached_names = {attachment.get("title") for attachment in (responses[-1] or {}).get("results", [])}
+    failed_attachments = [os.path.basename(file_path) for file_path in attachment_paths if os.path.basename(file_path) not in attached_names]
+
+    if failed_attachments:
+        raise RuntimeError("Could not attach " + ", ".join(failed_attachments) + " to page " + resulting_page_id + ".")
+
+    logger.info("Successfully uploaded " + resulting_page_id + ".")
+
+    return resulting_page_id
+
+async def mergeMatchesAsync(concurrency:int = 20, committees:list = None) -> dict:
+    """
+    The coroutine version of mergeMatches. Every paired minute is uploaded on
+    one event loop, with at most concurrency uploads in flight over a shared
+    connection pool. Like every other request, they wait for their budget in
+    request_scheduler.
+
+    Returns:
+        dict: The same dictionary as mergeMatches.
+    """
+    import asyncio
+    from async_confluence import AsyncConfluence
+
+    results = {
+        "Succeeded": [],
+        "Failed": []
+    }
+
+    committees_uploads = (getCommitteeUploads(committee) for committee in committees or getCommittees())
+    committees_uploads = [committee_uploads for committee_uploads in committees_uploads if committee_uploads]
+
+    in_flight = asyncio.Semaphore(concurrency)
+
+    async def upload(client, committee_uploads, agenda_file, minutes_file):
+        committee_name = committee_uploads["Committee Name"]
+
+        async with in_flight:
+            try:
+                page_id = await uploadCommitteeMinuteAsync(client, agenda_file, minutes_file, committee_uploads["Committee ID"], committee_name)
+            except Exception as error:
+                logger.exception("Failed uploading " + minutes_file + " for " + committee_name)
+                results["Failed"].append((committee_name, minutes_file, repr(error)))
+                return
+
+        if page_id:
+            results["Succeeded"].append((committee_name, minutes_file, page_id))
+        else:
+            results["Failed"].append((committee_name, minutes_file, "No page was created."))
+
+    async with AsyncConfluence.fromSession(getConfluenceAPI(), pool_size=concurrency, scheduler=request_scheduler) as client:
+
+        uploads = []
+
+        for committee_uploads in committees_uploads:
+            for file, reason in committee_uploads["Failed"]:
+                results["Failed"].append((committee_uploads["Committee Name"], file, reason))
+            for agenda_file, minutes_file in committee_uploads["Uploads"]:
+                uploads.append(upload(client, committee_uploads, agenda_file, minutes_file))
+
+        await asyncio.gather(*uploads)
+
+    logger.info("Uploaded " + str(len(results["Succeeded"])) + " minutes, " + str(len(results["Failed"])) + " failed.")
+
+    return results
+
+def getPairingReport(committees:list = None) -> dict:
+    """
+    Get the result of pairMinutesWithAgendas for every committee folder,
+    keyed by committee name.
+    """
+    report = {}
+
+    for committee in committees or getCommittees():
+        committee_index = getCommitteeIndex(committee)
+        if committee_index:
+            report[os.path.basename(committee)] = pairMinutesWithAgendas(committee_index["Minutes"], committee_index["Agendas"], committee_index["Dates"])
+
+    return report
+
+def parseArguments(arguments:list = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Upload committee minutes and agendas to Confluence.")
+    parser.add_argument("--committees-directory", help="The folder holding every committee folder. Defaults to the one from credentials.")
+    parser.add_argument("--include", action="append", metavar="COMMITTEE", help="Only work on this committee. Can be repeated.")
+    parser.add_argument("--exclude", action="append", metavar="COMMITTEE", help="Leave out this committee. Can be repeated. Defaults to " + ", ".join(excluded_committee_names) + ".")
+    parser.add_argument("--archive-index", help="Keep the index of the committees folder in this file, so unchanged committee folders are not listed again next run.")
+    parser.add_argument("--parse-cache", help="Keep parsed agenda and minutes files in this SQLite file, so unchanged files are not parsed again next run.")
+    parser.add_argument("--parse-cache-size", type=int, default=50000, help="Parsed files kept in --parse-cache before the least recently used are evicted.")
+    parser.add_argument("--extract-workers", type=int, default=None, help="PDFs without a .txt extracted at once before rendering. Defaults to the number of CPUs.")
+    parser.add_argument("--metrics-json", help="Write per-stage timings and request counts to this JSON file.")
+    parser.add_argument("--metrics-prometheus", help="Write per-stage timings and request counts to this Prometheus text file.")
+
+    subparsers = parser.add_subparsers(dest="command")
+    subparsers.required = True
+
+    clean = subparsers.add_parser("clean", help="Delete every page below the Minutes page of committees on Confluence.")
+    clean.add_argument("--all", action="store_true", help="Clean every committee found on disk instead of only --include.")
+    clean.add_argument("--serial", action="store_true", help="Delete one page at a time instead of the bulk purge.")
+    clean.add_argument("--workers", type=int, default=8, help="Deletes in flight at once.")
+    clean.add_argument("--rate", type=float, default=10.0, help="Deletes per second per committee.")
+
+    sync = subparsers.add_parser("sync", help="Upload every paired minute to Confluence. Exits with 1 when any minute failed.")
+    sync.add_argument("--workers", type=int, default=1, help="Committees uploaded at once.")
+    sync.add_argument("--async", dest="use_async", action="store_true", help="Upload on one event loop instead of threads.")
+    sync.add_argument("--pipelined", action="store_true", help="Render on a pool of processes while --workers uploader threads publish.")
+    sync.add_argument("--render-workers", type=int, default=None, help="Render processes with --pipelined. Defaults to the number of CPUs.")
+    sync.add_argument("--queue-size", type=int, default=32, help="Rendered minutes waiting per uploader with --pipelined.")
+    sync.add_argument("--concurrency", type=int, default=20, help="Uploads in flight at once with --async.")
+    sync.add_argument("--incremental", action="store_true", help="Only create or update minutes changed since the last incremental sync.")
+    sync.add_argument("--manifest", default=manifest_file_path, help="The manifest used by --incremental.")
+    sync.add_argument("--update", action="store_true", help="Update existing pages in place where their content differs from the rendered minute, instead of creating every page.")
+    sync.add_argument("--journal", default=journal_file_path, help="The checkpoint journal recording the progress of every minute.")
+    sync.add_argument("--resume", action="store_true", help="Continue an interrupted sync from --journal, skipping completed minutes and finishing partially uploaded ones.")
+
+    render = subparsers.add_parser("render", help="Render every paired minute to disk without connecting to Confluence.")
+    render.add_argument("output_directory", help="The folder to write the rendered pages to.")
+
+    subparsers.add_parser("extract", help="Only extract the text of every minutes and agenda PDF without a .txt, such as to fill --parse-cache ahead of a sync.")
+
+    pair = subparsers.add_parser("pair", help="Report how every minutes file pairs with an agenda file.")
+    pair.add_argument("--output", help="Write the report to this file instead of printing it.")
+
+    return parser.parse_args(arguments)
+
+def main(arguments:list = None):
+    """
+    The command line entry point.
+    """
+    global committees_directory, archive_index_file_path
+
+    arguments = parseArguments(arguments)
+    debugging.generateLogger()
+
+    if arguments.committees_directory:
+        committees_directory = arguments.committees_directory
+
+    if arguments.archive_index:
+        archive_index_file_path = arguments.archive_index
+
+    if arguments.parse_cache:
+        enableParseCache(arguments.parse_cache, arguments.parse_cache_size)
+
+    exclude = excluded_committee_names if arguments.exclude is None else arguments.exclude
+    failed = False
+
+    if arguments.metrics_json or arguments.metrics_prometheus:
+        enableMetrics()
+
+    if arguments.command == "clean":
+        if arguments.all:
+            committee_names = [os.path.basename(committee) for committee in getCommittees(arguments.include, exclude)]
+        elif arguments.include:
+            committee_names = [committee_name for committee_name in arguments.include if committee_name not in exclude]
+        else:
+            logger.error("Name the committees to clean with --include, or pass --all.")
+            return 2
+
+        if arguments.serial:
+            clean_minutes_from_committees(committee_names)
+        else:
+            purgeMinutesFromCommittees(committee_names, arguments.workers, arguments.rate)
+
+    elif arguments.command == "sync":
+        committees = getCommittees(arguments.include, exclude)
+        extractMissingText(committees, arguments.extract_workers)
+
+        if arguments.incremental or arguments.use_async or arguments.update:
+            if arguments.resume:
+                logger.warning("--resume has no effect with --incremental, --async or --update.")
+        else:
+            enableJournal(arguments.journal, arguments.resume)
+
+        if arguments.update:
+            results = updateMatches(committees)
+        elif arguments.incremental:
+            results = syncMatches(arguments.manifest, committees)
+        elif arguments.pipelined:
+            results = mergeMatchesPipelined(arguments.render_workers, arguments.workers, arguments.queue_size, committees)
+        elif arguments.use_async:
+            import asyncio
+            results = asyncio.run(mergeMatchesAsync(arguments.concurrency, committees))
+        else:
+            results = mergeMatches(arguments.workers, committees)
+
+        failed = len(results["Failed"]) > 0
+
+    elif arguments.command == "render":
+        committees = getCommittees(arguments.include, exclude)
+        extractMissingText(committees, arguments.extract_workers)
+        renderCommitteesToDisk(arguments.output_directory, committees)
+
+    elif arguments.command == "extract":
+        failed = len(extractMissingText(getCommittees(arguments.include, exclude), arguments.extract_workers)["Failed"]) > 0
+
+    elif arguments.command == "pair":
+        report = json.dumps(getPairingReport(getCommittees(arguments.include, exclude)), indent=2)
+        if arguments.output:
+            with open(arguments.output, "w", encoding="utf-8") as report_file:
+                report_file.write(report)
+        else:
+            print(report)
+
+    if metrics_recorder:
+        writeMetrics(arguments.metrics_json, arguments.metrics_prometheus)
+
+    if checkpoint_journal:
+        logger.info("Checkpoint journal: " + json.dumps(checkpoint_journal.summary()))
+        checkpoint_journal.close()
+
+    if request_scheduler:
+        logger.info("Request scheduler: " + json.dumps(request_scheduler.summary()))
+
+    if parse_cache:
+        logger.info("Parse cache: " + json.dumps(parse_cache.summary()))
+        parse_cache.close()
+
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,4 +1,4 @@
-import os, sys, logging, urllib3, inspect
+import os, sys, logging, inspect
 
 def pause():
     """
@@ -12,17 +12,29 @@ def clear():
     """
     os.system("cls")
 
+def getLogger() -> logging.Logger:
+    """
+    Get the project logger without configuring any output, so importing a
+    module stays free of side effects. generateLogger() sets up the output.
+    """
+    project_name = os.path.dirname(os.path.realpath(__file__)).split("\\")[-1]
+
+    return logging.getLogger(project_name)
+
 def generateLogger() -> logging.Logger:
 
+    import urllib3
+
     urllib3.disable_warnings()
     log = logging.getLogger('atlassian')
     log.setLevel(logging.CRITICAL)
 
-    project_name = os.path.dirname(os.path.realpath(__file__)).split("\\")[-1]
-
-    logger = logging.getLogger(project_name)
+    logger = getLogger()
     logger.setLevel(logging.INFO)
 
+    if logger.handlers:
+        return logger
+
     stream = logging.StreamHandler()
     stream.setLevel(logging.INFO)
 
@@ -0,0 +1,381 @@
+import argparse, json, random, re, threading, time, uuid
+from email.parser import BytesParser
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+class FakeConfluence:
+    """
+    An in-memory Confluence holding a committees page with a "Minutes" child
+    page below every committee, with just the REST endpoints the uploader
+    uses. Served by FakeConfluenceServer.
+
+    Every request can be slowed by a fixed latency plus random jitter, failed
+    at random with a 500, or throttled with a 429 and Retry-After once the
+    server wide request rate goes over rate_limit. Listings return at most
+    page_limit results per request, however many were asked for.
+    """
+
+    def __init__(self, committee_names:list, root_page_id:int = 1278261, latency:float = 0.0, jitter:float = 0.0, error_rate:float = 0.0,
+        rate_limit:float = None, retry_after:int = 1, page_limit:int = 25, seed:int = None):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+        self.retry_after = retry_after
+        self.page_limit = page_limit
+        self.randomizer = random.Random(seed)
+
+        self.lock = threading.Lock()
+        self.pages = {}
+        self.attachments = {}
+        self.next_id = root_page_id
+        self.root_page_id = str(root_page_id)
+        self.tokens = rate_limit or 0.0
+        self.refilled = time.monotonic()
+        self.stats = {
+            "Requests": 0,
+            "Throttled": 0,
+            "Errors": 0,
+            "Bytes Received": 0,
+            "Endpoints": {}
+        }
+
+        self.addPage("Committees", None, page_id=self.root_page_id)
+
+        for committee_name in committee_names:
+            committee_id = self.addPage(committee_name, self.root_page_id)
+            self.addPage("Minutes", committee_id)
+
+    def createID(self) -> str:
+        with self.lock:
+            self.next_id += 1
+            return str(self.next_id)
+
+    def addPage(self, title:str, parent_id:str, body:str = "", labels:list = None, page_id:str = None) -> str:
+        page_id = page_id or self.createID()
+
+        with self.lock:
+            self.pages[page_id] = {
+                "id": page_id,
+                "title": title,
+                "parent": parent_id,
+                "body": body,
+                "labels": list(labels or []),
+                "version": 1
+            }
+
+        return page_id
+
+    def getChildren(self, page_id:str) -> list:
+        with self.lock:
+            return [page for page in self.pages.values() if page["parent"] == page_id]
+
+    def getDescendants(self, page_id:str) -> list:
+        descendants = []
+        for child in self.getChildren(page_id):
+            descendants.append(child)
+            descendants.extend(self.getDescendants(child["id"]))
+        return descendants
+
+    def admit(self, endpoint:str, body_length:int) -> int:
+        """
+        Count a request and decide whether it is served. Returns 429 when it
+        is throttled, 500 when it fails at random, otherwise None.
+        """
+        with self.lock:
+            self.stats["Requests"] += 1
+            self.stats["Bytes Received"] += body_length
+            self.stats["Endpoints"][endpoint] = self.stats["Endpoints"].get(endpoint, 0) + 1
+
+            if self.rate_limit:
+                now = time.monotonic()
+                self.tokens = min(self.rate_limit, self.tokens + (now - self.refilled) * self.rate_limit)
+                self.refilled = now
+                if self.tokens < 1:
+                    self.stats["Throttled"] += 1
+                    return 429
+                self.tokens -= 1
+
+            if self.error_rate and self.randomizer.random() < self.error_rate:
+                self.stats["Errors"] += 1
+                return 500
+
+            delay = self.latency + (self.randomizer.uniform(0, self.jitter) if self.jitter else 0.0)
+
+        if delay:
+            time.sleep(delay)
+
+        return None
+
+    def paginate(self, items:list, query:dict, path:str) -> dict:
+        start = int(query.get("start", 0))
+        limit = min(int(query.get("limit", self.page_limit)), self.page_limit)
+        results = items[start:start + limit]
+        links = {"next": path + "?start=" + str(start + limit) + "&limit=" + str(limit)} if start + limit < len(items) else {}
+        return {"results": results, "start": start, "limit": limit, "size": len(results), "_links": links}
+
+    def describePage(self, page:dict, expand:str = "") -> dict:
+        description = {"id": page["id"], "type": "page", "title": page["title"]}
+        if "version" in expand:
+            description["version"] = {"number": page["version"]}
+        if "body.storage" in expand:
+            description["body"] = {"storage": {"value": page["body"], "representation": "storage"}}
+        if "metadata.labels" in expand:
+            description["metadata"] = {"labels": {"results": [{"prefix": "global", "name": label} for label in page["labels"]]}}
+        return description
+
+    def describeAttachment(self, attachment:dict) -> dict:
+        return {
+            "id": attachment["id"],
+            "type": "attachment",
+            "title": attachment["title"],
+            "metadata": {"comment": attachment["comment"], "mediaType": attachment["content_type"]},
+            "extensions": {"comment": attachment["comment"], "fileSize": len(attachment["data"])}
+        }
+
+    def handle(self, method:str, path:str, query:dict, headers, body:bytes) -> tuple:
+        """
+        Serve one request.
+
+        Returns:
+            tuple: A (status, json_body) tuple.
+        """
+        pieces = path.strip("/").split("/")
+
+        if pieces[:3] != ["rest", "api", "content"]:
+            return 404, {"statusCode": 404, "message": "No such endpoint"}
+
+        page_id = pieces[3] if len(pieces) > 3 else None
+        page = self.pages.get(page_id) if page_id else None
+        tail = pieces[4:]
+
+        if page_id and page is None:
+            return 404, {"statusCode": 404, "message": "No content with id " + page_id}
+
+        if method == "GET" and not page_id:
+            with self.lock:
+                matches = [self.describePage(page, query.get("expand", "")) for page in self.pages.values() if page["title"] == query.get("title")]
+            return 200, self.paginate(matches, query, path)
+
+        if method == "POST" and not page_id:
+            return self.createPage(json.loads(body or b"{}"), query)
+
+        if method == "GET" and not tail:
+            return 200, self.describePage(page, query.get("expand", ""))
+
+        if method == "PUT" and not tail:
+            return self.updatePage(page, json.loads(body or b"{}"))
+
+        if method == "DELETE" and not tail:
+            with self.lock:
+                self.pages.pop(page_id, None)
+                for child in self.pages.values():
+                    if child["parent"] == page_id:
+                        child["parent"] = None
+            return 204, None
+
+        if method == "GET" and tail == ["child", "page"]:
+            return 200, self.paginate([self.describePage(child, query.get("expand", "")) for child in self.getChildren(page_id)], query, path)
+
+        if method == "GET" and tail == ["descendant", "page"]:
+            return 200, self.paginate([self.describePage(child, query.get("expand", "")) for child in self.getDescendants(page_id)], query, path)
+
+        if method == "POST" and tail == ["label"]:
+            labels = json.loads(body or b"[]")
+            # A single label may be sent on its own, as set_page_label does.
+            if isinstance(labels, dict):
+                labels = [labels]
+            with self.lock:
+                for label in labels:
+                    if label["name"] not in page["labels"]:
+                        page["labels"].append(label["name"])
+                labels = list(page["labels"])
+            return 200, {"results": [{"prefix": "global", "name": label} for label in labels], "size": len(labels)}
+
+        if tail[:2] == ["child", "attachment"]:
+            if method == "GET" and len(tail) == 2:
+                with self.lock:
+                    attachments = [self.describeAttachment(attachment) for attachment in self.attachments.values() if attachment["page"] == page_id]
+                return 200, self.paginate(attachments, query, path)
+            if method == "POST":
+                if headers.get("X-Atlassian-Token") != "no-check":
+                    return 403, {"statusCode": 403, "message": "XSRF check failed"}
+                return self.attach(page_id, tail[2] if len(tail) == 4 and tail[3] == "data" else None, headers.get("Content-Type", ""), body)
+
+        return 404, {"statusCode": 404, "message": "No such endpoint"}
+
+    def createPage(self, data:dict, query:dict) -> tuple:
+        title = data.get("title")
+        ancestors = data.get("ancestors") or [{}]
+        parent_id = str(ancestors[-1].get("id")) if ancestors[-1].get("id") else None
+
+        with self.lock:
+            exists = any(page["title"] == title for page in self.pages.values())
+
+        if exists:
+            return 400, {"statusCode": 400, "message": "A page with this title already exists: A page already exists with the title " + title + " in this space."}
+
+        labels = [label["name"] for label in data.get("metadata", {}).get("labels", [])]
+        page_id = self.addPage(title, parent_id, data.get("body", {}).get("storage", {}).get("value", ""), labels)
+
+        return 200, self.describePage(self.pages[page_id], query.get("expand", ""))
+
+    def updatePage(self, page:dict, data:dict) -> tuple:
+        version = data.get("version", {}).get("number")
+
+        with self.lock:
+            if version != page["version"] + 1:
+                return 409, {"statusCode": 409, "message": "Version must be incremented on update. Current version is: " + str(page["version"])}
+            page["title"] = data.get("title", page["title"])
+            page["body"] = data.get("body", {}).get("storage", {}).get("value", page["body"])
+            page["version"] = version
+
+        return 200, self.describePage(page, "version")
+
+    def attach(self, page_id:str, attachment_id:str, content_type:str, body:bytes) -> tuple:
+        """
+        Store every file of a multipart attachment upload, pairing the n-th
+        comment field with the n-th file.
+        """
+        message = BytesParser().parsebytes(b"Content-Type: " + content_type.encode("latin-1") + b"\r\n\r\n" + body)
+
+        if not message.is_multipart():
+            return 400, {"statusCode": 400, "message": "Expected a multipart body"}
+
+        comments = []
+        files = []
+
+        for part in message.get_payload():
+            name = part.get_param("name", header="content-disposition")
+            if name == "comment":
+                comments.append(part.get_payload(decode=True).decode("utf-8"))
+            elif name == "file":
+                files.append((part.get_filename(), part.get_content_type(), part.get_payload(decode=True)))
+
+        results = []
+
+        with self.lock:
+            for index, (file_name, file_content_type, data) in enumerate(files):
+                if attachment_id:
+                    attachment = self.attachments.get(attachment_id)
+                    if not attachment:
+                        return 404, {"statusCode": 404, "message": "No attachment with id " + attachment_id}
+                else:
+                    existing = [attachment for attachment in self.attachments.values() if attachment["page"] == page_id and attachment["title"] == file_name]
+                    if existing:
+                        return 400, {"statusCode": 400, "message": "Cannot add a new attachment with same file name as an existing attachment: " + file_name}
+                    attachment = {"id": "att" + uuid.uuid4().hex[:12], "page": page_id, "title": file_name}
+                    self.attachments[attachment["id"]] = attachment
+                attachment["comment"] = comments[index] if index < len(comments) else ""
+                attachment["content_type"] = file_content_type
+                attachment["data"] = data
+                results.append(self.describeAttachment(attachment))
+
+        return 200, {"results": results, "size": len(results)}
+
+    def summary(self) -> dict:
+        with self.lock:
+            return json.loads(json.dumps(dict(self.stats, Pages=len(self.pages), Attachments=len(self.attachments))))
+
+class FakeConfluenceHandler(BaseHTTPRequestHandler):
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def readBody(self) -> bytes:
+        if self.headers.get("Transfer-Encoding", "").lower() == "chunked":
+            chunks = []
+            while True:
+                size = int(self.rfile.readline().split(b";")[0].strip(), 16)
+                if size == 0:
+                    self.rfile.readline()
+                    return b"".join(chunks)
+                chunks.append(self.rfile.read(size))
+                self.rfile.readline()
+        return self.rfile.read(int(self.headers.get("Content-Length") or 0))
+
+    def respond(self):
+        confluence = self.server.confluence
+        url = urlparse(self.path)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        body = self.readBody()
+        endpoint = self.command + " " + re.sub(r"/(\d+|att[0-9a-f]+)(?=/|$)", "/{id}", url.path)
+
+        status = confluence.admit(endpoint, len(body))
+
+        if status == 429:
+            response = {"statusCode": 429, "message": "Rate limit exceeded"}
+        elif status == 500:
+            response = {"statusCode": 500, "message": "Injected failure"}
+        else:
+            status, response = confluence.handle(self.command, url.path, query, self.headers, body)
+
+        payload = json.dumps(response).encode("utf-8") if response is not None else b""
+
+        self.send_response(status)
+        if status == 429:
+            self.send_header("Retry-After", str(confluence.retry_after))
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    do_GET = respond
+    do_POST = respond
+    do_PUT = respond
+    do_DELETE = respond
+
+class FakeConfluenceServer(ThreadingHTTPServer):
+    """
+    Serves a FakeConfluence over HTTP on localhost, on a thread of its own
+    when used as a context manager.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, confluence:FakeConfluence, port:int = 0):
+        super().__init__(("127.0.0.1", port), FakeConfluenceHandler)
+        self.confluence = confluence
+        self.thread = None
+
+    @property
+    def url(self) -> str:
+        return "http://127.0.0.1:" + str(self.server_address[1])
+
+    def __enter__(self):
+        self.thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
+        self.server_close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a fake Confluence for the committee uploader.")
+    parser.add_argument("committees", nargs="*", help="Committee page names to create.")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--root-page-id", type=int, default=1278261, help="The id of the page holding every committee page.")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every request.")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Up to this many random seconds added to every request.")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests failed with a 500.")
+    parser.add_argument("--rate-limit", type=float, default=None, help="Requests per second served before throttling with 429.")
+    parser.add_argument("--page-limit", type=int, default=25, help="The most results a listing returns per request.")
+    arguments = parser.parse_args()
+
+    confluence = FakeConfluence(arguments.committees, arguments.root_page_id, arguments.latency, arguments.jitter, arguments.error_rate, arguments.rate_limit, page_limit=arguments.page_limit)
+    server = FakeConfluenceServer(confluence, arguments.port)
+
+    print("Serving a fake Confluence on " + server.url)
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+    print(json.dumps(confluence.summary(), indent=2))
+
+if __name__ == "__main__":
+    main()
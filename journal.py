@@ -0,0 +1,113 @@
+import json, os, threading
+from datetime import datetime
+
+# The states a minute goes through, in order. A minute is complete once attached.
+states = ["parsed", "created", "labeled", "attached"]
+
+class CheckpointJournal:
+    """
+    An append-only JSON lines file recording how far every minute got, so an
+    interrupted run can be resumed where it stopped. Every record is flushed
+    and fsynced before record() returns.
+
+    Each line looks like
+
+    {
+        "Time": time,
+        "Key": key,
+        "State": state,
+        "Page ID": page_id
+    }
+
+    where key names the minute, such as "committee|minutes file|agenda file".
+    """
+
+    def __init__(self, journal_path:str, resume:bool = True):
+        """
+        Args:
+            journal_path (str): The journal file.
+            resume (bool, optional): Defaults to True. Read the records already
+            in the file; otherwise an existing file is moved aside to
+            journal_path + ".previous" and a new one started.
+        """
+        self.journal_path = journal_path
+        self.lock = threading.Lock()
+        self.entries = {}
+
+        if resume:
+            self.load()
+        elif os.path.exists(journal_path):
+            os.replace(journal_path, journal_path + ".previous")
+
+        self.journal_file = open(journal_path, "a", encoding="utf-8")
+
+    def load(self):
+        """
+        Read every record of the journal, keeping the furthest state of each
+        minute. A last line cut short by a crash is ignored.
+        """
+        if not os.path.exists(self.journal_path):
+            return
+
+        with open(self.journal_path, "r", encoding="utf-8") as journal_file:
+            for line in journal_file:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                self.apply(record)
+
+    def apply(self, record:dict):
+        entry = self.entries.setdefault(record["Key"], {
+            "State": None,
+            "Page ID": None
+        })
+
+        if states.index(record["State"]) >= states.index(entry["State"] or states[0]):
+            entry["State"] = record["State"]
+
+        if record.get("Page ID"):
+            entry["Page ID"] = record["Page ID"]
+
+    def record(self, key:str, state:str, page_id:str = None):
+        """
+        Durably record that a minute reached state.
+        """
+        record = {
+            "Time": datetime.now().isoformat(),
+            "Key": key,
+            "State": state,
+            "Page ID": page_id
+        }
+
+        with self.lock:
+            self.journal_file.write(json.dumps(record) + "\n")
+            self.journal_file.flush()
+            os.fsync(self.journal_file.fileno())
+            self.apply(record)
+
+    def get(self, key:str) -> dict:
+        """
+        Get the furthest {"State", "Page ID"} recorded for a minute, or None.
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+            return dict(entry) if entry else None
+
+    def isComplete(self, key:str) -> bool:
+        entry = self.get(key)
+        return bool(entry) and entry["State"] == states[-1]
+
+    def close(self):
+        with self.lock:
+            self.journal_file.close()
+
+    def summary(self) -> dict:
+        """
+        Count the minutes in each state.
+        """
+        with self.lock:
+            counts = {state: 0 for state in states}
+            for entry in self.entries.values():
+                counts[entry["State"]] += 1
+            return counts
@@ -0,0 +1,139 @@
+import argparse, json, logging, os, platform, tempfile, time, datetime
+import committee_upload, benchmark
+from fake_confluence import FakeConfluence, FakeConfluenceServer
+
+def connect(url:str, pool_size:int = committee_upload.http_pool_size):
+    """
+    Point committee_upload at a Confluence url through the same tuned and
+    scheduled session getConfluenceAPI() would build, with fake credentials.
+    """
+    import transport, scheduler
+    from atlassian import Confluence
+
+    committee_upload.request_scheduler = scheduler.RequestScheduler(max_concurrency=pool_size)
+    committee_upload.confluence_api = transport.configureSession(
+        Confluence(url=url, username="load-test", password="load-test"),
+        pool_size=pool_size,
+        scheduler=committee_upload.request_scheduler)
+    committee_upload.invalidateCommitteePageTree()
+
+def runTimed(name:str, function) -> dict:
+    start = time.perf_counter()
+    result = function()
+    seconds = time.perf_counter() - start
+
+    print(name.ljust(32) + ("%.3f" % seconds).rjust(12) + " s")
+
+    return {
+        "Name": name,
+        "Seconds": seconds,
+        "Result": result
+    }
+
+def runLoadTest(root:str, committee_names:list, workers:int = 1, pipelined:bool = False, purge_workers:int = 8, purge_rate:float = 50.0, server_options:dict = None) -> dict:
+    """
+    Upload the archive in root to a fresh fake Confluence, clean it with
+    clean_minutes_from_committees, upload it again and purge it with
+    purgeMinutesFromCommittees, timing every step.
+
+    {
+        "Runs": [{"Name", "Seconds", "Result"}],
+        "Server": FakeConfluence.summary(),
+        "Scheduler": RequestScheduler.summary()
+    }
+
+    Args:
+        root (str): The committees folder.
+        committee_names (list): The committee folder names in root.
+        workers (int, optional): Defaults to 1. Upload workers.
+        pipelined (bool, optional): Defaults to False. Upload with
+        mergeMatchesPipelined instead of mergeMatches.
+        purge_workers (int, optional): Defaults to 8. Deletes in flight.
+        purge_rate (float, optional): Defaults to 50.0. Deletes per second.
+        server_options (dict, optional): FakeConfluence arguments, such as latency.
+    """
+    confluence = FakeConfluence(committee_names, committee_upload.committees_parent_page_id, **(server_options or {}))
+
+    committee_upload.committees_directory = root
+
+    def upload():
+        if pipelined:
+            results = committee_upload.mergeMatchesPipelined(upload_workers=workers)
+        else:
+            results = committee_upload.mergeMatches(workers=workers)
+        return {"Succeeded": len(results["Succeeded"]), "Failed": len(results["Failed"])}
+
+    def clean():
+        committee_upload.clean_minutes_from_committees(committee_names)
+
+    def purge():
+        return committee_upload.purgeMinutesFromCommittees(committee_names, purge_workers, purge_rate)
+
+    with FakeConfluenceServer(confluence) as server:
+
+        connect(server.url)
+
+        runs = [
+            runTimed("upload", upload),
+            runTimed("clean_minutes_from_committees", clean),
+            runTimed("upload again", upload),
+            runTimed("purgeMinutesFromCommittees", purge)
+        ]
+
+    return {
+        "Runs": runs,
+        "Server": confluence.summary(),
+        "Scheduler": committee_upload.request_scheduler.summary()
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the committee uploader end to end against a local fake Confluence.")
+    parser.add_argument("--committees", type=int, default=5, help="Committee folders to generate.")
+    parser.add_argument("--minutes", type=int, default=40, help="Meetings per committee.")
+    parser.add_argument("--topics", type=int, default=8, help="Topics per meeting.")
+    parser.add_argument("--pdf-bytes", type=int, default=64 * 1024, help="Size of every generated PDF.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the generated archive and injected failures.")
+    parser.add_argument("--workers", type=int, default=4, help="Upload workers.")
+    parser.add_argument("--pipelined", action="store_true", help="Upload with mergeMatchesPipelined.")
+    parser.add_argument("--purge-workers", type=int, default=8, help="Deletes in flight while purging.")
+    parser.add_argument("--purge-rate", type=float, default=50.0, help="Deletes per second while purging.")
+    parser.add_argument("--latency", type=float, default=0.02, help="Seconds the server adds to every request.")
+    parser.add_argument("--jitter", type=float, default=0.01, help="Up to this many random seconds the server adds to every request.")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests the server fails with a 500.")
+    parser.add_argument("--rate-limit", type=float, default=None, help="Requests per second the server serves before throttling with 429.")
+    parser.add_argument("--page-limit", type=int, default=25, help="The most results a listing returns per request.")
+    parser.add_argument("--archive", help="Generate the archive here and keep it, instead of a temporary folder.")
+    parser.add_argument("--output", default="load_test_results.json", help="The JSON file to write the results to.")
+    arguments = parser.parse_args()
+
+    committee_upload.logger.setLevel(logging.ERROR)
+
+    server_options = {
+        "latency": arguments.latency,
+        "jitter": arguments.jitter,
+        "error_rate": arguments.error_rate,
+        "rate_limit": arguments.rate_limit,
+        "page_limit": arguments.page_limit,
+        "seed": arguments.seed
+    }
+
+    with tempfile.TemporaryDirectory() as temporary_directory:
+
+        root = arguments.archive or temporary_directory
+        committee_names = benchmark.generateCommitteeArchive(root, arguments.committees, arguments.minutes, arguments.topics, arguments.pdf_bytes, arguments.seed)
+
+        results = runLoadTest(root, committee_names, arguments.workers, arguments.pipelined, arguments.purge_workers, arguments.purge_rate, server_options)
+
+    print(json.dumps(results["Server"], indent=2))
+
+    with open(arguments.output, "w", encoding="utf-8") as output_file:
+        json.dump({
+            "Revision": benchmark.getRevision(),
+            "Python": platform.python_version(),
+            "Timestamp": datetime.datetime.now().isoformat(),
+            "Parameters": vars(arguments),
+            "Results": results
+        }, output_file, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+import json, threading, time
+from contextlib import contextmanager
+
+class MetricsRecorder:
+    """
+    Records how long each stage of uploading a minute takes, and how many
+    HTTP requests and bytes each minute sends, across every thread.
+
+    Stage times are exclusive: time spent in a stage nested inside another,
+    such as "read" while parsing a file, only counts towards the inner stage.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.records = []
+        self.unattributed = {
+            "Requests": 0,
+            "Bytes Sent": 0
+        }
+
+    def getRecord(self) -> dict:
+        return getattr(self.local, "record", None)
+
+    @contextmanager
+    def minute(self, committee_name:str, minute_name:str):
+        """
+        Attribute every stage and request made by this thread inside the
+        block to one minute.
+        """
+        record = {
+            "Committee": committee_name,
+            "Minute": minute_name,
+            "Stages": {},
+            "Requests": 0,
+            "Bytes Sent": 0,
+            "Seconds": 0.0
+        }
+
+        self.local.record = record
+        self.local.stages = []
+        start = time.perf_counter()
+
+        try:
+            yield record
+        finally:
+            record["Seconds"] = time.perf_counter() - start
+            self.local.record = None
+            with self.lock:
+                self.records.append(record)
+
+    def addTime(self, stage_name:str, seconds:float):
+        """
+        Add seconds to a stage of the current minute, taking them out of the
+        stage it is nested in.
+        """
+        record = self.getRecord()
+
+        if record is None:
+            return
+
+        record["Stages"][stage_name] = record["Stages"].get(stage_name, 0.0) + seconds
+
+        if self.local.stages:
+            self.local.stages[-1][1] += seconds
+
+    @contextmanager
+    def stage(self, stage_name:str):
+        """
+        Time the block as a stage of the current minute. Does nothing outside
+        of a minute block.
+        """
+        if self.getRecord() is None:
+            yield
+            return
+
+        frame = [stage_name, 0.0]
+        self.local.stages.append(frame)
+        start = time.perf_counter()
+
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.local.stages.pop()
+            self.addTime(stage_name, elapsed - frame[1])
+            if self.local.stages:
+                self.local.stages[-1][1] += frame[1]
+
+    def timeLines(self, lines, stage_name:str = "read"):
+        """
+        Pass every line of lines through, counting the time spent waiting on
+        each one towards stage_name.
+        """
+        iterator = iter(lines)
+
+        while True:
+            start = time.perf_counter()
+            line = next(iterator, None)
+            self.addTime(stage_name, time.perf_counter() - start)
+            if line is None:
+                return
+            yield line
+
+    def countRequest(self, bytes_sent:int):
+        record = self.getRecord()
+
+        with self.lock:
+            target = record if record is not None else self.unattributed
+            target["Requests"] += 1
+            target["Bytes Sent"] += bytes_sent
+
+    def responseHook(self, response, *args, **kwargs):
+        """
+        A requests response hook counting every request sent on a session.
+        """
+        body = response.request.body
+
+        if body is None:
+            bytes_sent = 0
+        elif isinstance(body, str):
+            bytes_sent = len(body.encode("utf-8"))
+        else:
+            try:
+                bytes_sent = len(body)
+            except TypeError:
+                bytes_sent = 0
+
+        self.countRequest(bytes_sent)
+
+        return response
+
+    def installSessionHook(self, session):
+        """
+        Count every request made through a requests session.
+        """
+        if self.responseHook not in session.hooks["response"]:
+            session.hooks["response"].append(self.responseHook)
+
+    def summary(self) -> dict:
+        """
+        Summarize every minute recorded so far.
+
+        {
+            "Minutes": minutes,
+            "Requests": requests,
+            "Bytes Sent": bytes_sent,
+            "Stages": {stage: {"Count", "Total", "Mean", "P50", "P90", "P99", "Max"}},
+            "Minute Seconds": {"Count", "Total", "Mean", "P50", "P90", "P99", "Max"},
+            "Requests Per Minute": {"Count", "Total", "Mean", "P50", "P90", "P99", "Max"},
+            "Committees": {committee: {"Minutes", "Requests", "Bytes Sent", "Seconds"}},
+            "Unattributed": {"Requests", "Bytes Sent"}
+        }
+        """
+        with self.lock:
+            records = list(self.records)
+            unattributed = dict(self.unattributed)
+
+        stages = {}
+        committees = {}
+
+        for record in records:
+            for stage_name, seconds in record["Stages"].items():
+                stages.setdefault(stage_name, []).append(seconds)
+
+            committee = committees.setdefault(record["Committee"], {
+                "Minutes": 0,
+                "Requests": 0,
+                "Bytes Sent": 0,
+                "Seconds": 0.0
+            })
+            committee["Minutes"] += 1
+            committee["Requests"] += record["Requests"]
+            committee["Bytes Sent"] += record["Bytes Sent"]
+            committee["Seconds"] += record["Seconds"]
+
+        return {
+            "Minutes": len(records),
+            "Requests": sum(record["Requests"] for record in records) + unattributed["Requests"],
+            "Bytes Sent": sum(record["Bytes Sent"] for record in records) + unattributed["Bytes Sent"],
+            "Stages": {stage_name: summarize(values) for stage_name, values in stages.items()},
+            "Minute Seconds": summarize([record["Seconds"] for record in records]),
+            "Requests Per Minute": summarize([record["Requests"] for record in records]),
+            "Committees": committees,
+            "Unattributed": unattributed
+        }
+
+    def writeJSON(self, file_path:str):
+        with open(file_path, "w", encoding="utf-8") as metrics_file:
+            json.dump({
+                "Summary": self.summary(),
+                "Minutes": list(self.records)
+            }, metrics_file, indent=2)
+
+    def writePrometheus(self, file_path:str):
+        """
+        Write the summary in the Prometheus text exposition format.
+        """
+        summary = self.summary()
+
+        lines = [
+            "# HELP committee_upload_stage_seconds Seconds spent in each stage of uploading a minute.",
+            "# TYPE committee_upload_stage_seconds summary"
+        ]
+
+        for stage_name, stage in sorted(summary["Stages"].items()):
+            for quantile, key in [("0.5", "P50"), ("0.9", "P90"), ("0.99", "P99")]:
+                lines.append("committee_upload_stage_seconds{stage=\"" + escapeLabel(stage_name) + "\",quantile=\"" + quantile + "\"} " + repr(stage[key]))
+            lines.append("committee_upload_stage_seconds_sum{stage=\"" + escapeLabel(stage_name) + "\"} " + repr(stage["Total"]))
+            lines.append("committee_upload_stage_seconds_count{stage=\"" + escapeLabel(stage_name) + "\"} " + str(stage["Count"]))
+
+        for metric, key, help_text in [
+            ("committee_upload_minutes_total", "Minutes", "Minutes uploaded."),
+            ("committee_upload_requests_total", "Requests", "HTTP requests sent."),
+            ("committee_upload_bytes_sent_total", "Bytes Sent", "HTTP request body bytes sent."),
+            ("committee_upload_seconds_total", "Seconds", "Seconds spent uploading minutes.")]:
+            lines.append("# HELP " + metric + " " + help_text)
+            lines.append("# TYPE " + metric + " counter")
+            for committee_name, committee in sorted(summary["Committees"].items()):
+                lines.append(metric + "{committee=\"" + escapeLabel(committee_name) + "\"} " + repr(committee[key]))
+
+        with open(file_path, "w", encoding="utf-8") as metrics_file:
+            metrics_file.write("\n".join(lines) + "\n")
+
+def percentile(sorted_values:list, fraction:float) -> float:
+    """
+    Get the nearest-rank percentile of an already sorted list.
+    """
+    if not sorted_values:
+        return 0.0
+
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+def summarize(values:list) -> dict:
+    sorted_values = sorted(values)
+    total = sum(sorted_values)
+
+    return {
+        "Count": len(sorted_values),
+        "Total": total,
+        "Mean": total / len(sorted_values) if sorted_values else 0.0,
+        "P50": percentile(sorted_values, 0.5),
+        "P90": percentile(sorted_values, 0.9),
+        "P99": percentile(sorted_values, 0.99),
+        "Max": sorted_values[-1] if sorted_values else 0.0
+    }
+
+def escapeLabel(value:str) -> str:
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
@@ -0,0 +1,196 @@
+import json, os, sqlite3, threading, time
+
+class ParseCache:
+    """
+    Keeps the parsed result of text files in a local SQLite file, keyed by
+    file path, parser name, file size, file mtime and parser version, so a
+    file only has to be parsed again once it changes on disk or the parser
+    does. Results that depend only on a file's content, such as the text
+    extracted from a PDF, can instead be keyed by the file's checksum.
+
+    The cache holds at most max_entries results. Once it grows past that the
+    least recently used results are evicted. Hits do not write to the file
+    one by one: when each result was last used is kept in memory and written
+    in batches of touch_batch_size, before any eviction, and on close.
+    Several processes may share the file, so the entries are counted in the
+    file again every count_interval puts and before evicting.
+    """
+
+    touch_batch_size = 500
+    count_interval = 100
+
+    def __init__(self, database_path:str, max_entries:int = 50000):
+        self.database_path = database_path
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.touched = {}
+        self.puts_since_count = 0
+        self.connection = sqlite3.connect(database_path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute("""
+            CREATE TABLE IF NOT EXISTS parsed (
+                path TEXT NOT NULL,
+                parser TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                modified INTEGER NOT NULL,
+                version INTEGER NOT NULL,
+                result TEXT NOT NULL,
+                used REAL NOT NULL,
+                PRIMARY KEY (path, parser)
+            )""")
+        self.connection.execute("CREATE INDEX IF NOT EXISTS parsed_used ON parsed (used)")
+        self.connection.commit()
+        self.entries = self.connection.execute("SELECT COUNT(*) FROM parsed").fetchone()[0]
+
+    def get(self, file_path:str, parser_name:str, version:int, file_stat:os.stat_result = None):
+        """
+        Get the cached result of parsing file_path with parser_name, or None
+        when there is none for the file as it is on disk now.
+        """
+        file_stat = file_stat or os.stat(file_path)
+
+        return self.lookup(file_path, parser_name, file_stat.st_size, file_stat.st_mtime_ns, version)
+
+    def put(self, file_path:str, parser_name:str, version:int, result, file_stat:os.stat_result = None):
+        """
+        Cache the result of parsing file_path with parser_name. file_stat
+        should be taken before the file was read, so a file changed while it
+        was parsed is parsed again next time.
+        """
+        file_stat = file_stat or os.stat(file_path)
+
+        self.store(file_path, parser_name, file_stat.st_size, file_stat.st_mtime_ns, version, result)
+
+    def getByChecksum(self, checksum:str, parser_name:str, version:int):
+        """
+        Get a result cached with putByChecksum, or None. Unlike get, the
+        result follows the file's content wherever the file is moved or
+        copied to.
+        """
+        return self.lookup("sha256:" + checksum, parser_name, 0, 0, version)
+
+    def putByChecksum(self, checksum:str, parser_name:str, version:int, result):
+        """
+        Cache the result of parsing a file by the sha256 hex digest of its
+        content rather than by its path.
+        """
+        self.store("sha256:" + checksum, parser_name, 0, 0, version, result)
+
+    def lookup(self, path:str, parser_name:str, size:int, modified:int, version:int):
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT result FROM parsed WHERE path = ? AND parser = ? AND size = ? AND modified = ? AND version = ?",
+                (path, parser_name, size, modified, version)).fetchone()
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            self.touched[(path, parser_name)] = time.time()
+
+            if len(self.touched) >= self.touch_batch_size:
+                self.writeTouched()
+                self.connection.commit()
+
+        return json.loads(row[0])
+
+    def store(self, path:str, parser_name:str, size:int, modified:int, version:int, result):
+        with self.lock:
+            replaced = self.connection.execute("SELECT 1 FROM parsed WHERE path = ? AND parser = ?", (path, parser_name)).fetchone()
+            self.connection.execute(
+                "INSERT OR REPLACE INTO parsed (path, parser, size, modified, version, result, used) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (path, parser_name, size, modified, version, json.dumps(result), time.time()))
+            self.touched.pop((path, parser_name), None)
+
+            if not replaced:
+                self.entries += 1
+                self.puts_since_count += 1
+
+            if self.entries > self.max_entries or self.puts_since_count >= self.count_interval:
+                self.countEntries()
+
+            if self.entries > self.max_entries:
+                self.evict()
+
+            self.connection.commit()
+
+    def writeTouched(self):
+        """
+        Write when the results hit since the last write were used. Expects
+        the lock to be held.
+        """
+        if self.touched:
+            self.connection.executemany(
+                "UPDATE parsed SET used = ? WHERE path = ? AND parser = ?",
+                [(used, path, parser_name) for (path, parser_name), used in self.touched.items()])
+            self.touched = {}
+
+    def countEntries(self):
+        """
+        Count the entries in the file, which other processes may have added
+        to or evicted from. Expects the lock to be held.
+        """
+        self.entries = self.connection.execute("SELECT COUNT(*) FROM parsed").fetchone()[0]
+        self.puts_since_count = 0
+
+    def evict(self):
+        """
+        Drop the least recently used results, down to nine tenths of
+        max_entries so eviction does not run on every put. Expects the lock
+        to be held and the entries to have just been counted.
+        """
+        keep = int(self.max_entries * 0.9)
+
+        self.writeTouched()
+        self.connection.execute(
+            "DELETE FROM parsed WHERE rowid IN (SELECT rowid FROM parsed ORDER BY used ASC LIMIT ?)",
+            (self.entries - keep,))
+        self.entries = keep
+
+    def clear(self):
+        with self.lock:
+            self.connection.execute("DELETE FROM parsed")
+            self.connection.commit()
+            self.touched = {}
+            self.entries = 0
+
+    def flush(self):
+        """
+        Write when the results hit so far were used.
+        """
+        with self.lock:
+            self.writeTouched()
+            self.connection.commit()
+
+    def close(self):
+        with self.lock:
+            self.writeTouched()
+            self.connection.commit()
+            self.connection.close()
+
+    def count(self, hits:int, misses:int):
+        """
+        Add hits and misses of the cache seen by another process, such as a
+        render process with its own connection to the same file.
+        """
+        with self.lock:
+            self.hits += hits
+            self.misses += misses
+
+    def summary(self) -> dict:
+        """
+        Get the hits and misses counted by this process, and the entries in
+        the file, which other processes may have written to.
+        """
+        with self.lock:
+            self.countEntries()
+
+            return {
+                "Entries": self.entries,
+                "Hits": self.hits,
+                "Misses": self.misses
+            }
@@ -0,0 +1,35 @@
+import subprocess
+
+# The extractor run on every PDF, with the PDF path and "-" appended so the
+# text comes back on stdout instead of through a file. pdftotext ships with
+# poppler-utils and runs entirely offline.
+extractor_command = ["pdftotext", "-enc", "UTF-8"]
+
+# Bumped whenever extractor_command changes, so text cached from the old
+# command is extracted again.
+extractor_version = 1
+
+def extractText(pdf_path:str, timeout:float = 120.0) -> str:
+    """
+    Extract the text of a PDF with extractor_command, reading it straight
+    from the extractor's stdout.
+
+    Args:
+        pdf_path (str): The PDF file.
+        timeout (float, optional): Defaults to 120.0. Seconds the extractor
+        may run before it is killed.
+
+    Returns:
+        str: The text, with pages separated by form feeds.
+    """
+    try:
+        completed = subprocess.run(extractor_command + [pdf_path, "-"], stdout=subprocess.PIPE, stderr=subprocess.PIPE, timeout=timeout)
+    except FileNotFoundError:
+        raise RuntimeError(extractor_command[0] + " is not installed, so " + pdf_path + " has no text. Install poppler-utils, or export a .txt next to the PDF.")
+    except subprocess.TimeoutExpired:
+        raise RuntimeError(extractor_command[0] + " took over " + str(timeout) + " seconds on " + pdf_path)
+
+    if completed.returncode != 0:
+        raise RuntimeError(extractor_command[0] + " failed on " + pdf_path + ": " + completed.stderr.decode("utf-8", errors="replace").strip())
+
+    return completed.stdout.decode("utf-8", errors="replace")
@@ -0,0 +1,349 @@
+import asyncio, threading, time
+
+class RequestBudget:
+    """
+    Limits one kind of request with a token bucket for the request rate and
+    a cap on requests in flight, both adapted AIMD-style to how the server
+    copes: they grow a little with every quick success, and are cut back
+    sharply when the server throttles (429, or 503) and gently when latency
+    climbs well above the fastest seen.
+
+    Like TCP slow start, the budget grows by a whole step per success until
+    the first time it is cut back, then by a step per round. It only grows
+    while requests are actually waiting on it.
+    """
+
+    def __init__(self, name:str, rate:float = 5.0, min_rate:float = 0.5, max_rate:float = 100.0, concurrency:float = 4, max_concurrency:int = 20,
+        rate_increase:float = 1.0, decrease:float = 0.5, latency_tolerance:float = 3.0):
+        """
+        Args:
+            name (str): The name of the budget, such as "read".
+            rate (float, optional): Defaults to 5.0. Starting requests per second.
+            min_rate (float, optional): Defaults to 0.5. The rate never drops below this.
+            max_rate (float, optional): Defaults to 100.0. The rate never grows above this.
+            concurrency (float, optional): Defaults to 4. Starting requests in flight.
+            max_concurrency (int, optional): Defaults to 20. Should be at most the
+            connection pool size.
+            rate_increase (float, optional): Defaults to 1.0. Requests per second
+            added to the rate per success in slow start, and per second of
+            successes after it.
+            decrease (float, optional): Defaults to 0.5. The factor the rate and
+            concurrency are cut by when throttled.
+            latency_tolerance (float, optional): Defaults to 3.0. Latency above
+            this many times the fastest seen counts as congestion.
+        """
+        self.name = name
+        self.rate = rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.concurrency = float(concurrency)
+        self.max_concurrency = max_concurrency
+        self.rate_increase = rate_increase
+        self.decrease = decrease
+        self.latency_tolerance = latency_tolerance
+
+        self.condition = threading.Condition()
+        self.tokens = 1.0
+        self.refilled = time.monotonic()
+        self.paused_until = 0.0
+        self.last_decrease = 0.0
+        self.in_flight = 0
+        self.queued = 0
+        self.requests = 0
+        self.throttled = 0
+        self.baseline_latency = None
+        self.average_latency = None
+        self.slow_start = True
+
+    def refill(self, now:float):
+        self.tokens = min(max(1.0, self.rate), self.tokens + (now - self.refilled) * self.rate)
+        self.refilled = now
+
+    def reserve(self) -> float:
+        """
+        Take a request slot if the budget allows one now. Expects the
+        condition to be held.
+
+        Returns:
+            float: 0 when a slot was taken, otherwise the seconds until one
+            may be, or None when that depends on a request in flight finishing.
+        """
+        now = time.monotonic()
+        self.refill(now)
+
+        if now < self.paused_until:
+            return self.paused_until - now
+
+        if self.tokens < 1:
+            return (1 - self.tokens) / self.rate
+
+        if self.in_flight >= int(self.concurrency):
+            return None
+
+        self.tokens -= 1
+        self.in_flight += 1
+        self.requests += 1
+
+        return 0
+
+    def acquire(self):
+        """
+        Block until a request of this kind may be sent.
+        """
+        with self.condition:
+
+            self.queued += 1
+
+            try:
+                while True:
+                    wait = self.reserve()
+                    if wait == 0:
+                        return
+                    self.condition.wait(wait)
+            finally:
+                self.queued -= 1
+
+    async def acquireAsync(self, poll:float = 0.01):
+        """
+        The coroutine version of acquire(), waiting on the event loop instead
+        of blocking it. A coroutine is not woken when a request in flight
+        finishes, so it checks again every poll seconds meanwhile.
+        """
+        with self.condition:
+            self.queued += 1
+
+        try:
+            while True:
+                with self.condition:
+                    wait = self.reserve()
+                if wait == 0:
+                    return
+                await asyncio.sleep(poll if wait is None else wait)
+        finally:
+            with self.condition:
+                self.queued -= 1
+
+    def release(self, latency:float, status:int = None, retry_after:float = None):
+        """
+        Mark a request acquired with acquire() as done, adapting the budget to
+        its outcome.
+
+        Args:
+            latency (float): Seconds the request took.
+            status (int, optional): Defaults to None. The HTTP status, or None
+            when the request failed without a response.
+            retry_after (float, optional): Defaults to None. Seconds a
+            throttled response asked to wait, pausing the budget that long.
+        """
+        with self.condition:
+
+            self.in_flight -= 1
+
+            if status is None or status in (429, 503):
+                self.backOff(self.decrease, retry_after)
+            elif status < 500:
+                self.observeLatency(latency)
+
+            self.condition.notify_all()
+
+    def suspend(self):
+        """
+        Give up the slot of a request acquired with acquire() while it waits
+        without using the server, such as between retries, without adapting
+        the budget. It has to be acquired again before the request goes on.
+        """
+        with self.condition:
+            self.in_flight -= 1
+            self.condition.notify_all()
+
+    def observeLatency(self, latency:float):
+        """
+        Grow the budget after a quick success, or shrink the concurrency a
+        little after a slow one. Expects the condition to be held.
+        """
+        if self.baseline_latency is None or latency < self.baseline_latency:
+            self.baseline_latency = latency
+        else:
+            self.baseline_latency += (latency - self.baseline_latency) * 0.01
+
+        if self.average_latency is None:
+            self.average_latency = latency
+        else:
+            self.average_latency += (latency - self.average_latency) * 0.1
+
+        if self.average_latency > self.baseline_latency * self.latency_tolerance:
+            self.backOff(0.9, rate=False)
+            return
+
+        if self.queued < 1:
+            return
+
+        concurrency_bound = self.in_flight + 1 >= int(self.concurrency)
+
+        if self.slow_start:
+            self.rate = min(self.max_rate, self.rate + self.rate_increase)
+            if concurrency_bound:
+                self.concurrency = min(self.max_concurrency, self.concurrency + 1)
+        else:
+            self.rate = min(self.max_rate, self.rate + self.rate_increase / self.rate)
+            if concurrency_bound:
+                self.concurrency = min(self.max_concurrency, self.concurrency + 1 / self.concurrency)
+
+    def backOff(self, factor:float, retry_after:float = None, rate:bool = True):
+        """
+        Cut the budget by factor, at most once per round trip so a burst of
+        throttled requests in flight together only counts once. Expects the
+        condition to be held.
+        """
+        now = time.monotonic()
+
+        if retry_after:
+            self.paused_until = max(self.paused_until, now + retry_after)
+
+        if rate:
+            self.throttled += 1
+
+        if now - self.last_decrease < max(0.5, self.average_latency or 0.0):
+            return
+
+        self.last_decrease = now
+        self.slow_start = False
+        self.concurrency = max(1.0, self.concurrency * factor)
+
+        if rate:
+            self.rate = max(self.min_rate, self.rate * factor)
+            self.tokens = min(self.tokens, 0.0)
+
+    def throttle(self, retry_after:float = None):
+        """
+        Back off after a throttled response seen outside of release(), such
+        as one retried by urllib3, pausing for retry_after seconds when given.
+        """
+        with self.condition:
+            self.backOff(self.decrease, retry_after)
+            self.condition.notify_all()
+
+    def summary(self) -> dict:
+        with self.condition:
+            return {
+                "Rate": self.rate,
+                "Concurrency": int(self.concurrency),
+                "In Flight": self.in_flight,
+                "Queued": self.queued,
+                "Requests": self.requests,
+                "Throttled": self.throttled,
+                "Latency": self.average_latency
+            }
+
+class RequestScheduler:
+    """
+    Sends every Confluence request through one of three budgets, so reads,
+    page writes and attachment uploads are each throttled on their own.
+    Requests can be sent from threads with send() or from coroutines with
+    sendAsync().
+    """
+
+    def __init__(self, max_concurrency:int = 20, read:dict = None, write:dict = None, attach:dict = None):
+        """
+        Args:
+            max_concurrency (int, optional): Defaults to 20. The cap on requests
+            in flight of each kind; should be at most the connection pool size.
+            read (dict, optional): RequestBudget arguments for GET requests.
+            write (dict, optional): RequestBudget arguments for page writes.
+            attach (dict, optional): RequestBudget arguments for attachment uploads.
+        """
+        self.budgets = {
+            "read": RequestBudget("read", **dict({"rate": 10.0, "max_rate": 100.0, "max_concurrency": max_concurrency}, **(read or {}))),
+            "write": RequestBudget("write", **dict({"rate": 5.0, "max_rate": 50.0, "max_concurrency": max_concurrency}, **(write or {}))),
+            "attach": RequestBudget("attach", **dict({"rate": 2.0, "max_rate": 20.0, "concurrency": 2, "max_concurrency": max_concurrency}, **(attach or {})))
+        }
+        self.local = threading.local()
+
+    def getBudget(self, method:str, url:str) -> RequestBudget:
+        """
+        Get the budget of a request from its method and URL.
+        """
+        method = (method or "GET").upper()
+
+        if method in ("GET", "HEAD", "OPTIONS"):
+            return self.budgets["read"]
+
+        if "/child/attachment" in url:
+            return self.budgets["attach"]
+
+        return self.budgets["write"]
+
+    def send(self, method:str, url:str, send):
+        """
+        Call send() once the budget of the request allows it, and adapt the
+        budget to the response it returns.
+        """
+        budget = self.getBudget(method, url)
+        budget.acquire()
+
+        request = self.local.request = {"Budget": budget, "Start": time.monotonic()}
+        status = None
+
+        try:
+            response = send()
+            status = response.status_code
+            return response
+        finally:
+            self.local.request = None
+            budget.release(time.monotonic() - request["Start"], status)
+
+    def wait(self, seconds:float):
+        """
+        Sleep in the middle of a request sent with send() on this thread, such
+        as a retry backing off, without holding its slot. The slot is taken
+        again once the sleep is over, and the sleep is left out of the latency
+        of the request.
+        """
+        request = getattr(self.local, "request", None)
+
+        if request is None:
+            time.sleep(seconds)
+            return
+
+        request["Budget"].suspend()
+
+        try:
+            time.sleep(seconds)
+        finally:
+            request["Budget"].acquire()
+            request["Start"] = time.monotonic()
+
+    async def sendAsync(self, method:str, url:str, send):
+        """
+        The coroutine version of send(): await send() once the budget of the
+        request allows it. send() returns a tuple starting with the status,
+        optionally followed by the body and the seconds of a Retry-After
+        header, and the budget is adapted to them.
+        """
+        budget = self.getBudget(method, url)
+        await budget.acquireAsync()
+
+        start = time.monotonic()
+        status = None
+        retry_after = None
+
+        try:
+            response = await send()
+            status = response[0]
+            retry_after = response[2] if len(response) > 2 else None
+            return response
+        finally:
+            budget.release(time.monotonic() - start, status, retry_after)
+
+    def throttle(self, method:str, url:str, retry_after:float = None):
+        self.getBudget(method, url).throttle(retry_after)
+
+    def summary(self) -> dict:
+        """
+        Get the current rate, concurrency and queue depth of every budget.
+
+        {
+            budget_name: {"Rate", "Concurrency", "In Flight", "Queued", "Requests", "Throttled", "Latency"}
+        }
+        """
+        return {name: budget.summary() for name, budget in self.budgets.items()}
@@ -0,0 +1,418 @@
+"""
+The parsers and renderer as they were before they were rewritten for speed,
+kept verbatim so the tests can check the rewritten ones still give the same
+results.
+"""
+import logging, re, unicodedata
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+def getAgenda(lines_of_file:list) -> dict:
+    """
+    Read the lines of a file and get the information about the agenda.
+
+    {
+        "Agenda": agenda,
+        "Presenters": presenters,
+        "Minutes Date": minute_date,
+        "Committee Name": committee_name
+    }
+    
+    Args:
+        lines_of_file (list): A list of strings from a file.
+    
+    Returns:
+        dict: A dictionary like above.
+    """
+    agenda = []
+    presenters = []
+    minutes_date = None
+    agendaSection = False
+    presenterSection = False
+    line_index = 0
+
+    lastTopic = ""
+
+    for line in lines_of_file:
+
+        line_lower = line.lower().strip()
+        line_stripped = line.strip()
+
+        if "outcome" in line_lower or "agenda" in line_lower:
+            agendaSection = True
+            presenterSection = False
+            continue
+        elif presenterSection and not agendaSection and len(line_lower) < 1:
+            agendaSection = True
+            presenterSection = False
+            continue
+        elif "presenter" in line_lower or "leader" in line_lower:
+            agendaSection = False
+            presenterSection = True
+            continue
+        elif "desired outcome" in line_lower:
+            presenterSection = False
+            continue
+        elif len(line_lower) < 1:
+            continue
+        
+        regex_long_form_date = r"(January|February|March|April|May|June|July|August|September|October|November|December)\s\d+,\s\d{4}"
+        regex_starts_with_number = r"(\d\d|\d).\s.+"
+        regex_only_number = r"(\d\d|\d)(\.|\))\s"
+        regex_is_table_label = r"[D|I|V]*\/*[D|I|V]*\/*[D|I|V]"
+        confluence_preffered_date_format = "%m/%d/%y"
+        file_regex_date_format = "%B %d, %Y"
+
+        if line_index < 5:
+            search_for_date = re.search(regex_long_form_date, line)
+            if search_for_date:
+                if len(search_for_date.groups()) > 0:
+                    matched_date_str = search_for_date.group(0)
+                    matched_date = datetime.strptime(matched_date_str, file_regex_date_format)
+                    minutes_date = matched_date.strftime(confluence_preffered_date_format)
+
+
+        if presenterSection:
+            if len(line_stripped) > 0 and not re.match(r"(D|I|V)[^(a-z)]", line):
+                presenters.append(line_stripped)
+        
+        if agendaSection:
+            if lastTopic == "" and re.match(regex_starts_with_number, line_stripped):
+                lastTopic = line.replace("\n", " ")
+            elif lastTopic != "" and not re.match(regex_starts_with_number, line_stripped):
+                lastTopic += line
+            elif lastTopic != "" and re.match(regex_starts_with_number, line_stripped):
+                cleanedTopic = lastTopic.replace("\n", " ")
+                agenda.append(cleanedTopic.strip())
+                lastTopic = line
+            lastTopic = re.sub(regex_only_number, "", lastTopic)
+        line_index += 1
+            
+        if lastTopic != "" and len(lastTopic) < 1 and re.match(regex_starts_with_number, lastTopic.strip()):
+            cleanedTopic = lastTopic.replace("\n", " ")
+            cleanedTopic = re.sub(regex_is_table_label, "", cleanedTopic)
+            agenda.append(cleanedTopic.strip())
+
+    date_failure = not minutes_date or len(minutes_date) < 1
+    presenters_failure = not presenters or len(presenters) < 1
+    agenda_failure = not agenda or len(agenda) < 1
+
+    if date_failure:
+        logger.warning("No date was retrieved for this file.")
+
+    if presenters_failure:
+        logger.warning("No presenters were retrieved for this file.")
+
+    if agenda_failure:
+        logger.warning("No agenda was retrieved for this file.")
+
+    return {
+        "Agenda": agenda if len(agenda) > 0 else [],
+        "Presenters": presenters if len(presenters) > 0 else [],
+        "Minutes Date": minutes_date if not(minutes_date is None) else "None"
+    }
+
+def isName(string):
+    length = len(string.split(" "))
+    regex_remove_suffix = r"(\(.+\))|(\,.+)"
+    if length == 2:
+        return True
+    else:
+        if length < 2:
+            return False
+        else:
+            string_stripped = re.sub(regex_remove_suffix, "", string).strip()
+            length = len(string_stripped.split(" "))
+            if length == 2:
+                return True
+            else:
+                return False
+        
+
+def getAttendees(lines_in_file:list) -> dict:
+    """
+    Read the lines of a file to retrieve the attendees information in
+    dictionary form below:
+
+    {
+        "Members Attending": committeeMembersAttending,
+        "Members NOT Attending": committeeMembersNotAttending,
+        "Others Attending": othersAttending,
+        "Topics": committeeTopics
+    }
+    
+    Args:
+        lines_of_file (list): The lines of a file as a list of strings.
+    
+    Returns:
+        dict: A dictionary.
+    """
+
+    section_committeeMembersAttending = False
+    section_committeeMembersNotAttending = False
+    section_othersAttending = False
+    section_committeeTopics = False
+
+    committeeMembersAttending = []
+    committeeMembersNotAttending = []
+    othersAttending = []
+    committeeTopics = []
+
+    lastLine = ""
+
+    topic = {
+        "Topic":"",
+        "Description":""
+    }
+
+    for index, line in enumerate(lines_in_file, 0):
+
+        line_stripped = line.strip()
+        line_lower = line_stripped.lower()
+
+        if len(line_lower) < 1:
+            continue
+
+        if "other" in line_lower and "attend" in line_lower and not section_committeeTopics:
+            section_othersAttending = True
+            section_committeeMembersAttending = False
+            section_committeeMembersNotAttending = False
+            section_committeeTopics = False
+            continue
+        elif all(["not" in line_lower, "member" in line_lower]) or all(["not" in line_lower, "attend" in line_lower]) or "absent" in line_lower and not section_committeeTopics:
+            section_committeeMembersNotAttending = True
+            section_committeeMembersAttending = False
+            section_othersAttending = False
+            section_committeeTopics = False
+            continue
+        elif "attendees" in line_lower or "member attendees" in line_lower or all(["attending" in line_lower, "members" in line_lower]):
+            section_committeeMembersAttending = True
+            section_committeeMembersNotAttending = False
+            section_othersAttending = False
+            section_committeeTopics = False
+            continue
+        elif not isName(line_lower) and "attend" not in line_lower and "conference" not in line_lower and index > 10:
+            section_committeeTopics = True
+            section_othersAttending = False
+            section_committeeMembersAttending = False
+            section_committeeMembersNotAttending = False
+        
+        if section_committeeMembersAttending:
+
+            committeeMembersAttending.append(line_stripped)
+
+        elif section_committeeMembersNotAttending:
+
+            committeeMembersNotAttending.append(line_stripped)
+
+        elif section_othersAttending:
+
+            othersAttending.append(line_stripped)
+
+        elif section_committeeTopics:
+            if len(lastLine) < 1:
+
+                topic["Description"] = topic["Description"].strip()
+
+                committeeTopics.append(topic)
+
+                topic = {
+                    "Topic": line_stripped,
+                    "Description": ""
+                }
+
+            else:
+                topic["Description"] += line.replace("\n", " ")
+        lastLine = line_stripped
+    
+    attending_failure = not committeeMembersAttending or len(committeeMembersAttending) < 1
+    not_attending_failure = not committeeMembersNotAttending
+    others_attending_failure = not othersAttending
+    topics_failure = not committeeTopics or len(committeeTopics) < 1
+
+    if attending_failure:
+        logger.warning("Members attending not retrieved.")
+    
+    if not_attending_failure:
+        logger.warning("Members NOT attending not retrieved.")
+
+    if others_attending_failure:
+        logger.warning("Others attending not retrieved.")
+
+    if topics_failure:
+        logger.warning("Topics not retrieved.")
+
+    return {
+        "Members Attending": committeeMembersAttending,
+        "Members NOT Attending": committeeMembersNotAttending,
+        "Others Attending": othersAttending,
+        "Topics": committeeTopics
+    }
+
+
+def buildCommitteeMinutes(topics:list) -> str:
+    """
+    Get the page block for committee minutes belonging to a minutes page.
+    
+    Args:
+        topics (list): A list of dictionaries in the form
+
+        {
+            "Topic" : "A random Topic",
+            "Description" : A random Description"
+        }
+    
+    Returns:
+        str: A page block for committee minutes belonging to a minutes page.
+    """
+    beginning = "<ac:structured-macro ac:name=\"content-block\" ac:schema-version=\"1\" ac:macro-id=\"f9b73644-be07-43c6-ae3b-6fcfe601a19a\"><ac:parameter ac:name=\"id\">1856492229</ac:parameter><ac:parameter ac:name=\"class\">minutes-action</ac:parameter><ac:rich-text-body><h1>Minutes</h1>"
+        
+    table = ""
+
+    for topic in topics:
+        table += "<h2>" + topic["Topic"] + "</h2>"
+
+        paragraphs = topic["Description"].split("\n\n")
+
+        for description in paragraphs:
+            table += "<p>" + description + "</p>"
+
+    end = "</ac:rich-text-body></ac:structured-macro>"
+
+    return beginning + table + end
+
+def buildCommitteeAttending(attending:list, notattending:list, otherattending:list) -> str:
+    """
+    Get the attending members block for a committee minutes page.
+    
+    Args:
+        attending (list): A list of committee members attending a paticular minute
+        notattending (list): A list of committee members NOT attending a paticular minute
+        otherattending (list): A list of others attending a paticular minute
+    
+    Returns:
+        str: A page block representing the attending members in a minutes page.
+    """
+
+    beginning = "<ac:structured-macro ac:name=\"content-block\" ac:schema-version=\"1\" ac:macro-id=\"ea1fb4c5-4895-4807-9985-534d76c03834\"><ac:parameter ac:name=\"not-tabbed\">true</ac:parameter><ac:parameter ac:name=\"id\">1858162090</ac:parameter><ac:parameter ac:name=\"class\">minutes-attending</ac:parameter><ac:rich-text-body><h1>Attending</h1><p><br /></p>"
+        
+    table = "<table class=\"wrapped\"><colgroup><col style=\"width: 29.0px;\" /></colgroup><tbody><tr><th style=\"text-align: left;\">Members Attending</th></tr>"
+        
+    for attendee in attending:
+        if "\u00e2\u0080\u0093" in attendee:
+            temp = ", ".join(attendee.split("\u00e2\u0080\u0093"))
+            table += "<tr><td colspan=\"1\">" + temp + "</td></tr>"
+        else:
+            table += "<tr><td colspan=\"1\">" + attendee + "</td></tr>"
+
+    table += "</tbody></table><table class=\"wrapped\"><colgroup><col /></colgroup><tbody><tr><th>Members Not Attending</th></tr>"
+        
+    for notattendee in notattending:
+        table += "<tr><td colspan=\"1\">" + notattendee + "</td></tr>"
+    
+    table += "</tbody></table><table class=\"wrapped\"><colgroup><col /></colgroup><tbody><tr><th>Others Attending</th></tr>"
+        
+    for otherattendee in otherattending:
+        table += "<tr><td colspan=\"1\">" + otherattendee + "</td></tr>"
+            
+    table += "</tbody></table>"
+
+    closing = "</ac:rich-text-body></ac:structured-macro>"
+
+    return beginning + table + closing
+
+def buildCommitteeAgenda(agenda:list) -> str:
+    """
+    Get the committee agenda page block from a committee page.
+    
+    Args:
+        agenda (list): A list of dictionaries in the form 
+
+        {
+            "Topic" : "A random Topic",
+            "Agenda": "A random Presenter"
+        }
+    
+    Returns:
+        str: A page block of the committee agenda.
+    """
+
+    beginning = "<ac:structured-macro ac:name=\"content-block\" ac:schema-version=\"1\" ac:macro-id=\"338bbab4-ea9a-4278-8b52-6c7ec3ae2398\"><ac:parameter ac:name=\"not-tabbed\">true</ac:parameter><ac:parameter ac:name=\"id\">1856481342</ac:parameter><ac:parameter ac:name=\"class\">minutes-agenda</ac:parameter><ac:rich-text-body><h1>Agenda</h1>"
+        
+    table = "<table class=\"wrapped\"><colgroup><col /><col /></colgroup><tbody><tr><th>Topic</th><th>Presenter</th></tr>"
+
+    for topic in agenda:
+        table += "<tr><td colspan=\"1\">" + " - ".join(str(topic["Topic"]).split("\u00e2\u20ac\u201c")) + "</td><td colspan=\"1\">" + str(topic["Presenter"]) + "</td></tr>"
+    
+    table += "</tbody></table>"
+
+    closing = "</ac:rich-text-body></ac:structured-macro>"
+
+    return beginning + table + closing
+
+def buildCommitteeStatus(committeeName:str, minutes_date:str, committeeStatus:str) -> str:
+    """
+    Get the status of a paticular committee.
+    
+    Args:
+        committeeName (str): The name of a committee
+        minutes_date (str): The date of a particular minutes
+    committeeStatus (str): The status of a paticular committee as "Approved"
+    "
+    
+    Returns:
+        str: A page block represnting the status of a committee.
+    """
+
+    beginning = "<ac:structured-macro ac:name=\"content-block\" ac:schema-version=\"1\" ac:macro-id=\"71c4d118-3da1-4e97-8e1d-f2faf9b45d0f\"><ac:parameter ac:name=\"id\">1856481235</ac:parameter><ac:parameter ac:name=\"class\">minutes-meta</ac:parameter><ac:rich-text-body><ac:structured-macro ac:name=\"details\" ac:schema-version=\"1\" ac:macro-id=\"6561762b-bb94-4120-b624-82bc63b5fd28\"><ac:parameter ac:name=\"id\">minutesandagenda</ac:parameter><ac:rich-text-body>"
+        
+    table = "<table class=\"wrapped\"><colgroup><col /><col /></colgroup><tbody><tr><th><p>Committee Name</p></th><td><p>"
+    table += committeeName + "</p></td></tr><tr><th><p>Date</p></th><td><p>"
+
+    table += minutes_date + "</p></td></tr><tr><th><p>Status</p></th><td><div class=\"content-wrapper\"><ac:structured-macro ac:name=\"minutestatus\" ac:schema-version=\"1\" ac:macro-id=\"1c0ed33a-a4c3-48f4-9a49-4b1a9735e9bf\"><ac:parameter ac:name=\"atlassian-macro-output-type\">INLINE</ac:parameter><ac:rich-text-body><p>"
+    table += committeeStatus + "</p></ac:rich-text-body></ac:structured-macro></div></td></tr></tbody></table>"
+        
+    closing = "</ac:rich-text-body></ac:structured-macro></ac:rich-text-body></ac:structured-macro>"
+
+    attachments = "<ac:structured-macro ac:name=\"content-block\" ac:schema-version=\"1\" ac:macro-id=\"6ace2570-bb93-4cf2-ae05-78089be52874\"><ac:parameter ac:name=\"id\">270750570</ac:parameter><ac:rich-text-body><ac:structured-macro ac:name=\"info\" ac:schema-version=\"1\" ac:macro-id=\"22d834ad-6fbb-45a2-9463-a442198deb8f\"><ac:rich-text-body><p>Content on this page has been automatically generated from the source document(s) below.</p></ac:rich-text-body></ac:structured-macro><p><ac:structured-macro ac:name=\"attachments\" ac:schema-version=\"1\" ac:macro-id=\"a4ce25c3-a4d4-46ae-9b67-db7946e86b05\" /></p></ac:rich-text-body></ac:structured-macro>"
+
+    return beginning + table + closing + attachments
+
+
+
+def buildMinute(
+    committeeName:str,
+    committeeminutes_date:str,
+    committeeMinutesAttending:list, 
+    committeeMinutesNotAttending:list, 
+    committeeMinutesOtherAttending:list,
+    committeeAgenda:list,
+    committeeTopics:list,
+    committeeMinutesStatus:str = "Approved") -> str:
+
+    """
+    Return a string representation of a ConfluencePage which can be uploaded to
+    Confluence.
+    """
+    
+    beginning = "<ac:structured-macro ac:name=\"content-layer\" ac:schema-version=\"1\" ac:macro-id=\"9dec53ff-ddd1-4959-824f-4f1ae61c797a\"><ac:parameter ac:name=\"id\">1856481233</ac:parameter><ac:rich-text-body><ac:structured-macro ac:name=\"content-column\" ac:schema-version=\"1\" ac:macro-id=\"2c808257-9edf-40b1-a12d-466b68e25950\"><ac:parameter ac:name=\"id\">1856481236</ac:parameter><ac:rich-text-body>"
+        
+    content = str(buildCommitteeStatus(committeeName, committeeminutes_date, committeeMinutesStatus))
+    content += str(buildCommitteeAgenda(committeeAgenda))
+    content += str(buildCommitteeAttending(committeeMinutesAttending, committeeMinutesNotAttending, committeeMinutesOtherAttending))
+    content += str(buildCommitteeMinutes(committeeTopics))
+
+    closing = "</ac:rich-text-body></ac:structured-macro></ac:rich-text-body></ac:structured-macro>"
+    
+    return beginning + content + closing
+
+def sanatizeControlCharacters(characters):
+    return "".join(ch for ch in characters if unicodedata.category(ch)[0] != "C")
+
+def renderPayload(*args, **kwargs) -> str:
+    """
+    Build a page with buildMinute and escape it the way uploadCommitteeMinute did.
+    """
+    payload = buildMinute(*args, **kwargs).replace("\r", "&#13;").replace("&", "&amp;").replace("\u00e2\u20ac\u2122", "&apos;").replace("\f", "<br/>").replace("\n", "<br/>")
+    return sanatizeControlCharacters(payload)
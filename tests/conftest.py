@@ -0,0 +1,63 @@
+import contextlib, os, sys
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+
+import benchmark, committee_upload
+from fake_confluence import FakeConfluence, FakeConfluenceServer
+
+def resetUploader():
+    """
+    Drop every piece of module state committee_upload keeps between calls.
+    """
+    if committee_upload.checkpoint_journal:
+        committee_upload.checkpoint_journal.close()
+    if committee_upload.parse_cache:
+        committee_upload.parse_cache.close()
+
+    committee_upload.confluence_api = None
+    committee_upload.request_scheduler = None
+    committee_upload.checkpoint_journal = None
+    committee_upload.parse_cache = None
+    committee_upload.metrics_recorder = None
+    committee_upload.archive_index = None
+    committee_upload.archive_index_file_path = None
+    committee_upload.extracted_texts.clear()
+    committee_upload.invalidateCommitteePageTree()
+
+@pytest.fixture
+def archive(tmp_path) -> list:
+    """
+    A small generated committees folder, set as the committees directory.
+    Yields the committee names.
+    """
+    resetUploader()
+
+    root = str(tmp_path / "committees")
+    committee_names = benchmark.generateCommitteeArchive(root, committees=2, minutes_per_committee=4, topics=3, pdf_bytes=256, seed=1)
+    committee_upload.committees_directory = root
+
+    yield committee_names
+
+    resetUploader()
+    committee_upload.committees_directory = None
+
+@pytest.fixture
+def serve(archive):
+    """
+    Get a function which serves a FakeConfluence holding the committees of
+    the archive, or of a subclass of it, and points committee_upload at it.
+    """
+    pytest.importorskip("atlassian")
+
+    import load_test
+
+    with contextlib.ExitStack() as servers:
+
+        def serve(confluence_class = FakeConfluence, **options) -> FakeConfluence:
+            confluence = confluence_class(archive, committee_upload.committees_parent_page_id, **options)
+            server = servers.enter_context(FakeConfluenceServer(confluence))
+            load_test.connect(server.url)
+            return confluence
+
+        yield serve
@@ -0,0 +1,32 @@
+"""
+Small helpers shared by the tests which upload a generated archive to a
+FakeConfluence.
+"""
+import glob, os
+import committee_upload
+from fake_confluence import FakeConfluence
+
+class FailingAttachments(FakeConfluence):
+    """
+    A FakeConfluence which fails every attachment upload while failing is set.
+    """
+    failing = True
+
+    def attach(self, *args):
+        if self.failing:
+            return 500, {"statusCode": 500, "message": "Attachment store unavailable"}
+        return super().attach(*args)
+
+def getMinutePages(confluence:FakeConfluence) -> list:
+    return [page for page in confluence.pages.values() if " - Minutes - " in page["title"]]
+
+def countMinutes() -> int:
+    return sum(len(pairs["Matched"]) for pairs in committee_upload.getPairingReport().values())
+
+def getStatusCounts(results:dict) -> dict:
+    return {status: len(entries) for status, entries in results.items()}
+
+def appendToFirstMinutes(text:str):
+    minutes_path = sorted(glob.glob(os.path.join(committee_upload.committees_directory, "*", "Minutes*.txt")))[0]
+    with open(minutes_path, "a", encoding="utf-8") as minutes_file:
+        minutes_file.write(text)
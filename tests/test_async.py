@@ -0,0 +1,92 @@
+import asyncio, json, threading
+import committee_upload
+from fake_confluence import FakeConfluence
+from helpers import countMinutes
+
+def test_async_upload_goes_through_the_scheduler(serve):
+    confluence = serve(rate_limit=20, retry_after=1)
+    minutes = countMinutes()
+
+    results = asyncio.run(committee_upload.mergeMatchesAsync(concurrency=8))
+
+    assert (len(results["Succeeded"]), len(results["Failed"])) == (minutes, 0)
+    assert len(confluence.attachments) == 2 * minutes
+
+    budgets = committee_upload.request_scheduler.summary()
+    assert budgets["write"]["Requests"] >= minutes
+    assert budgets["attach"]["Requests"] >= minutes
+
+class RejectedPages(FakeConfluence):
+    """
+    A FakeConfluence which refuses to create pages.
+    """
+
+    def createPage(self, data:dict, query:dict) -> tuple:
+        return 401, {"statusCode": 401, "message": "Not permitted to create pages"}
+
+def test_async_upload_reports_why_a_page_was_not_created(serve):
+    confluence = serve(RejectedPages)
+    minutes = countMinutes()
+
+    results = asyncio.run(committee_upload.mergeMatchesAsync(concurrency=4))
+
+    assert (len(results["Succeeded"]), len(results["Failed"])) == (0, minutes)
+    assert all("401" in reason for committee_name, minutes_file, reason in results["Failed"])
+    assert confluence.attachments == {}
+
+def test_async_upload_skips_pages_which_already_exist(serve):
+    confluence = serve()
+    minutes = countMinutes()
+    committee_upload.mergeMatches()
+    attachments = len(confluence.attachments)
+
+    results = asyncio.run(committee_upload.mergeMatchesAsync(concurrency=4))
+
+    assert (len(results["Succeeded"]), len(results["Failed"])) == (0, minutes)
+    assert all(reason == "No page was created." for committee_name, minutes_file, reason in results["Failed"])
+    assert len(confluence.attachments) == attachments
+
+def test_async_attachments_are_recognized_by_uploadAttachments(serve):
+    confluence = serve()
+    asyncio.run(committee_upload.mergeMatchesAsync(concurrency=4))
+
+    for committee_name, pairs in committee_upload.getPairingReport().items():
+        for minutes_file, agenda_file in pairs["Matched"]:
+            minute = committee_upload.renderCommitteeMinute(agenda_file, minutes_file, committee_name)
+            page_id = committee_upload.findPageID("COMM", minute["Title"])
+            assert set(committee_upload.uploadAttachments(minute["Attachments"], page_id).values()) == {"Skipped"}
+
+    assert all(attachment["comment"].startswith("sha256:") for attachment in confluence.attachments.values())
+
+class ThrottledOnce(FakeConfluence):
+    """
+    A FakeConfluence which throttles the first attempt at creating each page
+    and at each attachment upload.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.seen = set()
+        self.seen_lock = threading.Lock()
+
+    def handle(self, method:str, path:str, query:dict, headers, body:bytes) -> tuple:
+        if method == "POST":
+            key = (path, json.loads(body).get("title") if path.strip("/") == "rest/api/content" else None)
+            with self.seen_lock:
+                first = key not in self.seen
+                self.seen.add(key)
+            if first:
+                self.stats["Throttled"] += 1
+                return 429, {"statusCode": 429, "message": "Rate limit exceeded"}
+        return super().handle(method, path, query, headers, body)
+
+def test_async_upload_retries_throttled_requests(serve):
+    confluence = serve(ThrottledOnce, retry_after=0)
+    committees = committee_upload.getCommittees()[:1]
+    minutes = len(committee_upload.getCommitteeUploads(committees[0])["Uploads"])
+
+    results = asyncio.run(committee_upload.mergeMatchesAsync(concurrency=4, committees=committees))
+
+    assert (len(results["Succeeded"]), len(results["Failed"])) == (minutes, 0)
+    assert confluence.summary()["Throttled"] == 2 * minutes
+    assert len(confluence.attachments) == 2 * minutes
@@ -0,0 +1,31 @@
+import committee_upload
+from helpers import FailingAttachments, countMinutes, getMinutePages
+
+def test_failed_attachments_fail_the_minute(serve):
+    confluence = serve(FailingAttachments)
+    minutes = countMinutes()
+
+    results = committee_upload.mergeMatches()
+
+    assert (len(results["Succeeded"]), len(results["Failed"])) == (0, minutes)
+    assert len(getMinutePages(confluence)) == minutes
+    assert len(confluence.attachments) == 0
+
+def getFirstMinute() -> dict:
+    committee_uploads = committee_upload.getCommitteeUploads(committee_upload.getCommittees()[0])
+    agenda_file, minutes_file = committee_uploads["Uploads"][0]
+    return committee_upload.renderCommitteeMinute(agenda_file, minutes_file, committee_uploads["Committee Name"])
+
+def test_only_changed_attachments_are_uploaded_again(serve):
+    serve()
+    committee_upload.mergeMatches()
+    minute = getFirstMinute()
+    page_id = committee_upload.findPageID("COMM", minute["Title"])
+
+    assert set(committee_upload.uploadAttachments(minute["Attachments"], page_id).values()) == {"Skipped"}
+
+    changed_path = minute["Attachments"][0]
+    with open(changed_path, "ab") as changed_file:
+        changed_file.write(b"%% revised\n")
+
+    assert committee_upload.uploadAttachments(minute["Attachments"], page_id) == {changed_path: "Uploaded", minute["Attachments"][1]: "Skipped"}
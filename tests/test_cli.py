@@ -0,0 +1,21 @@
+import committee_upload
+from helpers import FailingAttachments
+
+def sync(tmp_path, *options) -> int:
+    return committee_upload.main(["--committees-directory", committee_upload.committees_directory, "sync", "--journal", str(tmp_path / "journal.jsonl")] + list(options))
+
+def test_sync_exits_with_0_when_every_minute_was_uploaded(serve, tmp_path):
+    serve()
+
+    assert sync(tmp_path) == 0
+    assert sync(tmp_path, "--incremental", "--manifest", str(tmp_path / "manifest.json")) == 0
+
+def test_sync_exits_with_1_when_a_minute_failed(serve, tmp_path):
+    serve(FailingAttachments)
+
+    assert sync(tmp_path) == 1
+
+def test_incremental_sync_exits_with_1_when_a_minute_failed(serve, tmp_path):
+    serve(FailingAttachments)
+
+    assert sync(tmp_path, "--incremental", "--manifest", str(tmp_path / "manifest.json")) == 1
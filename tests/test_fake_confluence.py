@@ -0,0 +1,21 @@
+import committee_upload
+from helpers import countMinutes, getMinutePages
+
+def test_mergeMatches_uploads_every_minute(serve):
+    confluence = serve()
+    minutes = countMinutes()
+
+    results = committee_upload.mergeMatches(workers=2)
+
+    assert (len(results["Succeeded"]), len(results["Failed"])) == (minutes, 0)
+    assert len(getMinutePages(confluence)) == minutes
+    assert all(page["labels"] == ["minutes"] for page in getMinutePages(confluence))
+    assert len(confluence.attachments) == 2 * minutes
+
+def test_a_single_label_object_is_accepted(serve):
+    confluence = serve()
+    page_id = confluence.addPage("Unlabeled", confluence.root_page_id)
+
+    committee_upload.getConfluenceAPI().set_page_label(page_id, "minutes")
+
+    assert confluence.pages[page_id]["labels"] == ["minutes"]
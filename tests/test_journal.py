@@ -0,0 +1,53 @@
+import committee_upload
+from helpers import FailingAttachments, countMinutes, getMinutePages
+
+def test_resume_finishes_minutes_whose_attachments_failed(serve, tmp_path):
+    confluence = serve(FailingAttachments)
+    minutes = countMinutes()
+    journal_path = str(tmp_path / "journal.jsonl")
+
+    committee_upload.enableJournal(journal_path)
+    committee_upload.mergeMatches()
+
+    assert committee_upload.checkpoint_journal.summary()["labeled"] == minutes
+
+    committee_upload.checkpoint_journal.close()
+    committee_upload.checkpoint_journal = None
+    confluence.failing = False
+
+    committee_upload.enableJournal(journal_path, resume=True)
+    results = committee_upload.mergeMatches()
+
+    assert (len(results["Succeeded"]), len(results["Failed"])) == (minutes, 0)
+    assert committee_upload.checkpoint_journal.summary()["attached"] == minutes
+    assert len(getMinutePages(confluence)) == minutes
+    assert len(confluence.attachments) == 2 * minutes
+
+    requests = confluence.summary()["Requests"]
+    results = committee_upload.mergeMatches()
+
+    assert len(results["Succeeded"]) == minutes
+    assert confluence.summary()["Requests"] == requests
+
+def test_resume_labels_a_page_created_by_an_interrupted_run(serve, tmp_path):
+    confluence = serve()
+    committee = committee_upload.getCommittees()[0]
+    committee_uploads = committee_upload.getCommitteeUploads(committee)
+    committee_name = committee_uploads["Committee Name"]
+    agenda_file, minutes_file = committee_uploads["Uploads"][0]
+
+    # The interrupted run got as far as creating the page.
+    minute = committee_upload.renderCommitteeMinute(agenda_file, minutes_file, committee_name)
+    minutes_page_id = str(committee_upload.getMinutesConfluencePage(committee_uploads["Committee ID"]))
+    page_id = confluence.addPage(minute["Title"], minutes_page_id, minute["Payload"])
+
+    committee_upload.enableJournal(str(tmp_path / "journal.jsonl"))
+    committee_upload.checkpoint_journal.record(committee_upload.getManifestKey(committee_name, minutes_file, agenda_file), "created", page_id)
+
+    results = committee_upload.mergeMatches(committees=[committee])
+
+    assert len(results["Failed"]) == 0
+    assert (committee_name, minutes_file, page_id) in results["Succeeded"]
+    assert confluence.pages[page_id]["labels"] == ["minutes"]
+    assert len([attachment for attachment in confluence.attachments.values() if attachment["page"] == page_id]) == 2
+    assert len(getMinutePages(confluence)) == len(committee_uploads["Uploads"])
@@ -0,0 +1,35 @@
+import pytest
+import committee_upload
+from fake_confluence import FakeConfluence
+
+class FailingListings(FakeConfluence):
+    """
+    A FakeConfluence which refuses to list the children of the committees
+    page after the first page of them while failing is set.
+    """
+    failing = True
+
+    def handle(self, method:str, path:str, query:dict, headers, body:bytes) -> tuple:
+        if self.failing and path.strip("/") == "rest/api/content/" + self.root_page_id + "/child/page" and int(query.get("start", 0)) > 0:
+            return 403, {"statusCode": 403, "message": "Not permitted"}
+        return super().handle(method, path, query, headers, body)
+
+def test_page_tree_follows_pagination(serve, archive):
+    serve(page_limit=1)
+
+    page_tree = committee_upload.getCommitteePageTree()
+
+    assert sorted(committee["title"] for committee in page_tree["by_id"].values()) == sorted(archive)
+    assert all(committee["minutes_page_id"] for committee in page_tree["by_id"].values())
+
+def test_failed_page_tree_load_raises_and_is_not_cached(serve, archive):
+    confluence = serve(FailingListings, page_limit=1)
+
+    with pytest.raises(RuntimeError):
+        committee_upload.getCommitteePageTree()
+
+    assert committee_upload.getCommitteePageTrees() == []
+
+    confluence.failing = False
+
+    assert len(committee_upload.getCommitteePageTree()["by_id"]) == len(archive)
@@ -0,0 +1,77 @@
+import sqlite3, time
+import committee_upload
+from parse_cache import ParseCache
+from helpers import countMinutes
+
+def test_pipelined_upload_reports_parse_cache_use(serve, tmp_path):
+    minutes = countMinutes()
+    committee_upload.enableParseCache(str(tmp_path / "parse_cache.db"))
+
+    serve()
+    assert len(committee_upload.mergeMatchesPipelined(render_workers=2)["Succeeded"]) == minutes
+    assert committee_upload.parse_cache.summary() == {"Entries": 2 * minutes, "Hits": 0, "Misses": 2 * minutes}
+
+    serve()
+    assert len(committee_upload.mergeMatchesPipelined(render_workers=2)["Succeeded"]) == minutes
+    assert committee_upload.parse_cache.summary() == {"Entries": 2 * minutes, "Hits": 2 * minutes, "Misses": 2 * minutes}
+
+def getUsed(database_path:str) -> dict:
+    connection = sqlite3.connect(database_path)
+    try:
+        return dict(connection.execute("SELECT path, used FROM parsed"))
+    finally:
+        connection.close()
+
+def test_hits_are_written_in_batches(tmp_path):
+    database_path = str(tmp_path / "parse_cache.db")
+    cache = ParseCache(database_path)
+    cache.putByChecksum("a", "agenda", 1, {"Agenda": []})
+    used = getUsed(database_path)
+
+    time.sleep(0.01)
+    assert cache.getByChecksum("a", "agenda", 1) == {"Agenda": []}
+    assert getUsed(database_path) == used
+
+    cache.flush()
+    assert getUsed(database_path)["sha256:a"] > used["sha256:a"]
+    cache.close()
+
+def test_eviction_counts_entries_written_by_other_processes(tmp_path):
+    database_path = str(tmp_path / "parse_cache.db")
+    cache = ParseCache(database_path, max_entries=10)
+    other = ParseCache(database_path, max_entries=10)
+    other.count_interval = 5
+
+    for index in range(6):
+        cache.putByChecksum("cache" + str(index), "agenda", 1, index)
+    # Used again by this process, but only known to it so far.
+    time.sleep(0.01)
+    assert cache.getByChecksum("cache0", "agenda", 1) == 0
+    cache.flush()
+
+    for index in range(5):
+        other.putByChecksum("other" + str(index), "agenda", 1, index)
+
+    assert other.summary()["Entries"] == 9
+    assert cache.getByChecksum("cache0", "agenda", 1) == 0
+    assert cache.getByChecksum("cache1", "agenda", 1) is None
+
+    cache.close()
+    other.close()
+
+def test_no_eviction_when_another_process_emptied_the_cache(tmp_path):
+    database_path = str(tmp_path / "parse_cache.db")
+    cache = ParseCache(database_path, max_entries=10)
+
+    for index in range(6):
+        cache.putByChecksum("old" + str(index), "agenda", 1, index)
+
+    other = ParseCache(database_path)
+    other.clear()
+    other.close()
+
+    for index in range(6):
+        cache.putByChecksum("new" + str(index), "agenda", 1, index)
+
+    assert cache.summary()["Entries"] == 6
+    cache.close()
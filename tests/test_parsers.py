@@ -0,0 +1,100 @@
+import glob, os, random
+import committee_upload
+import baseline
+
+agenda_pool = [
+    "AGENDA\n", "Meeting Agenda\n", "Desired Outcome\n", "Presenter\n", "Leader\n", "\n", "   \n",
+    "1. Call to order\n", "2) Roll call\n", "10. Approve minutes of 3. the meeting\n", "continued text here\n",
+    "more text 4. inline\n", "D/I\n", "Ivan Smith\n", "Vote\n", "January 5, 2019\n", "March 12, 2020 meeting\n",
+    "1. 2. \n", "11.  double\n", "x\n", "3.\n", "5. last", "text 7) thing\n", "Jane Doe (Chair)3.2) \n",
+    "4.5) 6. x\n", "9.\n", "\f\n", "\fPresenter\n",
+    "5.4.3.2) \n", "7.6)  spaced\n", "12.", "3) ", " . start\n", ") tail\n", "8", "9.\t\n"
+]
+
+attendees_pool = [
+    "Members Attending\n", "Attendees\n", "Members Not Attending\n", "Absent\n", "Others Attending\n", "\n", "  \n",
+    "John Smith\n", "Jane Q Public (Chair)\n", "Bob Jones, CPA\n", "Conference call\n", "Call to Order\n",
+    "The meeting was called to order at 10am.\n", "Approval of Minutes\n", "Motion carried\n", "Not attend\n", "x\n", "\f\n", "\fJohn Smith\n", "Adjourn"
+]
+
+text_pool = ["Budget", " ", "review", "&", "\r", "\n", "\n\n", "\f", "\x07", "\u200b", "\u00e2\u20ac\u2122", "caf\u00e9", "3.", "(Chair)", "<", ">", "<b>", "\f\n"]
+
+def randomFiles(pool:list, count:int, max_lines:int, seed:int):
+    randomizer = random.Random(seed)
+    for _ in range(count):
+        yield [randomizer.choice(pool) for _ in range(randomizer.randint(0, max_lines))]
+
+def randomText(randomizer:random.Random) -> str:
+    return "".join(randomizer.choice(text_pool) for _ in range(randomizer.randint(0, 12)))
+
+def test_getAgenda_matches_baseline():
+    for lines in randomFiles(agenda_pool, 5000, 25, seed=1):
+        assert committee_upload.getAgenda(lines) == baseline.getAgenda(lines), lines
+
+def test_getAgenda_strips_numbers_exposed_by_stripping():
+    lines = ["Agenda\n", "1. Call to order\n", "Jane Doe (Chair)3.2) \n", "continued\n", "2. Adjourn\n"]
+
+    agenda = committee_upload.getAgenda(lines)
+
+    assert agenda == baseline.getAgenda(lines)
+    assert agenda["Agenda"] == ["Call to order Jane Doe (Chair)continued"]
+
+def test_getAgenda_matches_baseline_on_a_long_topic():
+    lines = ["Agenda\n", "1. Start\n"] + ["continued 5.4.3.2) text\n", "9.\t\n", "7.6)  spaced\n"] * 500 + ["2. End\n", "3. Adjourn\n"]
+
+    assert committee_upload.getAgenda(lines) == baseline.getAgenda(lines)
+
+def test_getAttendees_matches_baseline():
+    for lines in randomFiles(attendees_pool, 5000, 40, seed=2):
+        assert committee_upload.getAttendees(iter(lines)) == baseline.getAttendees(lines), lines
+
+def test_parsers_match_baseline_on_generated_archive(archive):
+    text_paths = glob.glob(os.path.join(committee_upload.committees_directory, "*", "*.txt"))
+
+    assert text_paths
+
+    for text_path in text_paths:
+        with open(text_path, "r", encoding="utf-8") as text_file:
+            lines = list(text_file)
+        if committee_upload.isAgenda(os.path.basename(text_path)):
+            assert committee_upload.parseAgendaFile(text_path) == baseline.getAgenda(lines)
+        else:
+            assert committee_upload.parseMinutesFile(text_path) == (baseline.getAttendees(lines), "".join(lines))
+
+# The baseline put angle brackets in the page as they were, breaking the
+# markup, so they go through it as look-alikes and are escaped afterwards.
+markup_stand_ins = str.maketrans({"<": "\u2039", ">": "\u203a"})
+
+def standInMarkup(argument):
+    if isinstance(argument, str):
+        return argument.translate(markup_stand_ins)
+    if isinstance(argument, dict):
+        return {key: standInMarkup(value) for key, value in argument.items()}
+    return [standInMarkup(value) for value in argument]
+
+def renderBaseline(*arguments) -> str:
+    payload = baseline.renderPayload(*(standInMarkup(argument) for argument in arguments))
+    return payload.replace("\u2039", "&lt;").replace("\u203a", "&gt;")
+
+def test_buildMinute_matches_baseline():
+    randomizer = random.Random(3)
+
+    for _ in range(2000):
+        arguments = (
+            randomText(randomizer),
+            randomText(randomizer),
+            [randomText(randomizer) for _ in range(randomizer.randint(0, 3))],
+            [randomText(randomizer) for _ in range(randomizer.randint(0, 3))],
+            [randomText(randomizer) for _ in range(randomizer.randint(0, 3))],
+            [{"Topic": randomText(randomizer), "Presenter": randomText(randomizer)} for _ in range(randomizer.randint(0, 3))],
+            [{"Topic": randomText(randomizer), "Description": randomText(randomizer)} for _ in range(randomizer.randint(0, 3))])
+
+        assert committee_upload.buildMinute(*arguments) == renderBaseline(*arguments), arguments
+
+def test_buildMinute_escapes_markup_in_text():
+    payload = committee_upload.buildMinute("Budget <b>", "1/2/2019", ["Jane <Doe>"], [], [], [{"Topic": "a < b", "Presenter": "x > y"}], [])
+
+    assert "Budget &lt;b&gt;" in payload
+    assert "Jane &lt;Doe&gt;" in payload
+    assert "a &lt; b" in payload and "x &gt; y" in payload
+    assert "<b>" not in payload
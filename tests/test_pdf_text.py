@@ -0,0 +1,50 @@
+import glob, os, shutil, sys
+import pytest
+import committee_upload, pdf_text
+
+def renderArchive() -> dict:
+    minutes = {}
+
+    for committee_name, pairs in committee_upload.getPairingReport().items():
+        for minutes_file, agenda_file in pairs["Matched"]:
+            minute = committee_upload.renderCommitteeMinute(agenda_file, minutes_file, committee_name)
+            minutes[minute["Title"]] = minute["Payload"]
+
+    return minutes
+
+@pytest.fixture
+def extractor(tmp_path, monkeypatch):
+    """
+    Stand in for pdftotext with a script printing the .source file next to
+    the PDF, the text the PDF was made from.
+    """
+    extractor_path = str(tmp_path / "extractor.py")
+    with open(extractor_path, "w", encoding="utf-8") as extractor_file:
+        extractor_file.write("import sys\nsys.stdout.buffer.write(open(sys.argv[1][:-4] + '.source', 'rb').read())\n")
+    monkeypatch.setattr(pdf_text, "extractor_command", [sys.executable, extractor_path])
+
+def test_pdf_only_minutes_render_like_text_files(archive, extractor):
+    rendered = renderArchive()
+
+    text_paths = sorted(glob.glob(os.path.join(committee_upload.committees_directory, "*", "*.txt")))[::2]
+    for text_path in text_paths:
+        shutil.move(text_path, text_path[:-4] + ".source")
+
+    committee_upload.archive_index = None
+
+    assert committee_upload.extractMissingText(workers=2) == {"Extracted": len(text_paths), "Failed": []}
+    assert renderArchive() == rendered
+
+def test_extracted_text_is_split_into_lines_like_a_text_file(archive, extractor, tmp_path):
+    text = "Agenda\n1. Call to order\fPresenter\n\f\nJane Doe\x0bChair\x1c\r\n2. Adjourn\x85\u2028done\rlast"
+    for extension in (".source", ".txt"):
+        with open(str(tmp_path / ("Agenda 1-2-19" + extension)), "w", encoding="utf-8", newline="") as text_file:
+            text_file.write(text)
+    with open(str(tmp_path / "Agenda 1-2-19.pdf"), "wb") as pdf_file:
+        pdf_file.write(b"%PDF-1.4\n")
+
+    with open(str(tmp_path / "Agenda 1-2-19.txt"), "r", encoding="utf-8") as text_file:
+        lines = list(text_file)
+
+    assert list(committee_upload.readSourceLines(str(tmp_path / "Agenda 1-2-19.pdf"))) == lines
+    assert committee_upload.getAgenda(committee_upload.readSourceLines(str(tmp_path / "Agenda 1-2-19.pdf"))) == committee_upload.getAgenda(lines)
@@ -0,0 +1,37 @@
+import committee_upload
+from fake_confluence import FakeConfluence
+from helpers import countMinutes, getMinutePages
+
+class ForbiddenDeletes(FakeConfluence):
+    """
+    A FakeConfluence which refuses to delete pages.
+    """
+
+    def handle(self, method:str, path:str, query:dict, headers, body:bytes) -> tuple:
+        if method == "DELETE":
+            return 403, {"statusCode": 403, "message": "Not permitted to delete"}
+        return super().handle(method, path, query, headers, body)
+
+def purgeAll() -> list:
+    return committee_upload.purgeMinutesFromCommittees([committee_upload.getCommitteeUploads(committee, resolve_ids=False)["Committee Name"] for committee in committee_upload.getCommittees()])
+
+def test_purge_deletes_every_minute(serve):
+    confluence = serve()
+    committee_upload.mergeMatches()
+
+    results = purgeAll()
+
+    assert sum(result["Deleted"] for result in results) == countMinutes()
+    assert all(result["Failed"] == [] and result["Remaining"] == 0 for result in results)
+    assert getMinutePages(confluence) == []
+
+def test_purge_reports_refused_deletes_as_failed(serve):
+    confluence = serve(ForbiddenDeletes)
+    committee_upload.mergeMatches()
+
+    results = purgeAll()
+
+    assert sum(result["Deleted"] for result in results) == 0
+    assert sorted(page_id for result in results for page_id, status in result["Failed"]) == sorted(page["id"] for page in getMinutePages(confluence))
+    assert all(status == 403 for result in results for page_id, status in result["Failed"])
+    assert sum(result["Remaining"] for result in results) == countMinutes()
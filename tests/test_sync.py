@@ -0,0 +1,61 @@
+import glob, os, shutil
+import committee_upload
+from helpers import appendToFirstMinutes, countMinutes, getMinutePages, getStatusCounts
+
+def test_sync_creates_then_skips_unchanged_minutes(serve, tmp_path):
+    serve()
+    minutes = countMinutes()
+    manifest_path = str(tmp_path / "manifest.json")
+
+    assert getStatusCounts(committee_upload.syncMatches(manifest_path)) == {"Unchanged": 0, "Updated": 0, "Created": minutes, "Failed": 0}
+    assert getStatusCounts(committee_upload.syncMatches(manifest_path)) == {"Unchanged": minutes, "Updated": 0, "Created": 0, "Failed": 0}
+
+    appendToFirstMinutes("\nAn extra closing remark.\n")
+
+    assert getStatusCounts(committee_upload.syncMatches(manifest_path)) == {"Unchanged": minutes - 1, "Updated": 1, "Created": 0, "Failed": 0}
+
+def test_sync_takes_over_pages_uploaded_by_mergeMatches(serve, tmp_path):
+    confluence = serve()
+    minutes = countMinutes()
+    manifest_path = str(tmp_path / "manifest.json")
+
+    committee_upload.mergeMatches()
+
+    assert getStatusCounts(committee_upload.syncMatches(manifest_path)) == {"Unchanged": 0, "Updated": minutes, "Created": 0, "Failed": 0}
+    assert getStatusCounts(committee_upload.syncMatches(manifest_path)) == {"Unchanged": minutes, "Updated": 0, "Created": 0, "Failed": 0}
+    assert len(getMinutePages(confluence)) == minutes
+
+def test_sync_skips_every_minute_after_the_archive_moved(serve, tmp_path, monkeypatch):
+    confluence = serve()
+    minutes = countMinutes()
+    manifest_path = str(tmp_path / "manifest.json")
+
+    committee_upload.syncMatches(manifest_path)
+
+    moved_directory = str(tmp_path / "moved")
+    shutil.move(committee_upload.committees_directory, moved_directory)
+    committee_upload.committees_directory = moved_directory
+    committee_upload.archive_index = None
+    requests = confluence.summary()["Endpoints"]
+    # Nothing may be rendered again.
+    monkeypatch.setattr(committee_upload, "renderCommitteeMinute", None)
+
+    assert getStatusCounts(committee_upload.syncMatches(manifest_path)) == {"Unchanged": minutes, "Updated": 0, "Created": 0, "Failed": 0}
+    assert confluence.summary()["Endpoints"] == requests
+
+def test_sync_uploads_a_changed_pdf(serve, tmp_path):
+    confluence = serve()
+    minutes = countMinutes()
+    manifest_path = str(tmp_path / "manifest.json")
+
+    committee_upload.syncMatches(manifest_path)
+
+    pdf_path = sorted(glob.glob(os.path.join(committee_upload.committees_directory, "*", "Minutes*.pdf")))[0]
+    with open(pdf_path, "ab") as pdf_file:
+        pdf_file.write(b"%% revised\n")
+    with open(pdf_path, "rb") as pdf_file:
+        pdf_data = pdf_file.read()
+
+    assert getStatusCounts(committee_upload.syncMatches(manifest_path)) == {"Unchanged": minutes - 1, "Updated": 1, "Created": 0, "Failed": 0}
+    assert [attachment["data"] for attachment in confluence.attachments.values() if attachment["title"] == os.path.basename(pdf_path)] == [pdf_data]
+    assert getStatusCounts(committee_upload.syncMatches(manifest_path)) == {"Unchanged": minutes, "Updated": 0, "Created": 0, "Failed": 0}
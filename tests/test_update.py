@@ -0,0 +1,18 @@
+import committee_upload
+from helpers import appendToFirstMinutes, countMinutes, getMinutePages, getStatusCounts
+
+def test_update_only_updates_pages_whose_content_changed(serve):
+    confluence = serve()
+    minutes = countMinutes()
+
+    committee_upload.mergeMatches()
+
+    # Confluence rewrites the storage format it is given.
+    for page in getMinutePages(confluence):
+        page["body"] = page["body"].replace("<br/>", "<br />").replace("<ac:structured-macro ", "<ac:structured-macro ac:macro-id=\"abc-123\" ")
+
+    assert getStatusCounts(committee_upload.updateMatches()) == {"Unchanged": minutes, "Updated": 0, "Created": 0, "Failed": 0}
+
+    appendToFirstMinutes("\nAn extra closing remark.\n")
+
+    assert getStatusCounts(committee_upload.updateMatches()) == {"Unchanged": minutes - 1, "Updated": 1, "Created": 0, "Failed": 0}
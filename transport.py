@@ -0,0 +1,136 @@
+import random
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+class JitteredRetry(Retry):
+    """
+    A urllib3 Retry which sleeps a random time between zero and the
+    exponential backoff, so concurrent workers throttled together do not all
+    come back at once.
+
+    Methods which are not idempotent, such as the POST creating a page, are
+    only retried when the server said it did not process the request: a 429,
+    or a 503 with a Retry-After header. Retry-After is always respected.
+
+    When given a scheduler, every throttled response retried here is reported
+    to it, since those never reach the adapter, and the request gives up its
+    slot in the scheduler while sleeping before the retry.
+    """
+
+    def __init__(self, *args, scheduler = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.scheduler = scheduler
+
+    def new(self, **kwargs):
+        retry = super().new(**kwargs)
+        retry.scheduler = self.scheduler
+        return retry
+
+    def increment(self, method:str = None, url:str = None, response = None, *args, **kwargs):
+        if self.scheduler and response is not None and response.status in (429, 503):
+            self.scheduler.throttle(method, url or "", self.parse_retry_after(response.getheader("Retry-After")) if response.getheader("Retry-After") else None)
+
+        return super().increment(method, url, response, *args, **kwargs)
+
+    def sleep(self, response = None):
+        if not self.scheduler:
+            return super().sleep(response)
+
+        seconds = self.get_retry_after(response) if response else None
+
+        if not seconds:
+            seconds = self.get_backoff_time()
+
+        if seconds > 0:
+            self.scheduler.wait(seconds)
+
+    def get_backoff_time(self) -> float:
+        return random.uniform(0, super().get_backoff_time())
+
+    def is_retry(self, method:str, status_code:int, has_retry_after:bool = False) -> bool:
+        if self._is_method_retryable(method):
+            return super().is_retry(method, status_code, has_retry_after)
+
+        if not self.total:
+            return False
+
+        return status_code == 429 or (status_code == 503 and has_retry_after)
+
+class ScheduledHTTPAdapter(HTTPAdapter):
+    """
+    An HTTPAdapter which sends every request through a
+    scheduler.RequestScheduler.
+    """
+
+    def __init__(self, scheduler, *args, **kwargs):
+        self.scheduler = scheduler
+        super().__init__(*args, **kwargs)
+
+    def send(self, request, *args, **kwargs):
+        return self.scheduler.send(request.method, request.url, lambda: super(ScheduledHTTPAdapter, self).send(request, *args, **kwargs))
+
+def generateRetry(retries:int = 5, backoff_factor:float = 0.5, scheduler = None) -> JitteredRetry:
+    """
+    Get the retry policy used for every Confluence request.
+
+    Args:
+        retries (int, optional): Defaults to 5. Retries before giving up.
+        backoff_factor (float, optional): Defaults to 0.5. The base of the
+        exponential backoff in seconds.
+        scheduler (RequestScheduler, optional): Defaults to None. Told about
+        every throttled response which is retried.
+    """
+    return JitteredRetry(
+        total=retries,
+        connect=retries,
+        read=retries,
+        status=retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=(429, 500, 502, 503, 504),
+        method_whitelist=Retry.DEFAULT_METHOD_WHITELIST,
+        respect_retry_after_header=True,
+        raise_on_status=False,
+        scheduler=scheduler)
+
+def configureSession(confluence_api, pool_size:int = 20, retries:int = 5, backoff_factor:float = 0.5, connect_timeout:float = 5, read_timeout:float = 60, scheduler = None):
+    """
+    Tune the HTTP session of an atlassian.Confluence object for many requests
+    in flight: a connection pool of pool_size kept-alive connections per host,
+    retries with jittered exponential backoff, and a connect and read timeout
+    on every request. With a scheduler, every request waits for its budget.
+
+    Args:
+        confluence_api (Confluence): The session from credentials.generateSession().
+        pool_size (int, optional): Defaults to 20. Should be at least the
+        number of threads sending requests; more threads wait for a connection.
+        retries (int, optional): Defaults to 5. Retries before giving up.
+        backoff_factor (float, optional): Defaults to 0.5. The base of the
+        exponential backoff in seconds.
+        connect_timeout (float, optional): Defaults to 5. Seconds to connect.
+        read_timeout (float, optional): Defaults to 60. Seconds to wait for data.
+        scheduler (RequestScheduler, optional): Defaults to None. The
+        scheduler.RequestScheduler every request goes through.
+
+    Returns:
+        Confluence: The same confluence_api.
+    """
+    adapter_arguments = {
+        "pool_connections": pool_size,
+        "pool_maxsize": pool_size,
+        "max_retries": generateRetry(retries, backoff_factor, scheduler),
+        "pool_block": True
+    }
+
+    if scheduler:
+        adapter = ScheduledHTTPAdapter(scheduler, **adapter_arguments)
+    else:
+        adapter = HTTPAdapter(**adapter_arguments)
+
+    session = confluence_api._session
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers["Connection"] = "keep-alive"
+
+    confluence_api.timeout = (connect_timeout, read_timeout)
+
+    return confluence_api